@@ -85,48 +85,59 @@ function registerCommands(program) {
         
         spinner.text = 'Fetching servers...';
         
-        // Get servers for each provider
-        const allServers = [];
+        // Skip providers that are not configured
+        const configuredProviders = [];
         for (const provider of selectedProviders) {
-          try {
-            // Check if the provider is configured
-            const key = await keyring.get(`${provider.toUpperCase()}_API_KEY`);
-            if (!key) {
-              console.log(chalk.yellow(`! ${provider} is not configured, skipping`));
-              continue;
-            }
-            
-            const servers = await api.listServers(provider);
-            
-            // Extract server data based on provider response format
-            let providerServers = [];
-            if (provider === 'hetzner' && servers.servers) {
-              providerServers = servers.servers.map(s => ({
-                id: s.id,
-                name: s.name,
-                status: s.status,
-                provider
-              }));
-            } else if (provider === 'digitalocean' && servers.droplets) {
-              providerServers = servers.droplets.map(s => ({
-                id: s.id,
-                name: s.name,
-                status: s.status,
-                provider
-              }));
-            } else if (provider === 'vultr' && servers.instances) {
-              providerServers = servers.instances.map(s => ({
-                id: s.id,
-                name: s.label,
-                status: s.status,
-                provider
-              }));
-            }
-            
-            allServers.push(...providerServers);
-          } catch (error) {
-            console.log(chalk.yellow(`! Error fetching servers for ${provider}: ${error.message}`));
+          const key = await keyring.get(`${provider.toUpperCase()}_API_KEY`);
+          if (!key) {
+            console.log(chalk.yellow(`! ${provider} is not configured, skipping`));
+            continue;
           }
+          configuredProviders.push(provider);
+        }
+        
+        // Get servers for every provider in one round trip
+        const responses = configuredProviders.length > 0
+          ? await api.batch(configuredProviders.map(provider => ({
+            id: provider,
+            path: `/plugins/${provider}/servers`
+          })))
+          : [];
+        
+        const allServers = [];
+        for (const { id: provider, status, body: servers } of responses) {
+          if (status !== 200) {
+            const message = (servers && servers.error) || `HTTP ${status}`;
+            console.log(chalk.yellow(`! Error fetching servers for ${provider}: ${message}`));
+            continue;
+          }
+          
+          // Extract server data based on provider response format
+          let providerServers = [];
+          if (provider === 'hetzner' && servers.servers) {
+            providerServers = servers.servers.map(s => ({
+              id: s.id,
+              name: s.name,
+              status: s.status,
+              provider
+            }));
+          } else if (provider === 'digitalocean' && servers.droplets) {
+            providerServers = servers.droplets.map(s => ({
+              id: s.id,
+              name: s.name,
+              status: s.status,
+              provider
+            }));
+          } else if (provider === 'vultr' && servers.instances) {
+            providerServers = servers.instances.map(s => ({
+              id: s.id,
+              name: s.label,
+              status: s.status,
+              provider
+            }));
+          }
+          
+          allServers.push(...providerServers);
         }
         
         spinner.succeed('Servers fetched successfully');
@@ -7,16 +7,76 @@
 const axios = require('axios');
 const { SERVER_URL } = require('./server');
 
+// Response format requested from the server ('json' or 'msgpack')
+const API_FORMAT = process.env.ENGIYN_API_FORMAT || 'json';
+
+/**
+ * Load the optional msgpack decoder
+ * @returns {Function|null} Decode function, or null if not installed
+ */
+function loadMsgpackDecoder() {
+  try {
+    return require('@msgpack/msgpack').decode;
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Send one batch sub-request on its own, describing the response like /batch does
+ * @param {Object} client Axios client
+ * @param {Object} request Sub-request ({ id, method, path, body })
+ * @param {number} index Position of the request, its default id
+ * @returns {Promise<Object>} Response ({ id, status, headers, body, elapsed_ms })
+ */
+async function sendOne(client, request, index) {
+  const { id = index, method = 'GET', path, body } = request;
+  const started = Date.now();
+  let response;
+  try {
+    response = await client.request({ method, url: path, data: body });
+  } catch (error) {
+    if (!error.response) {
+      throw error;
+    }
+    response = error.response;
+  }
+  return {
+    id,
+    status: response.status,
+    headers: response.headers,
+    body: response.data,
+    elapsed_ms: Date.now() - started
+  };
+}
+
 /**
  * Create an API client for the Engiyn server
+ * @param {Object} options Client options
+ * @param {string} options.format Response format to request ('json' or 'msgpack')
  * @returns {Object} API client
  */
-function createApiClient() {
+function createApiClient({ format = API_FORMAT } = {}) {
   const client = axios.create({
     baseURL: SERVER_URL,
     timeout: 10000
   });
   
+  // Opt into msgpack bodies, which are cheaper to decode than JSON for large lists
+  const decode = format === 'msgpack' ? loadMsgpackDecoder() : null;
+  if (decode) {
+    client.defaults.headers.common.Accept = 'application/msgpack, application/json;q=0.9';
+    client.defaults.responseType = 'arraybuffer';
+    client.interceptors.response.use((response) => {
+      const contentType = response.headers['content-type'] || '';
+      const body = Buffer.from(response.data);
+      response.data = contentType.startsWith('application/msgpack')
+        ? decode(body)
+        : JSON.parse(body.toString('utf8'));
+      return response;
+    });
+  }
+  
   return {
     /**
      * Get the status of the Engiyn server
@@ -71,10 +131,11 @@ function createApiClient() {
      * Delete a server for a specific provider
      * @param {string} provider Provider name
      * @param {string} serverId Server ID
+     * @param {string} [account] Account that owns the server
      * @returns {Promise<Object>} Result of the deletion
      */
-    deleteServer: async (provider, serverId) => {
-      const response = await client.post(`/plugins/${provider}/servers/delete`, { server_id: serverId });
+    deleteServer: async (provider, serverId, account) => {
+      const response = await client.post(`/plugins/${provider}/servers/delete`, { server_id: serverId, account });
       return response.data;
     },
     
@@ -87,9 +148,29 @@ function createApiClient() {
     getServer: async (provider, serverId) => {
       const response = await client.get(`/plugins/${provider}/servers/${serverId}`);
       return response.data;
+    },
+    
+    /**
+     * Run several requests in one round trip; the server runs them concurrently.
+     * Falls back to one call per request on servers without /batch.
+     * @param {Array<Object>} requests Sub-requests ({ id, method, path, body })
+     * @returns {Promise<Array>} Responses ({ id, status, headers, body, elapsed_ms }) in request order
+     */
+    batch: async (requests) => {
+      try {
+        const response = await client.post('/batch', { requests });
+        return response.data.responses;
+      } catch (error) {
+        const status = error.response && error.response.status;
+        if (status !== 404 && status !== 405) {
+          throw error;
+        }
+      }
+      return Promise.all(requests.map((request, index) => sendOne(client, request, index)));
     }
   };
 }
 
 // Export a singleton instance of the API client
 module.exports = createApiClient();
+module.exports.createApiClient = createApiClient;
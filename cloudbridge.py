@@ -10,18 +10,42 @@ import sys
 import json
 import importlib
 import pkgutil
-from typing import Dict, List, Any, Optional
+from typing import Dict, Generator, Iterator, List, Any, Optional, Set, Tuple
 
 from flask import Flask, Blueprint, request, jsonify
 import click
 from threading import Thread
 
+from engiyn_core.accounts import provider_accounts, select_account
+from engiyn_core.batch import BatchError, parse_batch, run_batch
+from engiyn_core.catalog import catalog, parse_query
+from engiyn_core.export import DATASETS, MIMETYPE_ARROW_STREAM, export_stream, inventory_sources
+from engiyn_core.fleet import fleet
+from engiyn_core.isolation import (
+    DEFAULT_CALL_TIMEOUT, DEFAULT_WORKERS, PluginProcessPool, PluginWorkerError,
+    pools, request_message, response_headers
+)
+from engiyn_core.policy import ProviderPolicy, ThrottledError
+from engiyn_core.resilience import CircuitOpenError, UpstreamError, guard
+from engiyn_core.scheduler import scheduler
+from engiyn_core.serialization import BridgeJSONProvider, format_info
+from engiyn_core.waiters import PollResult, StatusPoller, pollers
+
 # Configuration paths
 CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.engiyn_cloud_bridge')
 CONFIG_PATH = os.path.join(CONFIG_DIR, 'config.json')
 
+# Bundled Python SDK, importable by plugins when the SDK is not installed
+SDK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-sdk')
+if os.path.isdir(SDK_DIR) and SDK_DIR not in sys.path:
+    sys.path.append(SDK_DIR)
+
+# HTTP methods forwarded to process-isolated plugins
+PROXY_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = BridgeJSONProvider(app)
 
 class Plugin:
     """
@@ -41,6 +65,85 @@ class Plugin:
         """Register CLI commands with the Click group."""
         if hasattr(self.module, 'register_cli'):
             self.module.register_cli(cli_group)
+    
+    @property
+    def lists_servers(self) -> bool:
+        """True if the plugin's provider can list servers for the fleet index."""
+        return hasattr(getattr(self.module, 'provider', None), 'server_pages')
+    
+    def fetch_catalog(self) -> List[Dict[str, Any]]:
+        """Fetch the plugin's normalized instance type catalog."""
+        if not hasattr(self.module, 'fetch_catalog'):
+            return []
+        # Process-isolated plugins run their code on their workers
+        if self.name in pools:
+            return pools[self.name].run_hook('catalog')['offerings']
+        accounts = get_accounts(self.name)
+        if not accounts:
+            return []
+        _, api_key = select_account(accounts, required=False)
+        return self.module.fetch_catalog(api_key)
+    
+    def server_pages(self) -> Iterator[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+        """Yield ``(account, records, error)`` for each page of the plugin's normalized servers."""
+        if not self.lists_servers:
+            return
+        if self.name in pools:
+            yield from (tuple(page) for page in pools[self.name].run_hook('servers')['pages'])
+            return
+        accounts = get_accounts(self.name)
+        if accounts:
+            yield from self.module.provider.server_pages(accounts)
+    
+    def stream_servers(self) -> Generator[List[Dict[str, Any]], None, int]:
+        """
+        Yield the plugin's normalized servers across its accounts, page by
+        page, updating the fleet index as they arrive. Only the ids seen are
+        kept, to drop the servers that are gone at the end. Returns the
+        number of records the listing changed.
+        """
+        if not self.lists_servers:
+            return 0
+        seen: Set[str] = set()
+        failed: Set[str] = set()
+        changed = 0
+        for account, page, error in self.server_pages():
+            if error:
+                print(f"Error listing {self.name} account {account}: {error}")
+                failed.add(account)
+            changed += fleet.put_page(page)
+            seen.update(str(record['id']) for record in page)
+            yield page
+        return changed + self._prune(seen, failed)
+    
+    def _prune(self, seen: Set[str], failed: Set[str]) -> int:
+        """End a listing in the fleet index, keeping the servers of failed accounts."""
+        return fleet.prune(self.name, seen, [name for name in get_accounts(self.name) if name not in failed])
+    
+    def poll_statuses(self) -> PollResult:
+        """Current status of every server, for a status poller in the bridge. Updates the fleet index."""
+        statuses: Dict[str, Any] = {}
+        failed: Set[str] = set()
+        pages = 0
+        for account, page, error in self.server_pages():
+            pages += 1
+            if error:
+                failed.add(account)
+            fleet.put_page(page)
+            statuses.update((str(record['id']), record.get('status')) for record in page)
+        self._prune(set(statuses), failed)
+        return statuses, not failed, pages
+    
+    def refresh_servers(self) -> Tuple[int, int]:
+        """List the plugin's servers into the fleet index, returning the records changed and the pages read."""
+        pages = 0
+        stream = self.stream_servers()
+        while True:
+            try:
+                next(stream)
+            except StopIteration as done:
+                return done.value, pages
+            pages += 1
 
 class PluginLoader:
     """
@@ -72,9 +175,14 @@ class PluginLoader:
             with open(manifest_path, 'r') as f:
                 manifest = json.load(f)
             
-            # Add plugin directory to Python path
-            if plugin_dir not in sys.path:
-                sys.path.insert(0, plugin_dir)
+            # Apply the manifest's performance settings to the plugin's provider calls
+            guard.configure(plugin_name, ProviderPolicy(plugin_name, manifest.get('performance')))
+            
+            # Add plugin directory and its parent to Python path, so both
+            # single-file modules and package plugins can be imported
+            for path in (plugin_dir, os.path.abspath(self.plugins_dir)):
+                if path not in sys.path:
+                    sys.path.insert(0, path)
             
             # Import the module specified in the manifest
             module_name = manifest.get('entrypoint', plugin_name)
@@ -99,6 +207,12 @@ class PluginLoader:
     def register_http_endpoints(self, app: Flask) -> None:
         """Register HTTP endpoints for all loaded plugins."""
         for name, plugin in self.plugins.items():
+            # Plugins that opt into process isolation are served by a worker pool
+            isolation = plugin.manifest.get('isolation', {})
+            if isolation.get('mode') == 'process':
+                self.register_isolated_endpoints(app, plugin, isolation)
+                continue
+            
             # Create a blueprint for each plugin
             bp = Blueprint(name, __name__, url_prefix=f'/plugins/{name}')
             
@@ -108,6 +222,42 @@ class PluginLoader:
             # Register the blueprint with the app
             app.register_blueprint(bp)
     
+    def register_isolated_endpoints(self, app: Flask, plugin: Plugin, isolation: Dict[str, Any]) -> None:
+        """Serve a plugin's HTTP endpoints from a pool of worker processes."""
+        pool = PluginProcessPool(
+            plugin.name,
+            os.path.abspath(self.plugins_dir),
+            workers=isolation.get('workers', DEFAULT_WORKERS),
+            max_concurrency=isolation.get('max_concurrency'),
+            timeout=isolation.get('timeout', DEFAULT_CALL_TIMEOUT)
+        )
+        pool.start()
+        pools[plugin.name] = pool
+        
+        # Waits are parked here, on one poller that lists through the workers, so none holds a worker
+        provider = getattr(plugin.module, 'provider', None)
+        if plugin.lists_servers and hasattr(provider, 'register_wait_http'):
+            poller = pollers[plugin.name] = StatusPoller(plugin.name, plugin.poll_statuses)
+            bp = Blueprint(plugin.name, __name__, url_prefix=f'/plugins/{plugin.name}')
+            provider.register_wait_http(bp, poller)
+            app.register_blueprint(bp)
+        
+        def proxy(subpath: str):
+            """Forward the request to a worker and relay its response."""
+            try:
+                reply = pool.dispatch(request_message(request, request.path))
+            except PluginWorkerError as e:
+                return jsonify({'error': str(e)}), e.status
+            # Creates and deletes on the worker nudge the bridge's scheduler, not the worker's
+            for name in reply.get('nudged', ()):
+                scheduler.nudge(name)
+            return app.response_class(reply['body'], status=reply['status'],
+                                      headers=response_headers(reply))
+        
+        app.add_url_rule(f'/plugins/{plugin.name}/<path:subpath>',
+                         endpoint=f'{plugin.name}_isolated',
+                         view_func=proxy, methods=PROXY_METHODS)
+    
     def register_cli_commands(self, cli: click.Group) -> None:
         """Register CLI commands for all loaded plugins."""
         for name, plugin in self.plugins.items():
@@ -137,6 +287,24 @@ def save_config(config: Dict[str, Any]) -> None:
     with open(CONFIG_PATH, 'w') as f:
         json.dump(config, f, indent=2)
 
+# Parsed config and the modification time of the file it was read from
+_config_cache: Dict[str, Any] = {'mtime': None, 'config': {}}
+
+def cached_config() -> Dict[str, Any]:
+    """Load configuration, re-reading the file only when it has changed."""
+    try:
+        mtime = os.path.getmtime(CONFIG_PATH)
+    except OSError:
+        return load_config()
+    if _config_cache['mtime'] != mtime:
+        _config_cache['config'] = load_config()
+        _config_cache['mtime'] = mtime
+    return _config_cache['config']
+
+def get_accounts(provider: str) -> Dict[str, str]:
+    """Get the named API keys configured for a provider."""
+    return provider_accounts(cached_config(), provider)
+
 # --- License Check (Placeholder) ---
 def check_license() -> Dict[str, str]:
     """Check if the license is valid."""
@@ -171,9 +339,105 @@ def get_status():
     return jsonify({
         'status': 'running',
         'license': check_license(),
-        'config': load_config()
+        'config': load_config(),
+        'serialization': format_info(),
+        'breakers': guard.snapshot(),
+        'catalog': catalog.status(),
+        'isolated_plugins': {name: pool.status() for name, pool in pools.items()},
+        'waiters': {name: poller.status() for name, poller in pollers.items()},
+        'refresh': scheduler.status()
     })
 
+@app.route('/summary', methods=['GET'])
+def get_summary():
+    """Fleet counts by provider, status, region and type, without calling any provider."""
+    return jsonify(fleet.summary())
+
+@app.route('/fleet', methods=['GET'])
+def get_fleet():
+    """Last known normalized servers of every provider, without calling any provider."""
+    version = fleet.version
+    servers = fleet.records(request.args.get('provider') or None)
+    return jsonify({'servers': servers, 'count': len(servers), 'version': version})
+
+@app.route('/refresh', methods=['POST'])
+def refresh_fleet():
+    """List providers' servers into the fleet index now, e.g. for a manual refresh."""
+    provider = request.args.get('provider')
+    names = scheduler.providers()
+    if provider:
+        if provider not in names:
+            return jsonify({'error': f"Provider '{provider}' is not refreshed by the bridge"}), 404
+        names = [provider]
+    for name in names:
+        scheduler.refresh(name)
+    status = scheduler.status()
+    return jsonify({'refresh': {name: status[name] for name in names}, 'version': fleet.version})
+
+@app.route('/batch', methods=['POST'])
+def batch_requests():
+    """Run several bridge requests concurrently and return all responses together."""
+    try:
+        items = parse_batch(request.get_json(silent=True))
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(run_batch(app, items))
+
+@app.route('/export', methods=['GET'])
+def export_dataset():
+    """Stream servers or catalog offerings as an Arrow IPC stream."""
+    dataset = request.args.get('dataset', 'servers')
+    if dataset not in DATASETS:
+        return jsonify({'error': f"Unknown dataset '{dataset}', expected one of: {', '.join(DATASETS)}"}), 400
+    cached = request.args.get('cached', '').lower() in ('1', 'true', 'yes')
+    response = app.response_class(export_stream(dataset, cached), mimetype=MIMETYPE_ARROW_STREAM)
+    response.headers['Content-Disposition'] = f'attachment; filename={dataset}.arrows'
+    return response
+
+@app.route('/catalog/search', methods=['GET'])
+def search_catalog():
+    """Search instance types across all providers, cheapest first."""
+    try:
+        offerings = catalog.search(**parse_query(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'offerings': offerings,
+        'count': len(offerings),
+        'currencies': sorted({o['currency'] for o in offerings}),
+        'updated_at': catalog.updated_at
+    })
+
+def handle_circuit_open(e: CircuitOpenError):
+    """Fail fast while a provider's circuit breaker is open."""
+    response = jsonify({'error': str(e), 'breaker': e.name})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+    return response
+
+def handle_throttled(e: ThrottledError):
+    """Reject calls that exceed a plugin's manifest limits."""
+    response = jsonify({'error': str(e), 'limit': e.name})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+    return response
+
+def handle_upstream_error(e: UpstreamError):
+    """Relay an HTTP error answered by a provider."""
+    response = jsonify({'error': str(e), 'provider': e.name, 'upstream_status': e.upstream_status})
+    response.status_code = e.status
+    if e.retry_after is not None:
+        response.headers['Retry-After'] = str(int(e.retry_after))
+    return response
+
+def register_error_handlers(flask_app: Flask) -> None:
+    """Answer provider guard errors with their HTTP status, on the bridge and on plugin workers alike."""
+    flask_app.register_error_handler(CircuitOpenError, handle_circuit_open)
+    flask_app.register_error_handler(ThrottledError, handle_throttled)
+    flask_app.register_error_handler(UpstreamError, handle_upstream_error)
+
+register_error_handlers(app)
+
 # --- CLI Onboarding (first run) ---
 def onboarding():
     """Run first-time onboarding if needed."""
@@ -212,11 +476,55 @@ def cli():
     """Engiyn Cloud Bridge CLI."""
     pass
 
+@cli.command('catalog')
+@click.option('--vcpu', type=float, default=0, help='Minimum vCPUs')
+@click.option('--ram', type=float, default=0, help='Minimum RAM in GB')
+@click.option('--disk', type=float, default=0, help='Minimum disk in GB')
+@click.option('--max-price', type=float, default=None, help='Maximum monthly price')
+@click.option('--region', default=None, help='Region the instance type must be offered in')
+@click.option('--provider', default=None, help='Only search this provider')
+@click.option('--currency', default=None, help='Only offerings priced in this currency, e.g. EUR')
+@click.option('--sort', default='price', help='Sort by price, vcpu, ram or disk (prefix - for descending)')
+@click.option('--limit', type=int, default=10, help='Maximum results')
+def catalog_cmd(vcpu, ram, disk, max_price, region, provider, currency, sort, limit):
+    """Find the cheapest instance types that fit."""
+    if catalog.updated_at is None:
+        catalog.refresh()
+    
+    try:
+        offerings = catalog.search(vcpu, ram, disk, max_price, region, provider, sort, limit, currency)
+    except ValueError as e:
+        click.echo(f'Error: {e}')
+        return
+    
+    if not offerings:
+        click.echo('No matching instance types found')
+    for o in offerings:
+        click.echo(f"{o['provider']} {o['id']} - {o['vcpu']} vCPU, {o['ram_gb']:g} GB RAM, "
+                   f"{o['disk_gb']:g} GB disk - {o['price_monthly']:.2f} {o['currency']}/mo")
+
+@cli.command('export')
+@click.argument('dataset', type=click.Choice(list(DATASETS)), default='servers')
+@click.option('--output', '-o', default=None, help='File to write (default: <dataset>.arrows)')
+@click.option('--cached', is_flag=True, help="Export the bridge's last known servers instead of listing them")
+def export_cmd(dataset, output, cached):
+    """Export servers or catalog offerings as an Arrow IPC stream."""
+    output = output or f'{dataset}.arrows'
+    size = 0
+    with open(output, 'wb') as f:
+        for chunk in export_stream(dataset, cached):
+            f.write(chunk)
+            size += len(chunk)
+    click.echo(f'Exported {dataset} to {output} ({size} bytes)')
+
 def initialize():
     """Initialize the cloud bridge."""
     # Load environment variables
     load_env_local()
     
+    # Hedge idempotent provider reads if enabled in the config
+    guard.hedging = bool(load_config().get('HEDGED_REQUESTS', False))
+    
     # Load plugins
     plugin_loader = PluginLoader()
     plugins = plugin_loader.load_all_plugins()
@@ -227,6 +535,15 @@ def initialize():
     # Register CLI commands
     plugin_loader.register_cli_commands(cli)
     
+    # Providers listed by exports
+    inventory_sources.update({name: plugin.stream_servers for name, plugin in plugins.items() if plugin.lists_servers})
+    
+    # Keep every provider's servers fresh, refreshing busy fleets more often
+    scheduler.start({name: plugin.refresh_servers for name, plugin in plugins.items() if plugin.lists_servers})
+    
+    # Keep the cross-provider catalog index fresh in the background
+    catalog.start({name: plugin.fetch_catalog for name, plugin in plugins.items()})
+    
     print(f"Loaded {len(plugins)} plugins: {', '.join(plugins.keys())}")
 
 if __name__ == '__main__':
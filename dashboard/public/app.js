@@ -29,8 +29,12 @@ const cancelBtnEl = document.querySelector('.cancel');
 // Chart instance
 let serversChart = null;
 
-// Current monitoring data
+// Current monitoring data and the version it was built from
 let currentData = null;
+let currentVersion = null;
+
+// Rendered table rows by server, reused until a delta touches the server
+const serverRows = new Map();
 
 // Initialize the dashboard
 function initDashboard() {
@@ -54,24 +58,54 @@ function initDashboard() {
     updateEngiynStatus(false);
   });
   
-  socket.on('monitoring-data', (data) => {
-    console.log('Received monitoring data:', data);
+  // The server sends a snapshot on connect, then only deltas
+  socket.on('monitoring-snapshot', ({ version, data }) => {
+    console.log(`Received monitoring snapshot v${version}`);
+    currentVersion = version;
     updateDashboard(data);
   });
   
-  // Initial data fetch
-  fetchData();
+  socket.on('monitoring-delta', applyDelta);
 }
 
-// Fetch data from the API
-async function fetchData() {
-  try {
-    const response = await fetch('/api/monitoring-data');
-    const data = await response.json();
-    updateDashboard(data);
-  } catch (error) {
-    console.error('Error fetching data:', error);
-    updateEngiynStatus(false);
+// Apply a delta from the server, updating only the parts of the page it touches
+function applyDelta({ from, version, ops }) {
+  if (!currentData || from !== currentVersion) {
+    // Missed an update: start over from a fresh snapshot
+    socket.emit('snapshot-request');
+    return;
+  }
+  
+  // Operations address servers by index, which the operations before them may shift,
+  // so note the rows each one touches as it is applied
+  const changedRows = new Set();
+  ops.forEach(op => {
+    if (op.op !== 'add') {
+      collectServerRows(currentData, op.path, changedRows);
+    }
+    currentData = EngiynDelta.applyPatch(currentData, [op]);
+    if (op.op !== 'remove') {
+      collectServerRows(currentData, op.path, changedRows);
+    }
+  });
+  currentVersion = version;
+  
+  const changed = new Set(ops.map(op => op.path.split('/')[1]));
+  if (changed.has('lastUpdate') && currentData.lastUpdate) {
+    lastUpdateEl.textContent = formatDate(currentData.lastUpdate);
+  }
+  if (changed.has('summary') || changed.has('servers') || changed.has('providers')) {
+    updateTotals(currentData);
+    updateProvidersList(currentData);
+  }
+  if (changed.has('servers')) {
+    updateServersTable(currentData, changedRows);
+  }
+  if (changed.has('history')) {
+    updateServersChart(currentData);
+  }
+  if (changed.has('providers')) {
+    updateProviderFilter(currentData.providers || []);
   }
 }
 
@@ -104,30 +138,45 @@ function updateEngiynStatus(isRunning) {
   }
 }
 
+// Add the keys of the server rows under a patch path in data to rows
+function collectServerRows(data, path, rows) {
+  const tokens = path.split('/').slice(1).map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'));
+  if (tokens.length && tokens[0] !== 'servers') return;
+  
+  const servers = (data && data.servers) || {};
+  const providers = tokens.length > 1 ? [tokens[1]] : Object.keys(servers);
+  providers.forEach(provider => {
+    const list = servers[provider] || [];
+    const touched = tokens.length > 2 ? [list[Number(tokens[2])]] : list;
+    touched.forEach(server => {
+      if (server) {
+        rows.add(serverKey(provider, server));
+      }
+    });
+  });
+}
+
+// Key of a server's table row
+function serverKey(provider, server) {
+  return `${provider}:${server.id}`;
+}
+
 // Update the dashboard with new data
 function updateDashboard(data) {
   if (!data) return;
   
   currentData = data;
   
+  // A snapshot replaces everything, so no rendered row can be trusted
+  serverRows.clear();
+  
   // Update status bar
   if (data.lastUpdate) {
     lastUpdateEl.textContent = formatDate(data.lastUpdate);
   }
   
-  // Count total and active servers
-  let totalServers = 0;
-  let activeServers = 0;
-  
-  Object.values(data.servers || {}).forEach(providerServers => {
-    totalServers += providerServers.length;
-    activeServers += providerServers.filter(server => 
-      ['running', 'active'].includes(server.status.toLowerCase())
-    ).length;
-  });
-  
-  totalServersEl.textContent = totalServers;
-  activeServersEl.textContent = activeServers;
+  // Update server counts
+  updateTotals(data);
   
   // Update providers list
   updateProvidersList(data);
@@ -142,6 +191,13 @@ function updateDashboard(data) {
   updateProviderFilter(data.providers || []);
 }
 
+// Count total and active servers from the bridge's fleet summary
+function updateTotals(data) {
+  const totals = fleetCounts(data);
+  totalServersEl.textContent = totals.total;
+  activeServersEl.textContent = totals.active;
+}
+
 // Update the providers list
 function updateProvidersList(data) {
   if (!data.providers || !data.servers) return;
@@ -149,10 +205,7 @@ function updateProvidersList(data) {
   providersListEl.innerHTML = '';
   
   data.providers.forEach(provider => {
-    const servers = data.servers[provider] || [];
-    const activeServers = servers.filter(server => 
-      ['running', 'active'].includes(server.status.toLowerCase())
-    ).length;
+    const counts = fleetCounts(data, provider);
     
     const providerItem = document.createElement('div');
     providerItem.className = 'provider-item';
@@ -161,7 +214,7 @@ function updateProvidersList(data) {
       <div class="provider-info">
         <div class="provider-name">${capitalizeFirstLetter(provider)}</div>
         <div class="provider-stats">
-          ${servers.length} servers (${activeServers} active)
+          ${counts.total} servers (${counts.active} active)
         </div>
       </div>
     `;
@@ -174,8 +227,28 @@ function updateProvidersList(data) {
   }
 }
 
-// Update the servers table
-function updateServersTable(data) {
+// Total and active server counts, overall or for one provider
+function fleetCounts(data, provider) {
+  const summary = data.summary;
+  if (summary) {
+    const byStatus = provider ? summary.by_provider?.[provider]?.by_status || {} : summary.by_status || {};
+    const total = provider ? summary.by_provider?.[provider]?.total || 0 : summary.total || 0;
+    return { total, active: (byStatus.running || 0) + (byStatus.active || 0) };
+  }
+  
+  // Older bridges without /summary: count the servers we have
+  const lists = provider ? [data.servers[provider] || []] : Object.values(data.servers || {});
+  let total = 0;
+  let active = 0;
+  lists.forEach(servers => {
+    total += servers.length;
+    active += servers.filter(server => ['running', 'active'].includes(server.status.toLowerCase())).length;
+  });
+  return { total, active };
+}
+
+// Update the servers table, rebuilding only the rows of new servers and of those in changedRows
+function updateServersTable(data, changedRows) {
   if (!data.servers) return;
   
   // Get current filter values
@@ -208,48 +281,84 @@ function updateServersTable(data) {
     });
   }
   
-  // Clear table
-  serversTbodyEl.innerHTML = '';
-  
-  // Add rows
+  // Show a placeholder when nothing matches
   if (allServers.length === 0) {
+    serverRows.clear();
     serversTbodyEl.innerHTML = '<tr><td colspan="7" class="loading">No servers found</td></tr>';
     return;
   }
   
+  // Reuse the rows of unchanged servers, building rows only for new or changed ones
+  const keep = new Set();
+  let position = serversTbodyEl.firstChild;
   allServers.forEach(server => {
-    const row = document.createElement('tr');
-    
-    // Determine status class
-    let statusClass = 'status-unknown';
-    const status = server.status.toLowerCase();
-    if (['running', 'active'].includes(status)) {
-      statusClass = 'status-running';
-    } else if (['starting', 'provisioning'].includes(status)) {
-      statusClass = 'status-starting';
-    } else if (['stopped', 'off'].includes(status)) {
-      statusClass = 'status-stopped';
+    const key = serverKey(server.provider, server);
+    let entry = serverRows.get(key);
+    if (!entry || (changedRows && changedRows.has(key))) {
+      if (entry) {
+        if (entry.row === position) {
+          position = position.nextSibling;
+        }
+        entry.row.remove();
+      }
+      entry = { row: createServerRow(server) };
+      serverRows.set(key, entry);
     }
+    keep.add(key);
     
-    row.innerHTML = `
-      <td>${server.name}</td>
-      <td>${capitalizeFirstLetter(server.provider)}</td>
-      <td><span class="status-badge ${statusClass}">${server.status}</span></td>
-      <td>${server.ip || 'N/A'}</td>
-      <td>${server.type || 'N/A'}</td>
-      <td>${server.location || 'N/A'}</td>
-      <td class="server-actions">
-        <button class="view-btn" data-id="${server.id}" data-provider="${server.provider}">View</button>
-        <button class="danger delete-btn" data-id="${server.id}" data-provider="${server.provider}">Delete</button>
-      </td>
-    `;
-    
-    // Add event listeners to buttons
-    row.querySelector('.view-btn').addEventListener('click', () => viewServer(server));
-    row.querySelector('.delete-btn').addEventListener('click', () => deleteServer(server));
-    
-    serversTbodyEl.appendChild(row);
+    if (entry.row === position) {
+      position = position.nextSibling;
+    } else {
+      serversTbodyEl.insertBefore(entry.row, position);
+    }
   });
+  
+  // Everything after the last placed row is a server that is gone or filtered out, or the placeholder
+  while (position) {
+    const next = position.nextSibling;
+    position.remove();
+    position = next;
+  }
+  serverRows.forEach((entry, key) => {
+    if (!keep.has(key)) {
+      serverRows.delete(key);
+    }
+  });
+}
+
+// Build the table row for a server
+function createServerRow(server) {
+  const row = document.createElement('tr');
+  
+  // Determine status class
+  let statusClass = 'status-unknown';
+  const status = server.status.toLowerCase();
+  if (['running', 'active'].includes(status)) {
+    statusClass = 'status-running';
+  } else if (['starting', 'provisioning'].includes(status)) {
+    statusClass = 'status-starting';
+  } else if (['stopped', 'off'].includes(status)) {
+    statusClass = 'status-stopped';
+  }
+  
+  row.innerHTML = `
+    <td>${server.name}</td>
+    <td>${capitalizeFirstLetter(server.provider)}</td>
+    <td><span class="status-badge ${statusClass}">${server.status}</span></td>
+    <td>${server.ip || 'N/A'}</td>
+    <td>${server.type || 'N/A'}</td>
+    <td>${server.location || 'N/A'}</td>
+    <td class="server-actions">
+      <button class="view-btn" data-id="${server.id}" data-provider="${server.provider}">View</button>
+      <button class="danger delete-btn" data-id="${server.id}" data-provider="${server.provider}">Delete</button>
+    </td>
+  `;
+  
+  // Add event listeners to buttons
+  row.querySelector('.view-btn').addEventListener('click', () => viewServer(server));
+  row.querySelector('.delete-btn').addEventListener('click', () => deleteServer(server));
+  
+  return row;
 }
 
 // Update the servers chart
@@ -294,12 +403,15 @@ function updateServersChart(data) {
     ? data.history[providers[0]].map(entry => formatChartDate(entry.timestamp))
     : [];
   
-  // Destroy existing chart if it exists
+  // Update the existing chart in place
   if (serversChart) {
-    serversChart.destroy();
+    serversChart.data.labels = labels;
+    serversChart.data.datasets = datasets;
+    serversChart.update();
+    return;
   }
   
-  // Create new chart
+  // Create the chart
   serversChart = new Chart(ctx, {
     type: 'line',
     data: {
@@ -490,7 +602,7 @@ async function deleteServer(server) {
       headers: {
         'Content-Type': 'application/json'
       },
-      body: JSON.stringify({ server_id: server.id })
+      body: JSON.stringify({ server_id: server.id, account: server.account })
     });
     
     const result = await response.json();
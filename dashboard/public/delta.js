@@ -0,0 +1,157 @@
+/**
+ * Engiyn Dashboard - State Deltas
+ *
+ * JSON-patch-style differences between two versions of the dashboard state.
+ * The dashboard server computes them and browsers apply them, so both load
+ * this file (as a Node module and as a plain script exposing EngiynDelta).
+ * Operations are the add, remove and replace subset of RFC 6902.
+ */
+
+(function (root, factory) {
+  if (typeof module === 'object' && module.exports) {
+    module.exports = factory();
+  } else {
+    root.EngiynDelta = factory();
+  }
+}(typeof self !== 'undefined' ? self : this, function () {
+  function isPlainObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value);
+  }
+
+  // Deep equality for JSON values
+  function equal(a, b) {
+    if (a === b) return true;
+    if (Array.isArray(a)) {
+      return Array.isArray(b) && a.length === b.length && a.every((item, i) => equal(item, b[i]));
+    }
+    if (isPlainObject(a) && isPlainObject(b)) {
+      const keys = Object.keys(a);
+      return keys.length === Object.keys(b).length &&
+        keys.every(key => Object.prototype.hasOwnProperty.call(b, key) && equal(a[key], b[key]));
+    }
+    return false;
+  }
+
+  // Deep copy of a JSON value
+  function clone(value) {
+    return value === undefined ? undefined : JSON.parse(JSON.stringify(value));
+  }
+
+  function escapeToken(key) {
+    return String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+  }
+
+  function unescapeToken(token) {
+    return token.replace(/~1/g, '/').replace(/~0/g, '~');
+  }
+
+  function diffObject(prev, next, path, ops) {
+    Object.keys(prev).forEach(key => {
+      if (!Object.prototype.hasOwnProperty.call(next, key)) {
+        ops.push({ op: 'remove', path: `${path}/${escapeToken(key)}` });
+      }
+    });
+    Object.keys(next).forEach(key => {
+      const childPath = `${path}/${escapeToken(key)}`;
+      if (!Object.prototype.hasOwnProperty.call(prev, key)) {
+        ops.push({ op: 'add', path: childPath, value: next[key] });
+      } else {
+        diffValue(prev[key], next[key], childPath, ops);
+      }
+    });
+  }
+
+  function diffArray(prev, next, path, ops) {
+    // Skip the unchanged head and tail
+    let start = 0;
+    while (start < prev.length && start < next.length && equal(prev[start], next[start])) {
+      start++;
+    }
+    let prevEnd = prev.length;
+    let nextEnd = next.length;
+    while (prevEnd > start && nextEnd > start && equal(prev[prevEnd - 1], next[nextEnd - 1])) {
+      prevEnd--;
+      nextEnd--;
+    }
+
+    // Items dropped from the front of the changed range, e.g. a sliding history window
+    let dropped = 0;
+    if (nextEnd > start) {
+      dropped = Math.max(prev.slice(start, prevEnd).findIndex(item => equal(item, next[start])), 0);
+    }
+    for (let i = 0; i < dropped; i++) {
+      ops.push({ op: 'remove', path: `${path}/${start}` });
+    }
+
+    // Indexes below refer to the array as already patched by the ops before them
+    const from = start + dropped;
+    const common = Math.min(prevEnd - from, nextEnd - start);
+    for (let i = 0; i < common; i++) {
+      diffValue(prev[from + i], next[start + i], `${path}/${start + i}`, ops);
+    }
+    for (let i = from + common; i < prevEnd; i++) {
+      ops.push({ op: 'remove', path: `${path}/${start + common}` });
+    }
+    for (let i = start + common; i < nextEnd; i++) {
+      ops.push({ op: 'add', path: `${path}/${i}`, value: next[i] });
+    }
+  }
+
+  function diffValue(prev, next, path, ops) {
+    if (equal(prev, next)) return;
+    if (Array.isArray(prev) && Array.isArray(next)) {
+      diffArray(prev, next, path, ops);
+    } else if (isPlainObject(prev) && isPlainObject(next)) {
+      diffObject(prev, next, path, ops);
+    } else {
+      ops.push({ op: 'replace', path, value: next });
+    }
+  }
+
+  /**
+   * Operations that turn one state into another
+   * @param {*} prev Previous state
+   * @param {*} next New state
+   * @returns {Array<Object>} Patch operations ({ op, path, value })
+   */
+  function diff(prev, next) {
+    const ops = [];
+    diffValue(prev, next, '', ops);
+    return ops;
+  }
+
+  /**
+   * Apply patch operations to a state in place
+   * @param {*} doc State to patch
+   * @param {Array<Object>} ops Operations from diff()
+   * @returns {*} The patched state (a new value if the root was replaced)
+   */
+  function applyPatch(doc, ops) {
+    ops.forEach(({ op, path, value }) => {
+      if (path === '') {
+        doc = value;
+        return;
+      }
+      const tokens = path.split('/').slice(1).map(unescapeToken);
+      const key = tokens.pop();
+      const parent = tokens.reduce((node, token) => node[token], doc);
+      if (Array.isArray(parent)) {
+        const index = Number(key);
+        if (op === 'add') {
+          parent.splice(index, 0, value);
+        } else if (op === 'remove') {
+          parent.splice(index, 1);
+        } else {
+          parent[index] = value;
+        }
+      } else if (op === 'remove') {
+        delete parent[key];
+      } else {
+        parent[key] = value;
+      }
+    });
+    return doc;
+  }
+
+  return { diff, applyPatch, clone, equal };
+}));
@@ -10,14 +10,14 @@ const http = require('http');
 const socketIo = require('socket.io');
 const path = require('path');
 const axios = require('axios');
-const cron = require('node-cron');
 const { spawn } = require('child_process');
 const fs = require('fs');
+const delta = require('./public/delta');
 
 // Configuration
 const PORT = process.env.PORT || 3000;
 const ENGIYN_API_URL = 'http://localhost:5005';
-const CHECK_INTERVAL = '*/1 * * * *'; // Every minute
+const SUMMARY_POLL_INTERVAL = 5000; // Milliseconds between fleet version checks
 
 // Initialize Express
 const app = express();
@@ -93,98 +93,98 @@ async function fetchCloudProviders() {
   }
 }
 
-// Function to fetch servers for a provider
-async function fetchServers(provider) {
+// Function to fetch fleet counts, maintained by the bridge as servers change
+async function fetchSummary() {
   try {
-    const response = await axios.get(`${ENGIYN_API_URL}/plugins/${provider}/servers`);
+    const response = await axios.get(`${ENGIYN_API_URL}/summary`);
     return response.data;
   } catch (error) {
-    console.error(`Error fetching servers for ${provider}:`, error.message);
-    return { error: error.message };
+    console.error('Error fetching fleet summary:', error.message);
+    return null;
   }
 }
 
+// Function to fetch the bridge's last known servers of every provider
+async function fetchFleet() {
+  try {
+    const response = await axios.get(`${ENGIYN_API_URL}/fleet`);
+    return response.data.servers || [];
+  } catch (error) {
+    console.error('Error fetching fleet:', error.message);
+    return null;
+  }
+}
+
+// Count of servers in a running state, from a provider's status counts
+function activeCount(byStatus) {
+  return ['running', 'active'].reduce((sum, status) => sum + (byStatus[status] || 0), 0);
+}
+
 // Function to update monitoring data
-async function updateMonitoringData() {
+async function updateMonitoringData(summary) {
   console.log('Updating monitoring data...');
   
   // Ensure Engiyn server is running
   const serverRunning = await ensureEngiynServerRunning();
   if (!serverRunning) {
     console.error('Cannot update monitoring data: Engiyn server is not running');
-    return;
+    return false;
   }
   
   // Fetch cloud providers
   const providers = await fetchCloudProviders();
   monitoringData.providers = providers;
   
-  // Fetch servers for each provider
+  // The bridge refreshes every provider itself, so this reads its fleet index without calling any provider
+  const fleet = await fetchFleet();
+  if (!fleet) {
+    return false;
+  }
+  
   for (const provider of providers) {
-    const serverData = await fetchServers(provider);
-    
-    // Extract server data based on provider
-    let servers = [];
-    if (provider === 'hetzner' && serverData.servers) {
-      servers = serverData.servers.map(s => ({
+    monitoringData.servers[provider] = fleet
+      .filter(s => s.provider === provider)
+      .map(s => ({
         id: s.id,
         name: s.name,
         status: s.status,
         provider,
-        ip: s.public_net?.ipv4?.ip || 'N/A',
+        account: s.account,
+        ip: s.ip || 'N/A',
         created: s.created,
-        type: s.server_type,
-        location: s.datacenter?.location?.name || 'Unknown'
-      }));
-    } else if (provider === 'digitalocean' && serverData.droplets) {
-      servers = serverData.droplets.map(s => ({
-        id: s.id,
-        name: s.name,
-        status: s.status,
-        provider,
-        ip: s.networks?.v4?.[0]?.ip_address || 'N/A',
-        created: s.created_at,
-        type: s.size_slug,
-        location: s.region?.name || 'Unknown'
-      }));
-    } else if (provider === 'vultr' && serverData.instances) {
-      servers = serverData.instances.map(s => ({
-        id: s.id,
-        name: s.label,
-        status: s.status,
-        provider,
-        ip: s.main_ip || 'N/A',
-        created: s.date_created,
-        type: s.plan,
+        type: s.type,
         location: s.region || 'Unknown'
       }));
-    }
-    
-    // Update server data
-    monitoringData.servers[provider] = servers;
-    
-    // Update history
-    const timestamp = new Date().toISOString();
+  }
+  
+  // Counts come from the bridge's fleet summary instead of walking every server
+  summary = summary || await fetchSummary();
+  monitoringData.summary = summary;
+  
+  // Update history
+  const timestamp = new Date().toISOString();
+  for (const provider of providers) {
+    const counts = summary?.by_provider?.[provider];
     if (!monitoringData.history[provider]) {
       monitoringData.history[provider] = [];
     }
     
-    // Keep only the last 24 data points (24 hours if checking hourly)
+    // Keep only the last 24 data points, one per fleet change
     if (monitoringData.history[provider].length >= 24) {
       monitoringData.history[provider].shift();
     }
     
     monitoringData.history[provider].push({
       timestamp,
-      serverCount: servers.length,
-      activeCount: servers.filter(s => ['running', 'active'].includes(s.status.toLowerCase())).length
+      serverCount: counts ? counts.total : monitoringData.servers[provider].length,
+      activeCount: counts ? activeCount(counts.by_status) : 0
     });
   }
   
   monitoringData.lastUpdate = new Date().toISOString();
   
-  // Emit updated data to all connected clients
-  io.emit('monitoring-data', monitoringData);
+  // Send connected clients only what changed
+  publishMonitoringData();
   
   // Save data to disk for persistence
   fs.writeFileSync(
@@ -193,6 +193,31 @@ async function updateMonitoringData() {
   );
   
   console.log('Monitoring data updated successfully');
+  return true;
+}
+
+// Version of the data last sent to clients, and a copy of it to diff against
+const published = {
+  version: 0,
+  data: null
+};
+
+// Broadcast the changes since the last published version as patch operations
+function publishMonitoringData() {
+  const data = delta.clone(monitoringData);
+  const ops = delta.diff(published.data, data);
+  if (ops.length === 0) {
+    return;
+  }
+  
+  io.emit('monitoring-delta', { from: published.version, version: published.version + 1, ops });
+  published.version += 1;
+  published.data = data;
+}
+
+// Send the full published state to one client
+function sendSnapshot(socket) {
+  socket.emit('monitoring-snapshot', { version: published.version, data: published.data });
 }
 
 // Load data from disk if available
@@ -206,25 +231,67 @@ try {
   console.error('Error loading monitoring data from disk:', error.message);
 }
 
-// Schedule regular updates
-cron.schedule(CHECK_INTERVAL, updateMonitoringData);
+published.data = delta.clone(monitoringData);
+
+// Fleet version the monitoring data was last updated for
+let followedVersion = null;
+
+// Follow the bridge's fleet version. The bridge decides how often each provider
+// is refreshed, so an unchanged fleet costs one in-memory summary per check.
+async function followFleet() {
+  try {
+    const summary = await fetchSummary();
+    if (!summary) {
+      await ensureEngiynServerRunning();
+    } else if (summary.version !== followedVersion && await updateMonitoringData(summary)) {
+      followedVersion = summary.version;
+    }
+  } catch (error) {
+    console.error('Error following fleet:', error.message);
+  }
+  setTimeout(followFleet, SUMMARY_POLL_INTERVAL);
+}
 
 // API Routes
 app.get('/api/monitoring-data', (req, res) => {
   res.json(monitoringData);
 });
 
+// Have the bridge list providers now, instead of re-reading its fleet index as it was
+async function refreshFleet(provider) {
+  try {
+    const response = await axios.post(`${ENGIYN_API_URL}/refresh`, null, {
+      params: provider ? { provider } : {}
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error refreshing fleet:', error.message);
+    return null;
+  }
+}
+
 app.post('/api/refresh', async (req, res) => {
-  await updateMonitoringData();
-  res.json({ success: true });
+  const provider = req.body?.provider || req.query.provider;
+  const refreshed = await refreshFleet(provider);
+  const summary = await fetchSummary();
+  const updated = await updateMonitoringData(summary);
+  if (updated && summary) {
+    followedVersion = summary.version;
+  }
+  res.json({ success: Boolean(refreshed) && updated, refresh: refreshed ? refreshed.refresh : null });
 });
 
 // Socket.IO connection handling
 io.on('connection', (socket) => {
   console.log('Client connected');
   
-  // Send current data to the new client
-  socket.emit('monitoring-data', monitoringData);
+  // Send the full state once; after that the client only receives deltas
+  sendSnapshot(socket);
+  
+  // Clients that missed a version ask for a fresh snapshot
+  socket.on('snapshot-request', () => {
+    sendSnapshot(socket);
+  });
   
   socket.on('disconnect', () => {
     console.log('Client disconnected');
@@ -235,6 +302,6 @@ io.on('connection', (socket) => {
 server.listen(PORT, () => {
   console.log(`Dashboard server running on http://localhost:${PORT}`);
   
-  // Initial data update
-  updateMonitoringData();
+  // Update whenever the bridge's fleet changes
+  followFleet();
 });
@@ -0,0 +1,186 @@
+"""
+Engiyn Cloud Bridge - Provider Accounts
+
+Resolves the named accounts configured for each provider and fans list/get
+calls out across them concurrently, tagging every record with its account.
+Lists can also be streamed page by page as each account's pages arrive.
+
+Accounts are read from the bridge config::
+
+    {
+      "HETZNER_API_KEY": "...",                      # legacy, becomes "default"
+      "HETZNER_ACCOUNTS": {"project-a": "...", "project-b": "..."}
+    }
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_ACCOUNT = 'default'
+
+# Upper bound on concurrent upstream calls made by a single fan-out
+MAX_FANOUT_WORKERS = 16
+
+# Pages a stream buffers ahead of a slow reader; account reads wait beyond it
+STREAM_BUFFER_PAGES = 8
+
+_executor = ThreadPoolExecutor(max_workers=MAX_FANOUT_WORKERS,
+                               thread_name_prefix='engiyn-fanout')
+
+class AccountError(Exception):
+    """Raised when a call cannot be routed to a single provider account."""
+
+def provider_accounts(config: Dict[str, Any], provider: str) -> Dict[str, str]:
+    """Return the configured ``{account_name: api_key}`` map for a provider."""
+    prefix = provider.upper()
+    accounts = dict(config.get(f'{prefix}_ACCOUNTS') or {})
+    legacy_key = config.get(f'{prefix}_API_KEY')
+    if legacy_key and DEFAULT_ACCOUNT not in accounts:
+        accounts[DEFAULT_ACCOUNT] = legacy_key
+    return {name: key for name, key in accounts.items() if key}
+
+def select_account(accounts: Dict[str, str], name: Optional[str] = None,
+                   required: bool = True) -> Tuple[str, str]:
+    """
+    Pick the account a call should be routed to.
+
+    An explicit ``name`` wins, then the default account, then the only
+    account. When several accounts are configured and none is named, raise
+    :class:`AccountError` unless ``required`` is False, in which case any
+    account is used (e.g. for catalog reads that are the same everywhere).
+    """
+    if name:
+        if name not in accounts:
+            raise AccountError(f"Unknown account '{name}'")
+        return name, accounts[name]
+    if DEFAULT_ACCOUNT in accounts:
+        return DEFAULT_ACCOUNT, accounts[DEFAULT_ACCOUNT]
+    if len(accounts) == 1 or (accounts and not required):
+        return next(iter(accounts.items()))
+    raise AccountError(f"Multiple accounts configured, specify one of: {', '.join(sorted(accounts))}")
+
+def error_message(result: Any) -> str:
+    """Extract an error message from a provider response body."""
+    if isinstance(result, dict):
+        error = result.get('error')
+        if isinstance(error, dict):
+            return error.get('message', 'Unknown error')
+        if error:
+            return str(error)
+        if result.get('message'):
+            return str(result['message'])
+    return 'Unexpected response'
+
+def fan_out(accounts: Dict[str, str], call: Callable[..., Any], collection: str,
+            *args: Any) -> Dict[str, Any]:
+    """
+    Call ``call(api_key, *args)`` for every account concurrently and merge
+    the ``collection`` lists of the responses.
+
+    Each record is tagged with an ``account`` field. Accounts that fail are
+    reported under ``errors`` rather than failing the whole call.
+    """
+    futures = {name: _executor.submit(call, key, *args) for name, key in accounts.items()}
+
+    merged: Dict[str, Any] = {collection: [], 'accounts': list(accounts)}
+    errors: Dict[str, str] = {}
+    for name, future in futures.items():
+        try:
+            result = future.result()
+        except Exception as e:
+            errors[name] = str(e)
+            continue
+
+        items = result.get(collection) if isinstance(result, dict) else None
+        if items is None:
+            errors[name] = error_message(result)
+            continue
+        for item in items:
+            item['account'] = name
+        merged[collection].extend(items)
+
+    if errors:
+        merged['errors'] = errors
+    return merged
+
+def stream_across(accounts: Dict[str, str], pages: Callable[[str], Iterable[Any]],
+                  collection: str) -> Iterator[Tuple[str, List[Any], Optional[str]]]:
+    """
+    Read ``pages(api_key)`` for every account concurrently, yielding
+    ``(account_name, items, error)`` as soon as each page arrives.
+
+    Items are the page's ``collection`` list, tagged with their account like
+    :func:`fan_out`. An account that fails yields one final entry with no
+    items and an ``error``; the pages it returned before failing have
+    already been yielded. At most :data:`STREAM_BUFFER_PAGES` pages are held
+    ahead of the reader, so a slow reader slows the reads instead of the
+    stream piling up in memory. Reads stop once the reader closes the stream.
+    """
+    results: 'queue.Queue[Tuple[str, Optional[List[Any]], Optional[str]]]' = queue.Queue(STREAM_BUFFER_PAGES)
+    closed = threading.Event()
+
+    def put(entry: Tuple[str, Optional[List[Any]], Optional[str]]) -> bool:
+        while not closed.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(name: str, api_key: str) -> None:
+        try:
+            for body in pages(api_key):
+                items = body.get(collection) if isinstance(body, dict) else None
+                if items is None:
+                    put((name, [], error_message(body)))
+                    return
+                for item in items:
+                    item['account'] = name
+                if not put((name, items, None)):
+                    return
+        except Exception as e:
+            put((name, [], str(e)))
+        finally:
+            # Marks the end of this account's pages
+            put((name, None, None))
+
+    for name, api_key in accounts.items():
+        _executor.submit(read, name, api_key)
+
+    remaining = len(accounts)
+    try:
+        while remaining:
+            name, items, error = results.get()
+            if items is None:
+                remaining -= 1
+                continue
+            yield name, items, error
+    finally:
+        closed.set()
+
+def find_across(accounts: Dict[str, str], call: Callable[..., Any], key: str,
+                *args: Any) -> Tuple[Optional[str], Any]:
+    """
+    Call ``call(api_key, *args)`` for every account concurrently and return
+    ``(account_name, response)`` for the first response holding ``key``.
+
+    Used to look up a single resource when its owning account is unknown.
+    If no account has it, the first response is returned with no account.
+    """
+    futures = {name: _executor.submit(call, api_key, *args) for name, api_key in accounts.items()}
+
+    fallback: Any = None
+    for name, future in futures.items():
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'error': str(e)}
+        if isinstance(result, dict) and isinstance(result.get(key), dict):
+            result[key]['account'] = name
+            return name, result
+        if fallback is None:
+            fallback = result
+    return None, fallback
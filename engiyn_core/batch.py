@@ -0,0 +1,120 @@
+"""
+Engiyn Cloud Bridge - Batch Requests
+
+Runs several bridge requests in one round trip. Each sub-request is
+dispatched through the bridge's own WSGI app on a worker thread, so it gets
+exactly the routing, plugin handlers and error responses of a direct call,
+and the batch takes about as long as its slowest item.
+
+A batch is posted as::
+
+    {"requests": [
+      {"id": "plugins", "method": "GET", "path": "/plugins"},
+      {"method": "POST", "path": "/plugins/hetzner/servers/create", "body": {"name": "web-1"}}
+    ]}
+
+JSON bodies are embedded as JSON and text bodies as strings. Binary bodies,
+e.g. an ``/export`` Arrow stream, are embedded base64-encoded, with
+``"encoding": "base64"`` and their ``Content-Type`` kept.
+"""
+
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Response
+
+# Largest number of sub-requests accepted in one batch
+MAX_BATCH_SIZE = 50
+
+# Upper bound on sub-requests dispatched at the same time
+MAX_BATCH_WORKERS = 16
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Path of the batch endpoint itself, which may not be nested
+BATCH_PATH = '/batch'
+
+# Response headers dropped from sub-responses; the body is already decoded
+_SKIPPED_HEADERS = {'content-length', 'content-type'}
+
+_executor = ThreadPoolExecutor(max_workers=MAX_BATCH_WORKERS,
+                               thread_name_prefix='engiyn-batch')
+
+class BatchError(ValueError):
+    """Raised when a batch payload is malformed."""
+
+def parse_batch(payload: Any) -> List[Dict[str, Any]]:
+    """Validate a batch payload, returning its normalized sub-requests."""
+    items = payload.get('requests') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise BatchError('Expected a non-empty "requests" array')
+    if len(items) > MAX_BATCH_SIZE:
+        raise BatchError(f'A batch holds at most {MAX_BATCH_SIZE} requests')
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise BatchError(f'Request {index} must be an object')
+        path = item.get('path')
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise BatchError(f'Request {index} needs a path starting with "/"')
+        if path.split('?', 1)[0].rstrip('/') == BATCH_PATH:
+            raise BatchError(f'Request {index} cannot be a nested batch')
+        method = str(item.get('method', 'GET')).upper()
+        if method not in BATCH_METHODS:
+            raise BatchError(f'Request {index} has unsupported method {method}')
+        parsed.append({'id': item.get('id', index), 'method': method,
+                       'path': path, 'body': item.get('body')})
+    return parsed
+
+def _decode_body(response: Response) -> Tuple[Any, bool]:
+    """A sub-response's body, and whether it had to be base64-encoded."""
+    if response.is_json:
+        return response.get_json(silent=True), False
+    data = response.get_data()
+    try:
+        return data.decode(response.mimetype_params.get('charset', 'utf-8')), False
+    except (UnicodeDecodeError, LookupError):
+        return base64.b64encode(data).decode('ascii'), True
+
+def dispatch(app: Any, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one sub-request through the app and describe its response."""
+    builder = EnvironBuilder(path=item['path'], method=item['method'],
+                             json=item['body'], headers={'Accept': 'application/json'})
+    started = time.monotonic()
+    encoded = False
+    try:
+        response = Response.from_app(app, builder.get_environ(), buffered=True)
+        status = response.status_code
+        body, encoded = _decode_body(response)
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in _SKIPPED_HEADERS or (encoded and k.lower() == 'content-type')}
+    except Exception as e:
+        # Only reached when the app propagates exceptions, e.g. in testing
+        status, body, headers = 500, {'error': str(e)}, {}
+    finally:
+        builder.close()
+    result = {
+        'id': item['id'],
+        'status': status,
+        'headers': headers,
+        'body': body,
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+    }
+    if encoded:
+        result['encoding'] = 'base64'
+    return result
+
+def run_batch(app: Any, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dispatch sub-requests concurrently, returning responses in request order."""
+    started = time.monotonic()
+    futures = [_executor.submit(dispatch, app, item) for item in items]
+    responses = [future.result() for future in futures]
+    return {
+        'responses': responses,
+        'count': len(responses),
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+    }
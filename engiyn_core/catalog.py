@@ -0,0 +1,226 @@
+"""
+Engiyn Cloud Bridge - Instance Type Catalog
+
+Maintains a normalized, in-memory index of instance types across providers
+(vCPU, RAM, disk, monthly price, regions) so "cheapest box that fits" queries
+are answered without calling any provider.
+
+Each index snapshot stores its offerings sorted by price, and every filter is
+a precomputed bitset over those rows. A query ANDs the bitsets together and
+walks the set bits in price order.
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Seconds between background catalog refreshes
+CATALOG_REFRESH_INTERVAL = 3600
+
+# Numeric offering fields that support minimum filters
+NUMERIC_FIELDS = ('vcpu', 'ram_gb', 'disk_gb')
+
+# Sort keys accepted by search, mapped to offering fields
+SORT_FIELDS = {
+    'price': 'price_monthly',
+    'vcpu': 'vcpu',
+    'ram': 'ram_gb',
+    'disk': 'disk_gb',
+}
+
+class _Snapshot:
+    """An immutable, fully indexed view of the catalog."""
+    def __init__(self, offerings: List[Dict[str, Any]]):
+        self.rows = sorted(offerings, key=lambda o: (o['price_monthly'], o['provider'], o['id']))
+        self.prices = [row['price_monthly'] for row in self.rows]
+        self.all = (1 << len(self.rows)) - 1
+
+        self.regions: Dict[str, int] = {}
+        self.providers: Dict[str, int] = {}
+        self.currencies: Dict[str, int] = {}
+        for i, row in enumerate(self.rows):
+            bit = 1 << i
+            self.providers[row['provider']] = self.providers.get(row['provider'], 0) | bit
+            self.currencies[row['currency']] = self.currencies.get(row['currency'], 0) | bit
+            for region in row['regions']:
+                self.regions[region] = self.regions.get(region, 0) | bit
+
+        # For each numeric field: ascending distinct values, and for each value
+        # the bitset of rows whose field is at least that value.
+        self.thresholds: Dict[str, Tuple[List[float], List[int]]] = {}
+        for field in NUMERIC_FIELDS:
+            by_value: Dict[float, int] = {}
+            for i, row in enumerate(self.rows):
+                by_value[row[field]] = by_value.get(row[field], 0) | (1 << i)
+            values = sorted(by_value)
+            masks = [0] * len(values)
+            acc = 0
+            for j in range(len(values) - 1, -1, -1):
+                acc |= by_value[values[j]]
+                masks[j] = acc
+            self.thresholds[field] = (values, masks)
+
+    def at_least(self, field: str, minimum: float) -> int:
+        """Bitset of rows whose ``field`` is at least ``minimum``."""
+        values, masks = self.thresholds[field]
+        j = bisect_left(values, minimum)
+        return masks[j] if j < len(values) else 0
+
+    def at_most_price(self, maximum: float) -> int:
+        """Bitset of rows priced at or below ``maximum``."""
+        return (1 << bisect_right(self.prices, maximum)) - 1
+
+    def iter_rows(self, mask: int) -> Iterator[Dict[str, Any]]:
+        """Yield the rows in ``mask`` in ascending price order."""
+        while mask:
+            low = mask & -mask
+            yield self.rows[low.bit_length() - 1]
+            mask ^= low
+
+class CatalogIndex:
+    """
+    Cross-provider instance type index, refreshed in the background.
+
+    Sources map a provider name to a callable returning that provider's
+    normalized offerings. A provider whose refresh fails keeps its previous
+    offerings until the next successful refresh.
+    """
+    def __init__(self):
+        self.updated_at: Optional[float] = None
+        self.errors: Dict[str, str] = {}
+        self._sources: Dict[str, Callable[[], List[Dict[str, Any]]]] = {}
+        self._by_provider: Dict[str, List[Dict[str, Any]]] = {}
+        self._snapshot = _Snapshot([])
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _rebuild(self) -> None:
+        """Swap in a new snapshot built from all providers' offerings."""
+        offerings = [o for items in self._by_provider.values() for o in items]
+        self._snapshot = _Snapshot(offerings)
+        self.updated_at = time.time()
+
+    def refresh(self, sources: Optional[Dict[str, Callable[[], List[Dict[str, Any]]]]] = None) -> None:
+        """Fetch every source concurrently and rebuild the index once."""
+        sources = sources if sources is not None else self._sources
+        if not sources:
+            return
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            futures = {name: pool.submit(fetch) for name, fetch in sources.items()}
+
+        errors: Dict[str, str] = {}
+        fetched: Dict[str, List[Dict[str, Any]]] = {}
+        for name, future in futures.items():
+            try:
+                fetched[name] = [{**o, 'provider': name} for o in future.result()]
+            except Exception as e:
+                errors[name] = str(e)
+
+        with self._lock:
+            self._by_provider.update(fetched)
+            self.errors = errors
+            self._rebuild()
+
+    def start(self, sources: Dict[str, Callable[[], List[Dict[str, Any]]]],
+              interval: float = CATALOG_REFRESH_INTERVAL) -> None:
+        """Refresh the index now and then every ``interval`` seconds in the background."""
+        self._sources = sources
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing catalog: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=run, name='engiyn-catalog', daemon=True)
+        self._thread.start()
+
+    def search(self, vcpu: float = 0, ram_gb: float = 0, disk_gb: float = 0,
+               max_price: Optional[float] = None, region: Optional[str] = None,
+               provider: Optional[str] = None, sort: str = 'price',
+               limit: Optional[int] = None, currency: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return offerings matching every filter, cheapest first by default.
+
+        ``sort`` is one of ``price``, ``vcpu``, ``ram`` or ``disk``, prefixed
+        with ``-`` for descending order. Prices are compared as listed, so
+        pass a ``currency`` to rank offerings priced in one currency only.
+        """
+        snapshot = self._snapshot
+        descending = sort.startswith('-')
+        field = SORT_FIELDS.get(sort.lstrip('-'))
+        if field is None:
+            raise ValueError(f"Unknown sort '{sort}', expected one of: {', '.join(SORT_FIELDS)}")
+
+        mask = snapshot.all
+        for name, minimum in (('vcpu', vcpu), ('ram_gb', ram_gb), ('disk_gb', disk_gb)):
+            if minimum:
+                mask &= snapshot.at_least(name, minimum)
+        if max_price is not None:
+            mask &= snapshot.at_most_price(max_price)
+        if region:
+            mask &= snapshot.regions.get(region, 0)
+        if provider:
+            mask &= snapshot.providers.get(provider, 0)
+        if currency:
+            mask &= snapshot.currencies.get(currency.upper(), 0)
+
+        if field == 'price_monthly' and not descending:
+            results = []
+            for row in snapshot.iter_rows(mask):
+                results.append(row)
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+        results = sorted(snapshot.iter_rows(mask), key=lambda row: row[field], reverse=descending)
+        return results[:limit] if limit is not None else results
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the index, for ``/status``."""
+        snapshot = self._snapshot
+        return {
+            'offerings': len(snapshot.rows),
+            'providers': sorted(snapshot.providers),
+            'currencies': sorted(snapshot.currencies),
+            'updated_at': self.updated_at,
+            'errors': self.errors,
+        }
+
+def parse_query(args: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Convert request arguments into :meth:`CatalogIndex.search` keywords.
+
+    Minimums can be given as ``vcpu>=2`` or ``min_vcpu=2``, and the price
+    ceiling as ``price<=20`` or ``max_price=20``. RAM and disk are in GB.
+    Raises ValueError for malformed numbers.
+    """
+    def number(*names: str) -> Optional[float]:
+        for name in names:
+            value = args.get(name)
+            if value not in (None, ''):
+                return float(value)
+        return None
+
+    query: Dict[str, Any] = {
+        'vcpu': number('vcpu>', 'min_vcpu', 'vcpu') or 0,
+        'ram_gb': number('ram>', 'min_ram', 'ram') or 0,
+        'disk_gb': number('disk>', 'min_disk', 'disk') or 0,
+        'max_price': number('price<', 'max_price'),
+        'region': args.get('region') or None,
+        'provider': args.get('provider') or None,
+        'currency': args.get('currency') or None,
+        'sort': args.get('sort') or 'price',
+    }
+    limit = number('limit')
+    query['limit'] = int(limit) if limit is not None else None
+    return query
+
+# Shared catalog index served by the bridge
+catalog = CatalogIndex()
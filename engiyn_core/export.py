@@ -0,0 +1,410 @@
+"""
+Engiyn Cloud Bridge - Columnar Export
+
+Exports the normalized server inventory and the instance type catalog as an
+Apache Arrow IPC stream, which pandas, polars, DuckDB and Spark read without
+parsing JSON. Low-cardinality string columns (provider, account, status,
+region, type...) are dictionary-encoded: each distinct value is sent once and
+rows carry 32-bit indexes.
+
+Rows are written in record batches as they arrive, with delta dictionary
+batches for values first seen in a batch, so the encoder holds one batch at
+a time however large the fleet is. Streams are written with pyarrow when it
+is installed (``pip install engiyn-core[export]``). Otherwise the bridge
+writes them itself with :class:`ArrowStreamEncoder`, which needs only the
+standard library, so ``/export`` works on a plain install without the large
+pyarrow wheel. Both encoders have the same interface::
+
+    encoder = stream_encoder(SERVER_COLUMNS)
+    out.write(encoder.schema())
+    for rows in batches:
+        out.write(encoder.batch(rows))
+    out.write(encoder.end())
+"""
+
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+MIMETYPE_ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# Rows per record batch
+BATCH_ROWS = 4096
+
+# Column kinds
+DICTIONARY = 'dictionary'
+STRING = 'string'
+FLOAT64 = 'float64'
+INT64 = 'int64'
+
+SERVER_COLUMNS = [
+    ('provider', DICTIONARY),
+    ('account', DICTIONARY),
+    ('id', STRING),
+    ('name', STRING),
+    ('status', DICTIONARY),
+    ('region', DICTIONARY),
+    ('type', DICTIONARY),
+    ('ip', STRING),
+    ('created', STRING),
+]
+
+OFFERING_COLUMNS = [
+    ('provider', DICTIONARY),
+    ('id', STRING),
+    ('vcpu', FLOAT64),
+    ('ram_gb', FLOAT64),
+    ('disk_gb', FLOAT64),
+    ('price_monthly', FLOAT64),
+    ('currency', DICTIONARY),
+    ('regions', STRING),
+]
+
+DATASETS = {'servers': SERVER_COLUMNS, 'offerings': OFFERING_COLUMNS}
+
+# Inventory sources by provider, each yielding pages of normalized server records
+inventory_sources: Dict[str, Callable[[], Iterable[List[Dict[str, Any]]]]] = {}
+
+# --- FlatBuffers ---
+# Arrow IPC metadata is FlatBuffers. Objects are laid out front to back, each
+# child after its parent, so every offset points forward as the format needs.
+
+_SIZES = {'?': 1, 'B': 1, 'h': 2, 'i': 4, 'q': 8, 'd': 8, 'offset': 4}
+
+class _Table:
+    def __init__(self, *fields: Tuple[int, str, Any]):
+        # (slot, struct format or 'offset', value); None values are left out
+        self.fields = [f for f in fields if f[2] is not None]
+
+class _Vector:
+    def __init__(self, items: Sequence[Any] = (), struct_format: Optional[str] = None):
+        # Tables and strings by offset, or inline structs packed with struct_format
+        self.items = list(items)
+        self.struct_format = struct_format
+
+def _align(buf: bytearray, alignment: int, offset: int = 0) -> None:
+    while (len(buf) + offset) % alignment:
+        buf.append(0)
+
+def _place(buf: bytearray, obj: Any, pending: List[Tuple[int, Any]]) -> int:
+    """Append one object, queueing its children. Returns its position."""
+    if isinstance(obj, str):
+        data = obj.encode('utf-8')
+        _align(buf, 4)
+        pos = len(buf)
+        buf += struct.pack('<I', len(data)) + data + b'\0'
+        return pos
+
+    if isinstance(obj, _Vector):
+        if obj.struct_format:
+            # Structs of 64-bit fields must be 8-byte aligned after the length
+            _align(buf, 8, 4)
+            pos = len(buf)
+            buf += struct.pack('<I', len(obj.items))
+            for item in obj.items:
+                buf += struct.pack(obj.struct_format, *item)
+            return pos
+        _align(buf, 4)
+        pos = len(buf)
+        buf += struct.pack('<I', len(obj.items))
+        for item in obj.items:
+            pending.append((len(buf), item))
+            buf += b'\0\0\0\0'
+        return pos
+
+    # Table: vtable, then the table with fields ordered by size for alignment
+    fields = sorted(obj.fields, key=lambda f: -_SIZES[f[1]])
+    layout: Dict[int, int] = {}
+    offset = 4
+    for slot, fmt, _ in fields:
+        size = _SIZES[fmt]
+        offset += -offset % size
+        layout[slot] = offset
+        offset += size
+    slots = max((f[0] for f in fields), default=-1) + 1
+    vtable = struct.pack(f'<HH{slots}H', 4 + 2 * slots, offset, *(layout.get(i, 0) for i in range(slots)))
+
+    _align(buf, 2)
+    vtable_pos = len(buf)
+    buf += vtable
+    _align(buf, 8)
+    pos = len(buf)
+    buf += bytes(offset)
+    struct.pack_into('<i', buf, pos, pos - vtable_pos)
+    for slot, fmt, value in fields:
+        if fmt == 'offset':
+            pending.append((pos + layout[slot], value))
+        else:
+            struct.pack_into('<' + fmt, buf, pos + layout[slot], value)
+    return pos
+
+def _flatbuffer(root: _Table) -> bytes:
+    """Serialize a tree of tables, vectors and strings, padded to 8 bytes."""
+    buf = bytearray(4)
+    pending: List[Tuple[int, Any]] = [(0, root)]
+    while pending:
+        field_pos, obj = pending.pop(0)
+        pos = _place(buf, obj, pending)
+        struct.pack_into('<I', buf, field_pos, pos - field_pos)
+    _align(buf, 8)
+    return bytes(buf)
+
+# --- Arrow IPC messages ---
+_METADATA_V5 = 4
+_HEADER_SCHEMA, _HEADER_DICTIONARY_BATCH, _HEADER_RECORD_BATCH = 1, 2, 3
+_TYPE_INT, _TYPE_FLOATING_POINT, _TYPE_UTF8 = 2, 3, 5
+_PRECISION_DOUBLE = 2
+
+def _message(header_type: int, header: _Table, body: bytes = b'') -> bytes:
+    """Frame one IPC message: continuation marker, metadata length, metadata, body."""
+    metadata = _flatbuffer(_Table((0, 'h', _METADATA_V5), (1, 'B', header_type),
+                                  (2, 'offset', header), (3, 'q', len(body))))
+    return struct.pack('<Ii', 0xFFFFFFFF, len(metadata)) + metadata + body
+
+def _int_type(bits: int) -> _Table:
+    return _Table((0, 'i', bits), (1, '?', True))
+
+def _field(name: str, kind: str, dictionary_id: int) -> _Table:
+    if kind == FLOAT64:
+        type_id, type_table = _TYPE_FLOATING_POINT, _Table((0, 'h', _PRECISION_DOUBLE))
+    elif kind == INT64:
+        type_id, type_table = _TYPE_INT, _int_type(64)
+    else:
+        type_id, type_table = _TYPE_UTF8, _Table()
+    encoding = _Table((0, 'q', dictionary_id), (1, 'offset', _int_type(32))) if kind == DICTIONARY else None
+    return _Table((0, 'offset', name), (1, '?', True), (2, 'B', type_id), (3, 'offset', type_table),
+                  (4, 'offset', encoding), (5, 'offset', _Vector()))
+
+class _Body:
+    """Collects the buffers of a record batch, each padded to 8 bytes."""
+    def __init__(self):
+        self.data = bytearray()
+        self.buffers: List[Tuple[int, int]] = []
+
+    def add(self, data: bytes) -> None:
+        self.buffers.append((len(self.data), len(data)))
+        self.data += data
+        _align(self.data, 8)
+
+def _validity(values: Sequence[Any]) -> Tuple[bytes, int]:
+    """Validity bitmap and null count; the bitmap is omitted without nulls."""
+    nulls = sum(1 for v in values if v is None)
+    if not nulls:
+        return b'', 0
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is not None:
+            bitmap[i // 8] |= 1 << (i % 8)
+    return bytes(bitmap), nulls
+
+def _strings(body: _Body, values: Sequence[Optional[str]]) -> int:
+    """Add a UTF-8 column's buffers, returning its null count."""
+    bitmap, nulls = _validity(values)
+    offsets = [0]
+    data = bytearray()
+    for value in values:
+        if value is not None:
+            data += value.encode('utf-8')
+        offsets.append(len(data))
+    body.add(bitmap)
+    body.add(struct.pack(f'<{len(offsets)}i', *offsets))
+    body.add(bytes(data))
+    return nulls
+
+def _fixed(body: _Body, values: Sequence[Any], fmt: str) -> int:
+    """Add a fixed-width column's buffers, returning its null count."""
+    bitmap, nulls = _validity(values)
+    body.add(bitmap)
+    body.add(struct.pack(f'<{len(values)}{fmt}', *(0 if v is None else v for v in values)))
+    return nulls
+
+def _record_batch(length: int, nodes: List[Tuple[int, int]], body: _Body) -> _Table:
+    return _Table((0, 'q', length), (1, 'offset', _Vector(nodes, '<qq')),
+                  (2, 'offset', _Vector(body.buffers, '<qq')))
+
+def _cell(value: Any, kind: str) -> Any:
+    """Convert a record value to a column value."""
+    if value is None:
+        return None
+    if kind in (FLOAT64, INT64):
+        try:
+            return float(value) if kind == FLOAT64 else int(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(v) for v in value)
+    return str(value)
+
+class ArrowStreamEncoder:
+    """Encodes rows as an Arrow IPC stream, one record batch at a time."""
+    def __init__(self, columns: Sequence[Tuple[str, str]]):
+        self.columns = list(columns)
+        self.rows = 0
+        # Dictionary values seen so far, by column index
+        self._dictionaries: Dict[int, Dict[str, int]] = {
+            i: {} for i, (_, kind) in enumerate(self.columns) if kind == DICTIONARY
+        }
+        self._started = False
+
+    def schema(self) -> bytes:
+        """The schema message that opens the stream."""
+        fields = _Vector([_field(name, kind, i) for i, (name, kind) in enumerate(self.columns)])
+        return _message(_HEADER_SCHEMA, _Table((0, 'h', 0), (1, 'offset', fields)))
+
+    def batch(self, rows: Sequence[Dict[str, Any]]) -> bytes:
+        """Encode rows as a record batch, preceded by any new dictionary values."""
+        out = bytearray()
+        body = _Body()
+        nodes: List[Tuple[int, int]] = []
+        for i, (name, kind) in enumerate(self.columns):
+            values = [_cell(row.get(name), kind) for row in rows]
+            if kind == DICTIONARY:
+                dictionary = self._dictionaries[i]
+                new = []
+                for value in values:
+                    if value is not None and value not in dictionary:
+                        dictionary[value] = len(dictionary)
+                        new.append(value)
+                if new or not self._started:
+                    # The first dictionary batch of each column must precede the first record batch
+                    out += self._dictionary_batch(i, new, delta=self._started)
+                nulls = _fixed(body, [None if v is None else dictionary[v] for v in values], 'i')
+            elif kind == STRING:
+                nulls = _strings(body, values)
+            else:
+                nulls = _fixed(body, values, 'd' if kind == FLOAT64 else 'q')
+            nodes.append((len(rows), nulls))
+
+        self._started = True
+        self.rows += len(rows)
+        out += _message(_HEADER_RECORD_BATCH, _record_batch(len(rows), nodes, body), bytes(body.data))
+        return bytes(out)
+
+    def _dictionary_batch(self, dictionary_id: int, values: List[str], delta: bool) -> bytes:
+        body = _Body()
+        _strings(body, values)
+        data = _record_batch(len(values), [(len(values), 0)], body)
+        header = _Table((0, 'q', dictionary_id), (1, 'offset', data), (2, '?', delta))
+        return _message(_HEADER_DICTIONARY_BATCH, header, bytes(body.data))
+
+    def end(self) -> bytes:
+        """The end-of-stream marker."""
+        return struct.pack('<Ii', 0xFFFFFFFF, 0)
+
+class _Sink:
+    """File-like target that hands back what a pyarrow writer wrote to it."""
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+class PyArrowStreamEncoder:
+    """:class:`ArrowStreamEncoder` on top of ``pyarrow.ipc.new_stream``."""
+    def __init__(self, columns: Sequence[Tuple[str, str]]):
+        if pyarrow is None:
+            raise RuntimeError('pyarrow is not installed')
+        self.columns = list(columns)
+        self.rows = 0
+        self._types = {
+            DICTIONARY: pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+            STRING: pyarrow.string(),
+            FLOAT64: pyarrow.float64(),
+            INT64: pyarrow.int64(),
+        }
+        self._schema = pyarrow.schema([(name, self._types[kind]) for name, kind in self.columns])
+        # Dictionary values seen so far, by column name; batches only ever append to them, as deltas need
+        self._dictionaries: Dict[str, Dict[str, int]] = {
+            name: {} for name, kind in self.columns if kind == DICTIONARY
+        }
+        self._sink = _Sink()
+        self._writer: Any = None
+
+    def schema(self) -> bytes:
+        """The schema message that opens the stream."""
+        options = pyarrow.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        self._writer = pyarrow.ipc.new_stream(self._sink, self._schema, options=options)
+        return self._sink.take()
+
+    def batch(self, rows: Sequence[Dict[str, Any]]) -> bytes:
+        """Encode rows as a record batch, preceded by any new dictionary values."""
+        arrays = []
+        for name, kind in self.columns:
+            values = [_cell(row.get(name), kind) for row in rows]
+            if kind == DICTIONARY:
+                dictionary = self._dictionaries[name]
+                indices = [None if v is None else dictionary.setdefault(v, len(dictionary)) for v in values]
+                arrays.append(pyarrow.DictionaryArray.from_arrays(
+                    pyarrow.array(indices, pyarrow.int32()), pyarrow.array(list(dictionary), pyarrow.string())))
+            else:
+                arrays.append(pyarrow.array(values, self._types[kind]))
+        self._writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=self._schema))
+        self.rows += len(rows)
+        return self._sink.take()
+
+    def end(self) -> bytes:
+        """The end-of-stream marker."""
+        self._writer.close()
+        return self._sink.take()
+
+def stream_encoder(columns: Sequence[Tuple[str, str]]) -> Any:
+    """An encoder for ``columns``: pyarrow's if installed, else the bridge's own."""
+    if pyarrow is not None:
+        return PyArrowStreamEncoder(columns)
+    return ArrowStreamEncoder(columns)
+
+def rebatch(pages: Iterable[Sequence[Dict[str, Any]]], size: int = BATCH_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """Regroup pages of records into batches of ``size`` rows."""
+    batch: List[Dict[str, Any]] = []
+    for page in pages:
+        for record in page:
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def dataset_pages(dataset: str, cached: bool = False) -> Iterable[Sequence[Dict[str, Any]]]:
+    """
+    Pages of records for a dataset. Servers are listed from every provider
+    as they arrive, or taken from the fleet index with ``cached``; offerings
+    come from the catalog index.
+    """
+    from engiyn_core.catalog import catalog
+    from engiyn_core.fleet import fleet
+
+    if dataset == 'offerings':
+        if catalog.updated_at is None:
+            catalog.refresh()
+        return [catalog.search()]
+    if cached:
+        return [fleet.records()]
+    return (page for source in inventory_sources.values() for page in source())
+
+def export_stream(dataset: str, cached: bool = False, batch_rows: int = BATCH_ROWS) -> Iterator[bytes]:
+    """Encode a dataset (``servers`` or ``offerings``) as an Arrow IPC stream."""
+    columns = DATASETS.get(dataset)
+    if columns is None:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of: {', '.join(DATASETS)}")
+    encoder = stream_encoder(columns)
+    yield encoder.schema()
+    for rows in rebatch(dataset_pages(dataset, cached), batch_rows):
+        yield encoder.batch(rows)
+    yield encoder.end()
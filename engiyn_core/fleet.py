@@ -0,0 +1,180 @@
+"""
+Engiyn Cloud Bridge - Fleet Index
+
+Keeps the latest normalized record of every server the bridge has seen, with
+running counts by provider, status, region and type. Counts are adjusted as
+records are added, changed or removed, so a summary costs the same however
+large the fleet is and never touches a provider.
+
+Records are fed by provider plugins as they list, get, create and delete
+servers. A normalized record looks like::
+
+    {'provider': 'hetzner', 'account': 'default', 'id': 42, 'name': 'web-1',
+     'status': 'running', 'region': 'fsn1', 'type': 'cx22', ...}
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Fields counted in the summary
+DIMENSIONS = ('provider', 'status', 'region', 'type')
+
+# Bucket for records missing a dimension
+UNKNOWN = 'unknown'
+
+Key = Tuple[str, str]
+
+def _bump(counts: Dict[str, int], value: str, delta: int) -> None:
+    """Adjust one counter, dropping it when it reaches zero."""
+    total = counts.get(value, 0) + delta
+    if total:
+        counts[value] = total
+    else:
+        counts.pop(value, None)
+
+class FleetIndex:
+    """Latest server records with incrementally maintained counts."""
+    def __init__(self):
+        self.version = 0
+        self._records: Dict[Key, Dict[str, Any]] = {}
+        self._keys: Dict[str, Set[Key]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {d: {} for d in DIMENSIONS}
+        self._provider_status: Dict[str, Dict[str, int]] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(provider: str, server_id: Any) -> Key:
+        return provider, str(server_id)
+
+    def _count(self, record: Dict[str, Any], delta: int) -> None:
+        for dimension in DIMENSIONS:
+            _bump(self._counts[dimension], str(record.get(dimension) or UNKNOWN), delta)
+        statuses = self._provider_status.setdefault(record['provider'], {})
+        _bump(statuses, str(record.get('status') or UNKNOWN), delta)
+
+    def _put(self, record: Dict[str, Any]) -> bool:
+        """Store a record, returning True if it changed. Caller holds the lock."""
+        key = self._key(record['provider'], record['id'])
+        old = self._records.get(key)
+        if old == record:
+            return False
+        if old is not None:
+            self._count(old, -1)
+        self._records[key] = record
+        self._keys.setdefault(record['provider'], set()).add(key)
+        self._count(record, 1)
+        return True
+
+    def _drop(self, key: Key) -> bool:
+        """Remove a record, returning True if it existed. Caller holds the lock."""
+        old = self._records.pop(key, None)
+        if old is None:
+            return False
+        self._keys[key[0]].discard(key)
+        self._count(old, -1)
+        return True
+
+    def upsert(self, record: Dict[str, Any]) -> bool:
+        """Add or update one server record."""
+        with self._lock:
+            changed = self._put(record)
+            if changed:
+                self.version += 1
+            return changed
+
+    def remove(self, provider: str, server_id: Any) -> bool:
+        """Forget a server, e.g. after it was deleted."""
+        with self._lock:
+            changed = self._drop(self._key(provider, server_id))
+            if changed:
+                self.version += 1
+            return changed
+
+    def put_page(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add or update one page of a listing that is read page by page, so it
+        need not be held in full. :meth:`prune` ends the listing. Returns the
+        number of records added or changed.
+        """
+        with self._lock:
+            changed = sum(self._put(record) for record in records)
+            if changed:
+                self.version += 1
+            return changed
+
+    def prune(self, provider: str, seen: Set[str], accounts: Optional[Iterable[str]] = None) -> int:
+        """
+        End a listing fed by :meth:`put_page`: forget the provider's servers
+        whose ids it did not see, like :meth:`sync`. Returns the number of
+        records removed.
+        """
+        accounts = set(accounts) if accounts is not None else None
+        with self._lock:
+            changed = 0
+            for key in list(self._keys.get(provider, ())):
+                if key[1] in seen:
+                    continue
+                if accounts is None or self._records[key].get('account') in accounts:
+                    changed += self._drop(key)
+            self._updated_at[provider] = time.time()
+            if changed:
+                self.version += 1
+            return changed
+
+    def sync(self, provider: str, records: Iterable[Dict[str, Any]],
+             accounts: Optional[Iterable[str]] = None) -> int:
+        """
+        Replace a provider's records with a fresh listing.
+
+        Only servers of the listed ``accounts`` (all of the provider's
+        servers if None) are removed when missing, so an account whose list
+        call failed keeps its previous records. Returns the number of records
+        added, changed or removed.
+        """
+        accounts = set(accounts) if accounts is not None else None
+        with self._lock:
+            changed = 0
+            seen: Set[Key] = set()
+            for record in records:
+                seen.add(self._key(provider, record['id']))
+                changed += self._put(record)
+            for key in list(self._keys.get(provider, ())):
+                if key in seen:
+                    continue
+                if accounts is None or self._records[key].get('account') in accounts:
+                    changed += self._drop(key)
+            self._updated_at[provider] = time.time()
+            if changed:
+                self.version += 1
+            return changed
+
+    def records(self, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Current records, optionally of one provider."""
+        with self._lock:
+            if provider is None:
+                return list(self._records.values())
+            return [self._records[key] for key in self._keys.get(provider, ())]
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts by provider, status, region and type."""
+        with self._lock:
+            return {
+                'total': len(self._records),
+                'by_provider': {
+                    provider: {
+                        'total': self._counts['provider'].get(provider, 0),
+                        'by_status': dict(self._provider_status.get(provider, {})),
+                        'updated_at': self._updated_at.get(provider),
+                    }
+                    for provider in sorted(set(self._provider_status) | set(self._updated_at))
+                },
+                'by_status': dict(self._counts['status']),
+                'by_region': dict(self._counts['region']),
+                'by_type': dict(self._counts['type']),
+                'version': self.version,
+            }
+
+# Fleet index shared by all provider plugins
+fleet = FleetIndex()
@@ -0,0 +1,288 @@
+"""
+Engiyn Cloud Bridge - Process-Isolated Plugin Execution
+
+Hosts a plugin's HTTP endpoints in a pool of worker processes, so a plugin
+that burns CPU or blocks on a bad socket cannot hold the bridge's GIL or its
+request threads. The bridge forwards each request to an idle worker over a
+pipe and relays the response. The bridge's background hooks (catalog
+refreshes, server listings for exports and scheduled refreshes) run on the
+workers too.
+
+Each worker loads the plugin into its own Flask app. Messages are plain dicts:
+
+    request:  {'op': 'request', 'method', 'path', 'query_string', 'headers', 'body'}
+    response: {'status', 'headers', 'body', 'nudged': [provider, ...]}
+    ping:     {'op': 'ping'} -> {'status': 'ok'}
+    catalog:  {'op': 'catalog'} -> {'status': 'ok', 'offerings'}
+    servers:  {'op': 'servers'} -> {'status': 'ok', 'pages': [(account, records, error), ...]}
+
+Hooks that fail answer ``{'status': 'error', 'error'}``. ``nudged`` lists the
+providers a request nudged for a refresh, e.g. by creating a server, so the
+bridge's scheduler can refresh them; the worker's own scheduler never runs.
+"""
+
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Default number of worker processes per isolated plugin
+DEFAULT_WORKERS = 2
+
+# Default seconds a worker may take to answer one request before it is restarted
+DEFAULT_CALL_TIMEOUT = 30.0
+
+# Seconds between health checks of idle workers, and the ping timeout
+HEALTH_CHECK_INTERVAL = 15.0
+PING_TIMEOUT = 5.0
+
+# Background hooks a worker runs for the bridge
+HOOKS = ('catalog', 'servers')
+
+# Response headers that describe the worker's connection, not the payload
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length'}
+
+class PluginWorkerError(Exception):
+    """Raised when an isolated plugin cannot serve a request."""
+    status = 502
+
+class WorkerBusyError(PluginWorkerError):
+    """Raised when a plugin is already at its concurrency limit."""
+    status = 503
+
+class WorkerTimeoutError(PluginWorkerError):
+    """Raised when a worker does not answer within the call timeout."""
+    status = 504
+
+def _worker_main(conn: Any, plugins_dir: str, plugin_name: str) -> None:
+    """Entry point of a worker process: load the plugin and serve requests."""
+    from flask import Blueprint, Flask
+    from werkzeug.test import EnvironBuilder
+
+    from cloudbridge import PluginLoader, register_error_handlers
+    from engiyn_core.scheduler import scheduler
+    from engiyn_core.serialization import BridgeJSONProvider
+
+    nudged: List[str] = []
+    scheduler.forward = nudged.append
+    plugin = PluginLoader(plugins_dir).load_plugin(plugin_name)
+    app = Flask(f'engiyn-worker-{plugin_name}')
+    app.json = BridgeJSONProvider(app)
+    register_error_handlers(app)
+    bp = Blueprint(plugin_name, __name__, url_prefix=f'/plugins/{plugin_name}')
+    if plugin:
+        plugin.register_http(bp)
+    app.register_blueprint(bp)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        if message.get('op') == 'ping':
+            conn.send({'status': 'ok' if plugin else 'error'})
+            continue
+
+        if message.get('op') in HOOKS:
+            try:
+                if plugin is None:
+                    raise PluginWorkerError(f'{plugin_name} failed to load')
+                if message['op'] == 'catalog':
+                    conn.send({'status': 'ok', 'offerings': plugin.fetch_catalog()})
+                else:
+                    conn.send({'status': 'ok', 'pages': list(plugin.server_pages())})
+            except Exception as e:
+                conn.send({'status': 'error', 'error': str(e)})
+            continue
+
+        try:
+            builder = EnvironBuilder(
+                path=message['path'],
+                method=message['method'],
+                query_string=message['query_string'],
+                headers=message['headers'],
+                data=message['body'],
+            )
+            with app.request_context(builder.get_environ()):
+                response = app.full_dispatch_request()
+                reply = {
+                    'status': response.status_code,
+                    'headers': list(response.headers.items()),
+                    'body': response.get_data(),
+                }
+        except Exception as e:
+            reply = {
+                'status': getattr(e, 'status', 500),
+                'headers': [('Content-Type', 'application/json')],
+                'body': json.dumps({'error': str(e)}).encode('utf-8'),
+            }
+        reply['nudged'] = list(nudged)
+        nudged.clear()
+        conn.send(reply)
+
+class WorkerProcess:
+    """One worker process and the parent's end of its pipe."""
+    def __init__(self, ctx: Any, plugins_dir: str, plugin_name: str):
+        self._ctx = ctx
+        self._plugins_dir = plugins_dir
+        self._plugin_name = plugin_name
+        self.restarts = 0
+        self.start()
+
+    def start(self) -> None:
+        """Spawn the worker process."""
+        self.conn, child_conn = self._ctx.Pipe()
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._plugins_dir, self._plugin_name),
+            name=f'engiyn-{self._plugin_name}',
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def restart(self) -> None:
+        """Kill the worker and spawn a fresh one."""
+        self.restarts += 1
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        self.start()
+
+    def call(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send a message and wait up to ``timeout`` seconds for the reply."""
+        try:
+            self.conn.send(message)
+            if not self.conn.poll(timeout):
+                raise WorkerTimeoutError(f'{self._plugin_name} worker did not answer within {timeout:g}s')
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise PluginWorkerError(f'{self._plugin_name} worker exited: {e}')
+
+class PluginProcessPool:
+    """
+    Pool of worker processes serving one plugin's HTTP endpoints.
+
+    At most ``max_concurrency`` requests are admitted at once (running or
+    waiting for a worker). Further requests fail fast with
+    :class:`WorkerBusyError`. A worker that times out or dies is restarted.
+    """
+    def __init__(self, plugin_name: str, plugins_dir: str, workers: int = DEFAULT_WORKERS,
+                 max_concurrency: Optional[int] = None, timeout: float = DEFAULT_CALL_TIMEOUT):
+        self.plugin_name = plugin_name
+        self.plugins_dir = plugins_dir
+        self.size = workers
+        self.max_concurrency = max_concurrency or workers * 4
+        self.timeout = timeout
+        self.in_flight = 0
+        self._workers: List[WorkerProcess] = []
+        self._idle: 'queue.Queue[WorkerProcess]' = queue.Queue()
+        self._admission = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Spawn the workers and start health checks."""
+        ctx = multiprocessing.get_context('spawn')
+        for _ in range(self.size):
+            worker = WorkerProcess(ctx, self.plugins_dir, self.plugin_name)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        self._health_thread = threading.Thread(
+            target=self._health_loop, name=f'engiyn-health-{self.plugin_name}', daemon=True
+        )
+        self._health_thread.start()
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request on an idle worker and return its response."""
+        if not self._admission.acquire(blocking=False):
+            raise WorkerBusyError(f'{self.plugin_name} is at its concurrency limit ({self.max_concurrency})')
+        with self._lock:
+            self.in_flight += 1
+        try:
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise WorkerTimeoutError(f'No {self.plugin_name} worker became available within {self.timeout:g}s')
+            try:
+                return worker.call(message, self.timeout)
+            except PluginWorkerError:
+                worker.restart()
+                raise
+            finally:
+                self._idle.put(worker)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._admission.release()
+
+    def run_hook(self, op: str) -> Dict[str, Any]:
+        """Run one of the bridge's background hooks (see :data:`HOOKS`) on a worker."""
+        reply = self.dispatch({'op': op})
+        if reply.get('status') != 'ok':
+            raise PluginWorkerError(f"{self.plugin_name} {op} failed: {reply.get('error')}")
+        return reply
+
+    def health_check(self) -> None:
+        """Ping every idle worker and restart any that do not answer."""
+        checked = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if worker.call({'op': 'ping'}, PING_TIMEOUT).get('status') != 'ok':
+                    worker.restart()
+            except PluginWorkerError:
+                worker.restart()
+            checked.append(worker)
+        for worker in checked:
+            self._idle.put(worker)
+
+    def _health_loop(self) -> None:
+        """Run health checks until the process exits."""
+        while True:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            self.health_check()
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the pool, for ``/status``."""
+        return {
+            'workers': self.size,
+            'alive': sum(1 for w in self._workers if w.process.is_alive()),
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+            'restarts': sum(w.restarts for w in self._workers),
+        }
+
+    def shutdown(self) -> None:
+        """Terminate all workers."""
+        for worker in self._workers:
+            worker.conn.close()
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.process.join(timeout=5)
+
+# Process pools of all isolated plugins, by plugin name
+pools: Dict[str, PluginProcessPool] = {}
+
+def request_message(req: Any, path: str) -> Dict[str, Any]:
+    """Build the IPC message for a Flask request."""
+    return {
+        'op': 'request',
+        'method': req.method,
+        'path': path,
+        'query_string': req.query_string.decode('latin-1'),
+        'headers': [(k, v) for k, v in req.headers.items() if k.lower() != 'host'],
+        'body': req.get_data(),
+    }
+
+def response_headers(reply: Dict[str, Any]) -> List[Any]:
+    """Headers of a worker reply that should be relayed to the client."""
+    return [(k, v) for k, v in reply['headers'] if k.lower() not in HOP_BY_HOP_HEADERS]
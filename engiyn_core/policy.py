@@ -0,0 +1,254 @@
+"""
+Engiyn Cloud Bridge - Plugin Performance Policies
+
+Reads the optional ``performance`` block of a plugin manifest, which tells the
+bridge how the plugin's provider may be called::
+
+    "performance": {
+      "timeout": 10,
+      "max_concurrency": 8,
+      "rate_limit": {"requests": 3600, "per": 3600},
+      "pagination": {"style": "page", "page_size": 50, "next": "meta.pagination.next_page"},
+      "endpoints": {
+        "list_images": {"cache_ttl": 3600},
+        "create_server": {"timeout": 30, "max_concurrency": 2}
+      }
+    }
+
+Concurrency and rate limits are enforced by the provider guard around every
+upstream call. Providers such as Hetzner and DigitalOcean meter each API
+token on its own, so every account gets its own copy of the limits and busy
+accounts cannot starve the others. Timeouts, cache TTLs and pagination are
+read by the SDK's ``CloudProvider``. Endpoint settings override provider-wide
+ones.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Supported pagination styles for list endpoints
+PAGINATION_STYLES = ('none', 'page', 'cursor', 'link')
+
+# Seconds a call may wait for a concurrency slot or rate limit token
+ADMISSION_TIMEOUT = 30.0
+
+class ThrottledError(Exception):
+    """Raised when a call cannot be admitted within its provider's limits."""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f'Throttled by {name} limits, retry in {retry_after:.0f}s')
+        self.name = name
+        self.retry_after = retry_after
+
+class RateLimiter:
+    """Token bucket allowing ``requests`` calls per ``per`` seconds, with bursts up to ``requests``."""
+    def __init__(self, requests: int, per: float):
+        if requests < 1 or per <= 0:
+            raise ValueError('rate_limit needs requests >= 1 and per > 0')
+        self.requests = requests
+        self.per = per
+        self.rate = requests / per
+        self.tokens = float(requests)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _wait_time(self) -> float:
+        """Take a token if one is available, else return seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.requests), self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def available(self) -> float:
+        """Tokens that could be taken right now, without taking any."""
+        with self._lock:
+            return min(float(self.requests), self.tokens + (time.monotonic() - self._updated) * self.rate)
+
+    def acquire(self, timeout: float) -> float:
+        """Wait for a token. Returns 0 on success, else the seconds still to wait."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._wait_time()
+            if not wait:
+                return 0.0
+            if time.monotonic() + wait > deadline:
+                return wait
+            time.sleep(wait)
+
+class Limits:
+    """Concurrency and rate limits for a provider or one of its endpoints."""
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.spec = spec
+        self.max_concurrency: Optional[int] = spec.get('max_concurrency')
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self._slots = threading.BoundedSemaphore(self.max_concurrency) if self.max_concurrency else None
+        rate_limit = spec.get('rate_limit')
+        self.limiter = RateLimiter(rate_limit['requests'], rate_limit['per']) if rate_limit else None
+        self.in_flight = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """True if any limit is configured."""
+        return self._slots is not None or self.limiter is not None
+
+    def acquire(self, timeout: float) -> None:
+        """Take a rate limit token and a concurrency slot, or raise ThrottledError."""
+        if self.limiter is not None:
+            wait = self.limiter.acquire(timeout)
+            if wait:
+                self._reject(wait)
+        if self._slots is not None and not self._slots.acquire(timeout=timeout):
+            self._reject(timeout)
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """Give back the concurrency slot taken by :meth:`acquire`."""
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def _reject(self, retry_after: float) -> None:
+        with self._lock:
+            self.throttled += 1
+        raise ThrottledError(self.name, retry_after)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the limits and their current use."""
+        info: Dict[str, Any] = {'in_flight': self.in_flight, 'throttled': self.throttled}
+        if self.max_concurrency:
+            info['max_concurrency'] = self.max_concurrency
+        if self.limiter:
+            info['rate_limit'] = {'requests': self.limiter.requests, 'per': self.limiter.per}
+        return info
+
+class EndpointPolicy:
+    """Settings for one provider endpoint, e.g. ``list_servers``."""
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.cache_ttl: Optional[float] = spec.get('cache_ttl')
+        self.timeout: Optional[float] = spec.get('timeout')
+        self.idempotent: Optional[bool] = spec.get('idempotent')
+        self.limits = Limits(name, spec)
+
+class ProviderPolicy:
+    """A plugin's performance settings, parsed from its manifest."""
+    def __init__(self, name: str, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.name = name
+        self.timeout: Optional[float] = spec.get('timeout')
+        self.limits = Limits(name, spec)
+        self.pagination: Dict[str, Any] = dict(spec.get('pagination') or {'style': 'none'})
+        if self.pagination.get('style', 'none') not in PAGINATION_STYLES:
+            raise ValueError(f"Unknown pagination style '{self.pagination['style']}'")
+        self.endpoints = {endpoint: EndpointPolicy(f'{name}.{endpoint}', endpoint_spec)
+                          for endpoint, endpoint_spec in (spec.get('endpoints') or {}).items()}
+        # Each account's copy of the provider (endpoint None) and endpoint limits
+        self._account_limits: Dict[Tuple[str, Optional[str]], Limits] = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, endpoint: str) -> Optional[EndpointPolicy]:
+        """The endpoint's own settings, if the manifest has any."""
+        return self.endpoints.get(endpoint)
+
+    def timeout_for(self, endpoint: str, default: float) -> float:
+        """Request timeout for an endpoint."""
+        settings = self.endpoints.get(endpoint)
+        if settings and settings.timeout is not None:
+            return settings.timeout
+        return self.timeout if self.timeout is not None else default
+
+    def cache_ttl(self, endpoint: str, default: float = 0) -> float:
+        """Seconds an endpoint's responses may be cached."""
+        settings = self.endpoints.get(endpoint)
+        if settings and settings.cache_ttl is not None:
+            return settings.cache_ttl
+        return default
+
+    def idempotent(self, endpoint: str, default: bool) -> bool:
+        """Whether an endpoint is safe to hedge and serve stale."""
+        settings = self.endpoints.get(endpoint)
+        if settings and settings.idempotent is not None:
+            return settings.idempotent
+        return default
+
+    def limits_for(self, account: Optional[str], endpoint: Optional[str] = None) -> Optional[Limits]:
+        """
+        The provider's limits, or an endpoint's (None if it has no settings),
+        as applied to one account. Calls without an account share the
+        provider-wide copy.
+        """
+        if endpoint is None:
+            shared: Optional[Limits] = self.limits
+        else:
+            settings = self.endpoints.get(endpoint)
+            shared = settings.limits if settings else None
+        if shared is None or account is None or not shared.active:
+            return shared
+        key = (account, endpoint)
+        with self._lock:
+            if key not in self._account_limits:
+                self._account_limits[key] = Limits(f'{shared.name}[{account}]', shared.spec)
+            return self._account_limits[key]
+
+    def _limiters(self, endpoint: str) -> List[RateLimiter]:
+        """Every rate limiter that applies to an endpoint, shared or of an account."""
+        settings = self.endpoints.get(endpoint)
+        candidates = [self.limits, settings.limits if settings else None]
+        with self._lock:
+            candidates.extend(limits for (_, scope), limits in self._account_limits.items()
+                              if scope is None or scope == endpoint)
+        return [limits.limiter for limits in candidates if limits is not None and limits.limiter is not None]
+
+    def request_rate(self, endpoint: str) -> Optional[float]:
+        """Sustained requests per second allowed for an endpoint, or None if unlimited."""
+        settings = self.endpoints.get(endpoint)
+        rates = [limits.limiter.rate for limits in (self.limits, settings.limits if settings else None)
+                 if limits is not None and limits.limiter is not None]
+        return min(rates) if rates else None
+
+    def headroom(self, endpoint: str) -> Optional[float]:
+        """
+        Share of an endpoint's rate limit burst still available (0-1), or
+        None if unlimited. The account with the least left decides.
+        """
+        shares = [limiter.available() / limiter.requests for limiter in self._limiters(endpoint)]
+        return min(shares) if shares else None
+
+    @contextmanager
+    def admit(self, endpoint: str, timeout: float = ADMISSION_TIMEOUT,
+              account: Optional[str] = None) -> Iterator[None]:
+        """Hold an account's provider and endpoint limits for the duration of a call."""
+        held: List[Limits] = []
+        try:
+            for limits in (self.limits_for(account), self.limits_for(account, endpoint)):
+                if limits is not None and limits.active:
+                    limits.acquire(timeout)
+                    held.append(limits)
+            yield
+        finally:
+            for limits in reversed(held):
+                limits.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the policy's limits, for ``/status``."""
+        info = self.limits.snapshot() if self.limits.active else {}
+        endpoints = {name: settings.limits.snapshot()
+                     for name, settings in self.endpoints.items() if settings.limits.active}
+        with self._lock:
+            account_limits = sorted(self._account_limits.items(), key=lambda kv: (kv[0][0], kv[0][1] or ''))
+        for (account, endpoint), limits in account_limits:
+            entry = info if endpoint is None else endpoints[endpoint]
+            entry.setdefault('accounts', {})[account] = limits.snapshot()
+        if endpoints:
+            info['endpoints'] = endpoints
+        return info
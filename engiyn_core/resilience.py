@@ -0,0 +1,336 @@
+"""
+Engiyn Cloud Bridge - Provider Call Resilience
+
+Guards every upstream provider call with per-provider and per-endpoint circuit
+breakers. Exceptions count as failures, including :class:`UpstreamError` for
+HTTP 5xx and 429 answers; other HTTP errors mean the provider is up. While a
+breaker is open, calls fail fast, or idempotent reads serve
+the last-known response. Idempotent reads can also be hedged: if the first
+attempt has not returned once the endpoint's p95 latency has passed, a second
+attempt is sent and whichever succeeds first wins.
+
+Calls are admitted under the provider's manifest policy (concurrency and rate
+limits, idempotency overrides), see :mod:`engiyn_core.policy`.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from engiyn_core.policy import ProviderPolicy, ThrottledError
+
+# Timeout in seconds for a single HTTP request to a provider API
+REQUEST_TIMEOUT = 10
+
+# Consecutive failures before a breaker opens
+FAILURE_THRESHOLD = 5
+
+# Seconds an open breaker waits before letting a trial call through
+RESET_TIMEOUT = 30.0
+
+# Latency samples kept per endpoint, and the minimum needed before hedging
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+# Last-known responses kept for serving while a provider is unhealthy
+LAST_KNOWN_SIZE = 1024
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='engiyn-hedge')
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open."""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f'Circuit open for {name}, retry in {retry_after:.0f}s')
+        self.name = name
+        self.retry_after = retry_after
+
+class UpstreamError(Exception):
+    """Raised when a provider answers a call with an HTTP error."""
+    def __init__(self, name: str, upstream_status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f'{name} returned HTTP {upstream_status}: {message}')
+        self.name = name
+        self.upstream_status = upstream_status
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        """True if the provider is failing (5xx) or overloaded (429), rather than refusing the request."""
+        return self.upstream_status >= 500 or self.upstream_status == 429
+
+    @property
+    def status(self) -> int:
+        """HTTP status the bridge answers with."""
+        return 502 if self.upstream_status >= 500 else self.upstream_status
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    Closed breakers let calls through. After ``failure_threshold`` failures in
+    a row the breaker opens and rejects calls for ``reset_timeout`` seconds,
+    then half-opens to let a single trial call decide whether to close again.
+    """
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_started = None
+            if self.state == HALF_OPEN:
+                # One trial at a time; a trial that never reports back expires
+                if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                    return False
+                self._trial_started = now
+            return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the breaker."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_started = None
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial without recording a result."""
+        with self._lock:
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker past the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_started = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the breaker's current state."""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_after': round(self.retry_after(), 1),
+        }
+
+class LatencyTracker:
+    """Sliding window of call latencies for one endpoint."""
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.hedges = 0
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of one call."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the ``pct`` percentile latency in seconds, if known."""
+        with self._lock:
+            if len(self._samples) < MIN_HEDGE_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class ProviderGuard:
+    """
+    Registry of breakers, latency trackers and last-known responses for all
+    provider calls made through :meth:`call`.
+    """
+    def __init__(self):
+        self.hedging = False
+        self._breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+        self._trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._last_known: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._policies: Dict[str, ProviderPolicy] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, provider: str, policy: ProviderPolicy) -> None:
+        """Apply a provider's manifest policy to its calls."""
+        with self._lock:
+            self._policies[provider] = policy
+
+    def policy(self, provider: str) -> ProviderPolicy:
+        """Get a provider's policy, or an empty one if none is configured."""
+        with self._lock:
+            if provider not in self._policies:
+                self._policies[provider] = ProviderPolicy(provider)
+            return self._policies[provider]
+
+    def breaker(self, provider: str, endpoint: Optional[str] = None) -> CircuitBreaker:
+        """Get the breaker for a provider, or for one of its endpoints."""
+        key = (provider, endpoint)
+        with self._lock:
+            if key not in self._breakers:
+                name = f'{provider}.{endpoint}' if endpoint else provider
+                self._breakers[key] = CircuitBreaker(name)
+            return self._breakers[key]
+
+    def tracker(self, provider: str, endpoint: str) -> LatencyTracker:
+        """Get the latency tracker for a provider endpoint."""
+        key = (provider, endpoint)
+        with self._lock:
+            if key not in self._trackers:
+                self._trackers[key] = LatencyTracker()
+            return self._trackers[key]
+
+    def call(self, provider: str, endpoint: str, fn: Callable[..., Any],
+             args: Tuple[Any, ...], kwargs: Dict[str, Any], idempotent: bool = False,
+             account: Optional[str] = None) -> Any:
+        """
+        Run a provider call through its limits and breakers, hedging if
+        enabled. Rate and concurrency limits are those of ``account``.
+        """
+        policy = self.policy(provider)
+        idempotent = policy.idempotent(endpoint, idempotent)
+        breakers = (self.breaker(provider), self.breaker(provider, endpoint))
+        key = (provider, endpoint, args, tuple(sorted(kwargs.items()))) if idempotent else None
+
+        for i, breaker in enumerate(breakers):
+            if not breaker.allow():
+                # Hand back half-open trials already taken by the breakers before this one
+                for admitted in breakers[:i]:
+                    admitted.release_trial()
+                stale = self._stale(key) if idempotent else None
+                if stale is not None:
+                    return stale
+                raise CircuitOpenError(breaker.name, breaker.retry_after())
+
+        tracker = self.tracker(provider, endpoint)
+        try:
+            with policy.admit(endpoint, account=account):
+                if idempotent and self.hedging:
+                    result = self._hedged(tracker, fn, args, kwargs)
+                else:
+                    result = self._timed(tracker, fn, args, kwargs)
+        except ThrottledError:
+            # Our own limits, not an upstream failure: leave the breakers alone
+            for breaker in breakers:
+                breaker.release_trial()
+            stale = self._stale(key) if idempotent else None
+            if stale is not None:
+                return stale
+            raise
+        except Exception as e:
+            if isinstance(e, UpstreamError) and not e.transient:
+                # The provider is up and refused the request; nothing to remember or serve stale
+                for breaker in breakers:
+                    breaker.record_success()
+                raise
+            for breaker in breakers:
+                breaker.record_failure()
+            stale = self._stale(key) if idempotent else None
+            if stale is not None:
+                return stale
+            raise
+
+        for breaker in breakers:
+            breaker.record_success()
+        if idempotent:
+            self._remember(key, result)
+        return result
+
+    @staticmethod
+    def _timed(tracker: LatencyTracker, fn: Callable[..., Any],
+               args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """Run one attempt, recording its latency if it succeeds."""
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        tracker.record(time.monotonic() - start)
+        return result
+
+    def _hedged(self, tracker: LatencyTracker, fn: Callable[..., Any],
+                args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """Run a call, sending a second attempt once p95 latency has passed."""
+        delay = tracker.percentile(95)
+        if delay is None:
+            return self._timed(tracker, fn, args, kwargs)
+
+        first = _hedge_executor.submit(self._timed, tracker, fn, args, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        tracker.hedges += 1
+        second = _hedge_executor.submit(self._timed, tracker, fn, args, kwargs)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [f for f in done if f.exception() is None]
+            if succeeded:
+                return succeeded[0].result()
+        return first.result()
+
+    def _remember(self, key: Any, result: Any) -> None:
+        """Store the last successful response for a call."""
+        with self._lock:
+            self._last_known[key] = result
+            self._last_known.move_to_end(key)
+            while len(self._last_known) > LAST_KNOWN_SIZE:
+                self._last_known.popitem(last=False)
+
+    def _stale(self, key: Any) -> Any:
+        """Return the last-known response for a call, marked as stale."""
+        with self._lock:
+            result = self._last_known.get(key)
+        if isinstance(result, dict):
+            return {**result, 'stale': True}
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe breaker state and latency per provider, for ``/status``."""
+        with self._lock:
+            breakers = dict(self._breakers)
+            trackers = dict(self._trackers)
+
+        with self._lock:
+            policies = dict(self._policies)
+
+        providers: Dict[str, Any] = {}
+        for (provider, endpoint), breaker in sorted(breakers.items(), key=lambda kv: (kv[0][0], kv[0][1] or '')):
+            entry = providers.setdefault(provider, {'endpoints': {}})
+            if endpoint is None:
+                entry.update(breaker.snapshot())
+                continue
+            info = breaker.snapshot()
+            tracker = trackers.get((provider, endpoint))
+            if tracker:
+                p95 = tracker.percentile(95)
+                info['p95_ms'] = round(p95 * 1000, 1) if p95 is not None else None
+                info['hedges'] = tracker.hedges
+            entry['endpoints'][endpoint] = info
+        for provider, policy in sorted(policies.items()):
+            limits = policy.snapshot()
+            if limits:
+                providers.setdefault(provider, {'endpoints': {}})['limits'] = limits
+        return {'hedging': self.hedging, 'providers': providers}
+
+# Shared guard used by all provider plugins
+guard = ProviderGuard()
@@ -0,0 +1,196 @@
+"""
+Engiyn Cloud Bridge - Refresh Scheduler
+
+Owns the background refresh of every provider's server list, which keeps the
+fleet index behind ``/summary`` and ``/fleet`` current. Each provider has its
+own interval, adapted after every refresh:
+
+- a refresh that changed the provider's records halves the interval, one
+  that changed nothing stretches it, so idle fleets are polled rarely;
+- for a while after a server is created or deleted through the bridge the
+  provider is refreshed at the minimum interval, to follow it as it boots
+  or goes away;
+- the interval never uses more than a share of the provider's
+  ``list_servers`` rate limit, and backs off while little of the limit's
+  burst is left.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from engiyn_core.resilience import guard
+
+# Interval of a provider's first refresh, and its bounds
+REFRESH_INTERVAL = 60.0
+MIN_REFRESH_INTERVAL = 15.0
+MAX_REFRESH_INTERVAL = 600.0
+
+# Interval multiplier after a refresh that found no change
+IDLE_BACKOFF = 1.5
+
+# Seconds of minimum-interval refreshes after a create or delete
+BOOST_WINDOW = 120.0
+
+# Seconds from a create or delete to the refresh that follows it
+NUDGE_DELAY = 5.0
+
+# Share of a provider's list_servers rate limit that refreshes may use
+REFRESH_QUOTA_SHARE = 0.25
+
+# Rate limit headroom below which refreshes back off
+LOW_HEADROOM = 0.2
+
+# A refresh lists a provider's servers into the fleet index and returns the
+# number of records its listing changed and of upstream requests it took
+Refresh = Callable[[], Tuple[int, int]]
+
+def next_interval(interval: float, changed: int, boosted: bool, requests: int,
+                  request_rate: Optional[float] = None, headroom: Optional[float] = None) -> float:
+    """
+    Seconds until a provider's next refresh.
+
+    ``interval`` is the current interval, ``changed`` the number of records
+    the last refresh changed and ``requests`` the requests it took.
+    ``request_rate`` and ``headroom`` describe the provider's rate limit, as
+    returned by its policy.
+    """
+    if boosted:
+        interval = MIN_REFRESH_INTERVAL
+    elif changed:
+        interval = max(MIN_REFRESH_INTERVAL, interval / 2)
+    else:
+        interval = min(MAX_REFRESH_INTERVAL, interval * IDLE_BACKOFF)
+
+    if headroom is not None and headroom < LOW_HEADROOM:
+        interval = min(MAX_REFRESH_INTERVAL, max(interval, REFRESH_INTERVAL) * 2)
+
+    # Rate limits win over every bound
+    if request_rate and requests:
+        interval = max(interval, requests / (request_rate * REFRESH_QUOTA_SHARE))
+    return interval
+
+class _Schedule:
+    """Refresh state of one provider."""
+    def __init__(self, name: str, refresh: Refresh):
+        self.name = name
+        self.refresh = refresh
+        self.interval = REFRESH_INTERVAL
+        self.due = time.time()
+        self.boost_until = 0.0
+        self.refreshes = 0
+        self.changed = 0
+        self.updated_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+class RefreshScheduler:
+    """
+    Refreshes each provider's servers on its own adaptive interval.
+
+    Each provider is refreshed by its own thread, so a slow provider does
+    not delay the others.
+    """
+    def __init__(self):
+        self._schedules: Dict[str, _Schedule] = {}
+        self._lock = threading.Lock()
+        # Called with every nudged provider, e.g. to pass a plugin worker's nudges on to the bridge
+        self.forward: Optional[Callable[[str], None]] = None
+
+    def add(self, name: str, refresh: Refresh) -> None:
+        """Schedule a provider's refreshes, without starting them."""
+        with self._lock:
+            schedule = self._schedules.get(name)
+            if schedule is None:
+                self._schedules[name] = _Schedule(name, refresh)
+            else:
+                schedule.refresh = refresh
+
+    def start(self, sources: Dict[str, Refresh]) -> None:
+        """Refresh every source now and then on its adaptive interval, in the background."""
+        for name, refresh in sources.items():
+            self.add(name, refresh)
+        with self._lock:
+            for name in sources:
+                schedule = self._schedules[name]
+                if schedule.thread is None:
+                    schedule.thread = threading.Thread(target=self._run, args=(schedule,),
+                                                       name=f'engiyn-refresh-{name}', daemon=True)
+                    schedule.thread.start()
+
+    def nudge(self, name: str) -> None:
+        """Refresh a provider soon and keep refreshing it often, e.g. after a create or delete."""
+        if self.forward is not None:
+            self.forward(name)
+        with self._lock:
+            schedule = self._schedules.get(name)
+            if schedule is None:
+                return
+            now = time.time()
+            schedule.boost_until = now + BOOST_WINDOW
+            schedule.due = min(schedule.due, now + NUDGE_DELAY)
+        schedule.wake.set()
+
+    def providers(self) -> List[str]:
+        """Names of the providers this scheduler refreshes."""
+        with self._lock:
+            return list(self._schedules)
+
+    def refresh(self, name: str) -> None:
+        """Refresh one provider now and schedule its next refresh."""
+        self._refresh(self._schedules[name])
+
+    def _refresh(self, schedule: _Schedule) -> None:
+        changed = requests = 0
+        try:
+            changed, requests = schedule.refresh()
+            schedule.last_error = None
+        except Exception as e:
+            schedule.last_error = str(e)
+
+        policy = guard.policy(schedule.name)
+        with self._lock:
+            now = time.time()
+            schedule.refreshes += 1
+            schedule.changed = changed
+            if schedule.last_error is None:
+                schedule.updated_at = now
+            if schedule.last_error is not None or not requests:
+                # Failed, or nothing to list: no point in hurrying
+                schedule.interval = min(MAX_REFRESH_INTERVAL, schedule.interval * IDLE_BACKOFF)
+            else:
+                schedule.interval = next_interval(schedule.interval, changed, now < schedule.boost_until, requests,
+                                                  policy.request_rate('list_servers'),
+                                                  policy.headroom('list_servers'))
+            schedule.due = now + schedule.interval
+
+    def _run(self, schedule: _Schedule) -> None:
+        """Refresh a provider whenever it is due."""
+        while True:
+            wait = schedule.due - time.time()
+            if wait > 0:
+                schedule.wake.wait(wait)
+                schedule.wake.clear()
+                continue
+            self._refresh(schedule)
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """Describe each provider's refreshes, for ``/status``."""
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    'interval': round(schedule.interval, 1),
+                    'next_refresh_in': round(max(0.0, schedule.due - now), 1),
+                    'boosted': now < schedule.boost_until,
+                    'refreshes': schedule.refreshes,
+                    'last_changed': schedule.changed,
+                    'updated_at': schedule.updated_at,
+                    'last_error': schedule.last_error,
+                }
+                for name, schedule in self._schedules.items()
+            }
+
+# Refresh scheduler of the bridge
+scheduler = RefreshScheduler()
@@ -0,0 +1,209 @@
+"""
+Engiyn Cloud Bridge - Response Serialization
+
+Provides the JSON provider installed on the bridge's Flask app. It encodes with
+orjson when available, negotiates msgpack and NDJSON bodies from the request's
+Accept header, and streams large collections in chunks instead of building the
+whole body in memory.
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+# Supported response formats
+MIMETYPE_JSON = 'application/json'
+MIMETYPE_MSGPACK = 'application/msgpack'
+MIMETYPE_NDJSON = 'application/x-ndjson'
+
+# Collections with at least this many items are streamed
+STREAM_MIN_ITEMS = 500
+
+# Target size of each streamed chunk in bytes
+CHUNK_SIZE = 64 * 1024
+
+def available_formats() -> List[str]:
+    """List the response mimetypes this bridge can produce, preferred first."""
+    formats = [MIMETYPE_JSON, MIMETYPE_NDJSON]
+    if msgpack is not None:
+        formats.insert(1, MIMETYPE_MSGPACK)
+    return formats
+
+def negotiate_format(accept: Any) -> str:
+    """Pick the response mimetype for a werkzeug ``MIMEAccept`` header."""
+    return accept.best_match(available_formats(), default=MIMETYPE_JSON)
+
+def is_large(obj: Any) -> bool:
+    """Return True if the payload holds a collection worth streaming."""
+    if isinstance(obj, list):
+        return len(obj) >= STREAM_MIN_ITEMS
+    if isinstance(obj, dict):
+        return any(isinstance(v, list) and len(v) >= STREAM_MIN_ITEMS
+                   for v in obj.values())
+    return False
+
+def iter_records(obj: Any) -> Iterator[Any]:
+    """Yield the records of a payload for line-delimited output.
+
+    A list yields its items. A dict yields the items of its primary
+    collection, the first non-empty list of records (e.g. ``servers`` in a
+    Hetzner response, not the ``accounts`` names next to it), or itself if
+    it holds no list of records.
+    """
+    if isinstance(obj, list):
+        yield from obj
+        return
+    if isinstance(obj, dict):
+        collections = [v for v in obj.values()
+                       if isinstance(v, list) and all(isinstance(item, dict) for item in v)]
+        if collections:
+            yield from next((items for items in collections if items), [])
+            return
+    yield obj
+
+def _chunked(pieces: Iterator[bytes], size: Optional[int] = None) -> Iterator[bytes]:
+    """Coalesce small encoded pieces into chunks of roughly ``size`` bytes (default :data:`CHUNK_SIZE`)."""
+    size = size or CHUNK_SIZE
+    buf: List[bytes] = []
+    buffered = 0
+    for piece in pieces:
+        buf.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield b''.join(buf)
+            buf = []
+            buffered = 0
+    if buf:
+        yield b''.join(buf)
+
+class BridgeJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider used by the bridge.
+
+    ``jsonify`` in the core and in plugins goes through :meth:`response`, so
+    every route gets the fast encoder and content negotiation without changes.
+    """
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON to a string."""
+        if orjson is not None and not kwargs:
+            return self.dumpb(obj).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def dumpb(self, obj: Any) -> bytes:
+        """Serialize data as compact UTF-8 JSON bytes."""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option)
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """Deserialize data from a JSON string or bytes."""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def packb(self, obj: Any) -> bytes:
+        """Serialize data as msgpack bytes."""
+        return msgpack.packb(obj, default=self.default, use_bin_type=True)
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        """Serialize the arguments in the format the client asked for."""
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = MIMETYPE_JSON
+        if has_request_context():
+            mimetype = negotiate_format(request.accept_mimetypes)
+
+        if mimetype == MIMETYPE_NDJSON:
+            body: Any = _chunked(self.dumpb(r) + b'\n' for r in iter_records(obj))
+        elif mimetype == MIMETYPE_MSGPACK:
+            body = _chunked(self.iter_msgpack(obj)) if is_large(obj) else self.packb(obj)
+        elif self._app.debug and self.compact is not False:
+            body = f"{super().dumps(obj, indent=2)}\n"
+        else:
+            body = _chunked(self.iter_json(obj)) if is_large(obj) else self.dumpb(obj) + b'\n'
+
+        response = self._app.response_class(body, mimetype=mimetype)
+        response.vary.add('Accept')
+        return response
+
+    def iter_json(self, obj: Any) -> Iterator[bytes]:
+        """Encode a payload as JSON one collection item at a time."""
+        def encode_list(items: List[Any]) -> Iterator[bytes]:
+            yield b'['
+            for i, item in enumerate(items):
+                yield (b',' if i else b'') + self.dumpb(item)
+            yield b']'
+
+        if isinstance(obj, list):
+            yield from encode_list(obj)
+        elif isinstance(obj, dict):
+            yield b'{'
+            for i, (key, value) in enumerate(obj.items()):
+                yield (b',' if i else b'') + self.dumpb(str(key)) + b':'
+                if isinstance(value, list):
+                    yield from encode_list(value)
+                else:
+                    yield self.dumpb(value)
+            yield b'}'
+        else:
+            yield self.dumpb(obj)
+        yield b'\n'
+
+    def iter_msgpack(self, obj: Any) -> Iterator[bytes]:
+        """Encode a payload as msgpack one collection item at a time."""
+        packer = msgpack.Packer(default=self.default, use_bin_type=True)
+        if isinstance(obj, list):
+            yield packer.pack_array_header(len(obj))
+            for item in obj:
+                yield packer.pack(item)
+            return
+        if isinstance(obj, dict):
+            yield packer.pack_map_header(len(obj))
+            for key, value in obj.items():
+                yield packer.pack(key)
+                if isinstance(value, list):
+                    yield packer.pack_array_header(len(value))
+                    for item in value:
+                        yield packer.pack(item)
+                else:
+                    yield packer.pack(value)
+            return
+        yield packer.pack(obj)
+
+def decode_body(data: bytes, mimetype: Optional[str] = None) -> Any:
+    """Decode a bridge response body produced in any supported format."""
+    mimetype = (mimetype or MIMETYPE_JSON).split(';')[0].strip()
+    if mimetype == MIMETYPE_MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    if mimetype == MIMETYPE_NDJSON:
+        return [_loads(line) for line in data.splitlines() if line.strip()]
+    return _loads(data)
+
+def _loads(data: Any) -> Any:
+    """Deserialize JSON with the fastest available decoder."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def format_info() -> Dict[str, Any]:
+    """Describe the serializer backends in use, for ``/status``."""
+    return {
+        'json': 'orjson' if orjson is not None else 'stdlib',
+        'formats': available_formats(),
+    }
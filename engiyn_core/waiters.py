@@ -0,0 +1,149 @@
+"""
+Engiyn Cloud Bridge - Server Status Waiters
+
+Parks "wait until status" requests and serves all of a provider's waiters
+from one shared poller. Each poll is a single list call across the provider's
+accounts, so a rollout of many servers costs one upstream call per interval
+instead of one per server per interval. Polls are spaced so they use at most
+a share of the provider's ``list_servers`` rate limit.
+
+The poller only runs while someone is waiting. Process-isolated plugins are
+polled from the bridge process, through their workers, so a parked request
+never holds a worker.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from engiyn_core.resilience import guard
+
+# Seconds between polls while any request is waiting
+POLL_INTERVAL = 5.0
+
+# Default and maximum seconds a request may wait
+DEFAULT_WAIT_TIMEOUT = 60.0
+MAX_WAIT_TIMEOUT = 300.0
+
+# Share of a provider's list_servers rate limit that polls may use
+POLL_QUOTA_SHARE = 0.25
+
+# Target status met once a server no longer appears in the provider's list
+DELETED = 'deleted'
+
+# A poll returns ``{server_id: status}``, whether every account answered and
+# the number of upstream requests it took
+PollResult = Tuple[Dict[str, str], bool, int]
+
+def poll_interval(interval: float, requests: int, request_rate: Optional[float] = None) -> float:
+    """Seconds until the next poll, stretched to fit the provider's rate limit."""
+    if request_rate and requests:
+        return max(interval, requests / (request_rate * POLL_QUOTA_SHARE))
+    return interval
+
+class _Waiter:
+    """One parked request and the statuses it is waiting for."""
+    def __init__(self, ids: List[str], targets: Set[str], require_all: bool):
+        self.ids = ids
+        self.targets = targets
+        self.require_all = require_all
+        self.seen: Dict[str, Optional[str]] = {server_id: None for server_id in ids}
+        self.event = threading.Event()
+
+    def reached(self, server_id: str) -> bool:
+        """Return True if a server is in one of the target states."""
+        return self.seen[server_id] in self.targets
+
+    def update(self, statuses: Dict[str, str], complete: bool) -> bool:
+        """Record a poll result, waking the request if it is satisfied."""
+        for server_id in self.ids:
+            if server_id in statuses:
+                self.seen[server_id] = statuses[server_id]
+            elif complete:
+                # Only a list that every account answered proves deletion
+                self.seen[server_id] = DELETED
+        reached = [server_id for server_id in self.ids if self.reached(server_id)]
+        if len(reached) == len(self.ids) or (reached and not self.require_all):
+            self.event.set()
+        return self.event.is_set()
+
+class StatusPoller:
+    """
+    Shared poller for one provider.
+
+    ``fetch`` lists every server of the provider and returns a
+    :data:`PollResult`. Waiters are checked against the most recent poll
+    straight away, then against every new poll until satisfied or timed out.
+    """
+    def __init__(self, name: str, fetch: Callable[[], PollResult], interval: float = POLL_INTERVAL):
+        self.name = name
+        self.interval = interval
+        self.polls = 0
+        self.last_error: Optional[str] = None
+        self.updated_at: Optional[float] = None
+        self._fetch = fetch
+        self._last: Optional[Tuple[Dict[str, str], bool]] = None
+        self._waiters: List[_Waiter] = []
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def wait(self, ids: Iterable[str], targets: Iterable[str], timeout: float = DEFAULT_WAIT_TIMEOUT,
+             require_all: bool = True) -> Tuple[bool, Dict[str, Optional[str]]]:
+        """
+        Block until the servers reach one of the target statuses.
+
+        Returns ``(ready, {server_id: last_seen_status})``. With
+        ``require_all`` False, one server reaching its target is enough.
+        """
+        waiter = _Waiter([str(i) for i in ids], set(targets), require_all)
+        with self._lock:
+            fresh = self._last is not None and time.time() - (self.updated_at or 0) < self.interval
+            if not (fresh and waiter.update(*self._last)):
+                self._waiters.append(waiter)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f'engiyn-wait-{self.name}',
+                                                    daemon=True)
+                    self._thread.start()
+
+        ready = waiter.event.wait(max(0.0, min(timeout, MAX_WAIT_TIMEOUT)))
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            return ready or waiter.event.is_set(), dict(waiter.seen)
+
+    def _run(self) -> None:
+        """Poll until no requests are waiting."""
+        while True:
+            requests = 0
+            try:
+                statuses, complete, requests = self._fetch()
+                result: Optional[Tuple[Dict[str, str], bool]] = (statuses, complete)
+                self.last_error = None
+            except Exception as e:
+                result = None
+                self.last_error = str(e)
+            self.polls += 1
+
+            with self._lock:
+                if result is not None:
+                    self._last = result
+                    self.updated_at = time.time()
+                    self._waiters = [w for w in self._waiters if not w.update(*result)]
+                if not self._waiters:
+                    self._thread = None
+                    return
+            time.sleep(poll_interval(self.interval, requests, guard.policy(self.name).request_rate('list_servers')))
+
+    def status(self) -> Dict[str, object]:
+        """Describe the poller, for ``/status``."""
+        with self._lock:
+            waiting = len(self._waiters)
+        return {
+            'waiting': waiting,
+            'polls': self.polls,
+            'updated_at': self.updated_at,
+            'last_error': self.last_error,
+        }
+
+# Status pollers of all providers, by provider name
+pollers: Dict[str, StatusPoller] = {}
@@ -0,0 +1,45 @@
+# Engiyn Python SDK
+
+from flask import Flask
+from jsonschema import validate
+import json
+import importlib
+import os
+
+from .provider import CloudProvider, Catalog, Param, Servers
+
+# Manifest schema, looked up in the working directory and then next to the SDK
+SCHEMA_PATHS = [
+    os.path.join(os.getcwd(), "plugin_schema.json"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugin_schema.json"),
+]
+
+_schema = None
+
+def load_schema() -> dict:
+    global _schema
+    if _schema is None:
+        path = next((p for p in SCHEMA_PATHS if os.path.exists(p)), SCHEMA_PATHS[0])
+        with open(path, 'r') as f:
+            _schema = json.load(f)
+    return _schema
+
+def load_manifest(path: str) -> dict:
+    with open(path) as f:
+        manifest = json.load(f)
+    validate(instance=manifest, schema=load_schema())
+    return manifest
+
+class Plugin:
+    def __init__(self, manifest_path: str):
+        self.manifest = load_manifest(manifest_path)
+        module_name = self.manifest['entrypoint']
+        self.module = importlib.import_module(module_name)
+
+    def register_http(self, app: Flask):
+        if hasattr(self.module, 'register_http'):
+            self.module.register_http(app)
+
+    def register_cli(self, cli_group):
+        if hasattr(self.module, 'register_cli'):
+            self.module.register_cli(cli_group)
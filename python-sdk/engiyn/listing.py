@@ -0,0 +1,288 @@
+"""
+Engiyn Python SDK - List Output
+
+Prints the servers of a generated ``list`` command as they arrive, one page
+at a time, as plain lines, an aligned table or NDJSON. With ``--watch`` the
+list is refreshed periodically and only changes are shown: on a terminal the
+rows that changed are rewritten in place, otherwise each change is printed
+as it is seen.
+
+While a bridge is running, watching follows its fleet index, which the
+bridge's scheduler keeps current: each tick reads the ``/summary`` version
+and re-reads the provider's ``/fleet`` records only when it changed, so
+watching costs no provider requests. Without a bridge each tick re-lists the
+provider, budgeted against its manifest rate limit. Either way a refresh is
+compared with the listing's own previous read before any diffing, so an
+unchanged fleet costs neither diffing nor redraws.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import click
+import requests
+
+FORMATS = ('text', 'table', 'ndjson')
+
+# Default seconds between refreshes with --watch
+WATCH_INTERVAL = 10.0
+
+# Share of a provider's rate limit a watching list may use
+WATCH_QUOTA_SHARE = 0.25
+
+# Bridge whose fleet index a watching list follows
+BRIDGE_URL = os.environ.get('ENGIYN_BRIDGE_URL', 'http://localhost:5005')
+
+# Seconds to wait for the bridge to answer
+BRIDGE_TIMEOUT = 5.0
+
+# Table columns and their widths
+TABLE_COLUMNS = (('id', 12), ('name', 24), ('status', 12), ('region', 10), ('type', 14), ('account', 12))
+
+Page = Tuple[str, List[Dict[str, Any]], Optional[str]]
+
+def record_key(record: Dict[str, Any]) -> Tuple[str, str]:
+    """Identify a server record across refreshes."""
+    return str(record.get('account')), str(record['id'])
+
+class Formatter:
+    """Formats normalized server records as lines of one output format."""
+    def __init__(self, fmt: str, id_width: int = 12):
+        self.fmt = fmt
+        self.columns = [(name, id_width if name == 'id' else width) for name, width in TABLE_COLUMNS]
+
+    def header(self) -> Optional[str]:
+        """The table header line, if the format has one."""
+        if self.fmt != 'table':
+            return None
+        return self._cells({name: name.upper() for name, _ in self.columns})
+
+    def line(self, record: Dict[str, Any]) -> str:
+        """One record as a line."""
+        if self.fmt == 'ndjson':
+            return json.dumps(record, default=str)
+        if self.fmt == 'table':
+            return self._cells(record)
+        return f"{record['id']} - {record['name']} - {record['status']} - {record['account']}"
+
+    def change(self, event: str, record: Dict[str, Any]) -> str:
+        """A line reporting that a record was added, changed or removed."""
+        if self.fmt == 'ndjson':
+            return json.dumps({'event': event, 'server': record}, default=str)
+        marker = {'added': '+', 'changed': '~', 'removed': '-'}[event]
+        return f'{marker} {self.line(record)}'
+
+    def _cells(self, record: Dict[str, Any]) -> str:
+        cells = []
+        for name, width in self.columns:
+            value = record.get(name)
+            cells.append(str('' if value is None else value)[:width].ljust(width))
+        return '  '.join(cells).rstrip()
+
+class LiveBlock:
+    """
+    A block of lines at the bottom of a terminal, kept up to date by
+    rewriting only the lines whose text changed. The cursor rests on the
+    line below the block.
+    """
+    def __init__(self, lines: Iterable[str] = (), echo: Callable[..., None] = click.echo):
+        self.lines = list(lines)
+        self.echo = echo
+
+    def update(self, lines: List[str]) -> int:
+        """Redraw the block as ``lines``, returning how many lines were written."""
+        height = len(self.lines)
+        out = []
+        written = 0
+        for i, text in enumerate(lines[:height]):
+            if self.lines[i] != text:
+                up = height - i
+                out.append(f'\x1b[{up}A\r\x1b[2K{text}\x1b[{up}B\r')
+                written += 1
+        for text in lines[height:]:
+            out.append(f'\x1b[2K{text}\n')
+            written += 1
+        extra = height - len(lines)
+        if extra > 0:
+            out.append(f'\x1b[{extra}A' + '\x1b[2K\n' * extra + f'\x1b[{extra}A')
+        if out:
+            self.echo(''.join(out), nl=False)
+        self.lines = list(lines)
+        return written
+
+class BridgeFleet:
+    """A provider's servers in a running bridge's fleet index, read only when its version changes."""
+    def __init__(self, provider: str, url: str = BRIDGE_URL, session: Optional[requests.Session] = None):
+        self.provider = provider
+        self.url = url.rstrip('/')
+        self.session = session or requests.Session()
+        self.version: Optional[int] = None
+
+    def _get(self, path: str, **params: Any) -> Dict[str, Any]:
+        response = self.session.get(f'{self.url}{path}', params=params, timeout=BRIDGE_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def follow(self) -> bool:
+        """Start from the bridge's current version. Returns False if no bridge is answering."""
+        try:
+            self.version = self._get('/summary')['version']
+        except (requests.RequestException, ValueError, KeyError):
+            return False
+        return True
+
+    def pages(self) -> Optional[List[Page]]:
+        """The provider's records as one page per account, or None if the fleet has not changed."""
+        try:
+            version = self._get('/summary')['version']
+            if version == self.version:
+                return None
+            servers = self._get('/fleet', provider=self.provider)['servers']
+        except (requests.RequestException, ValueError, KeyError):
+            # Bridge gone for now: show no change and try again next tick
+            return None
+        self.version = version
+        accounts: Dict[str, List[Dict[str, Any]]] = {}
+        for record in servers:
+            accounts.setdefault(str(record.get('account')), []).append(record)
+        return [(account, records, None) for account, records in accounts.items()]
+
+class ServerListing:
+    """Prints a provider's servers and, when watching, the changes to them."""
+    def __init__(self, formatter: Formatter, plural: str, echo: Callable[..., None] = click.echo):
+        self.formatter = formatter
+        self.plural = plural
+        self.echo = echo
+        # Latest records in the order they were first seen
+        self.records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Records of the last read, failed accounts left out
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.errors: Dict[str, str] = {}
+        self.printed: List[str] = []
+        self._rows: Optional[List[str]] = None
+
+    def _print(self, line: str) -> None:
+        self.echo(line)
+        self.printed.append(line)
+
+    def _error(self, account: str, error: str) -> None:
+        # Keep NDJSON output parseable
+        if self.formatter.fmt == 'ndjson':
+            self.echo(f'Error listing account {account}: {error}', err=True)
+        else:
+            self._print(f'Error listing account {account}: {error}')
+
+    def show(self, pages: Iterable[Page]) -> int:
+        """Print the records of each page as it arrives. Returns the number of pages read."""
+        count = 0
+        header = self.formatter.header()
+        if header:
+            self._print(header)
+        for account, records, error in pages:
+            count += 1
+            if error:
+                self.errors[account] = error
+                self._error(account, error)
+            for record in records:
+                self.records[record_key(record)] = record
+                self._latest[record_key(record)] = record
+                self._print(self.formatter.line(record))
+        if not self.records and self.formatter.fmt != 'ndjson':
+            self._print(f'No {self.plural} found')
+        return count
+
+    def refresh(self, pages: Iterable[Page]) -> Tuple[int, Optional[List[Tuple[str, Dict[str, Any]]]]]:
+        """
+        Read a fresh listing. Returns the number of pages read and the
+        ``(event, record)`` changes, or None if the records are the same as
+        the last read's. Other writers of the fleet index do not hide changes.
+        """
+        count = 0
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.errors = {}
+        for account, records, error in pages:
+            count += 1
+            if error:
+                self.errors[account] = error
+            for record in records:
+                latest[record_key(record)] = record
+        if latest == self._latest:
+            return count, None
+        self._latest = latest
+
+        # Keep the display order; accounts that failed keep their previous records
+        records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        changes = []
+        for key, old in self.records.items():
+            if key in latest:
+                records[key] = latest[key]
+                if latest[key] != old:
+                    changes.append(('changed', latest[key]))
+            elif key[0] in self.errors:
+                records[key] = old
+            else:
+                changes.append(('removed', old))
+        for key, record in latest.items():
+            if key not in records:
+                records[key] = record
+                changes.append(('added', record))
+        self.records = records
+        self._rows = None
+        return count, changes
+
+    def rows(self) -> List[str]:
+        """The lines showing the current records."""
+        if self._rows is None:
+            header = self.formatter.header()
+            self._rows = [header] if header else []
+            self._rows.extend(self.formatter.line(record) for record in self.records.values())
+        return self._rows
+
+    def watch(self, fetch: Callable[[], Optional[Iterable[Page]]], interval: float, pages: int = 1,
+              request_rate: Optional[float] = None, live: Optional[bool] = None) -> None:
+        """
+        Refresh the listing until interrupted, showing only what changed.
+
+        ``fetch`` starts a new listing, or returns None if it knows nothing
+        changed, e.g. :meth:`BridgeFleet.pages`. ``pages`` is the number of requests
+        the last listing took; with a ``request_rate`` (requests per second
+        allowed by the manifest) the refresh interval is stretched so
+        watching uses at most :data:`WATCH_QUOTA_SHARE` of it.
+        """
+        if live is None:
+            live = sys.stdout.isatty() and self.formatter.fmt != 'ndjson'
+        block = LiveBlock(self.printed, self.echo) if live else None
+        reported = dict(self.errors)
+        try:
+            while True:
+                wait = interval
+                if request_rate:
+                    wait = max(interval, pages / (request_rate * WATCH_QUOTA_SHARE))
+                time.sleep(wait)
+
+                listed = fetch()
+                changes = None
+                if listed is not None:
+                    pages, changes = self.refresh(listed)
+                if block is not None and len(self.records) + 2 >= shutil.get_terminal_size().lines:
+                    # Rows that scrolled off cannot be rewritten in place
+                    block = None
+                if block is not None:
+                    status = f"Every {wait:g}s - {len(self.records)} {self.plural} - checked {time.strftime('%H:%M:%S')}"
+                    if self.errors:
+                        status += f" - failed: {', '.join(sorted(self.errors))}"
+                    block.update(self.rows() + [status])
+                    continue
+
+                for account, error in self.errors.items():
+                    if reported.get(account) != error:
+                        self._error(account, error)
+                reported = dict(self.errors)
+                for event, record in changes or ():
+                    self.echo(self.formatter.change(event, record))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,712 @@
+"""
+Engiyn Python SDK - Declarative Cloud Providers
+
+A cloud plugin subclasses :class:`CloudProvider` and declares its API instead
+of hand-writing routes and commands::
+
+    class Hetzner(CloudProvider):
+        name = 'hetzner'
+        display_name = 'Hetzner'
+        base_url = 'https://api.hetzner.cloud/v1'
+        servers = Servers('/servers', collection='servers', item='server',
+                          create=[Param('server_type', 'cx21', cli='type')])
+        catalogs = [Catalog('images')]
+
+    provider = Hetzner()
+    register_http = provider.register_http
+    register_cli = provider.register_cli
+
+The SDK generates the HTTP routes and Click commands. Every upstream call goes
+through one pooled ``requests.Session`` per provider, the bridge's circuit
+breakers and a TTL cache, and list/get calls fan out across the provider's
+configured accounts. Timeouts, cache TTLs and pagination can be tuned in the
+plugin manifest's ``performance`` block.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import click
+import requests
+from flask import jsonify, request
+from requests.adapters import HTTPAdapter
+
+from engiyn_core.accounts import AccountError, error_message, fan_out, find_across, select_account, stream_across
+from engiyn_core.fleet import fleet
+from engiyn_core.policy import ThrottledError
+from engiyn_core.resilience import REQUEST_TIMEOUT, CircuitOpenError, UpstreamError, guard
+from engiyn_core.scheduler import scheduler
+from engiyn_core.waiters import DEFAULT_WAIT_TIMEOUT, PollResult, StatusPoller, pollers
+
+from .listing import FORMATS, WATCH_INTERVAL, BridgeFleet, Formatter, ServerListing
+
+# Connections kept open per upstream host by a provider's session
+POOL_MAXSIZE = 32
+
+# Default seconds catalog reads (images, regions, sizes...) are cached
+CATALOG_TTL = 300
+
+# Upper bound on cached responses per provider
+CACHE_SIZE = 256
+
+# Default upper bound on pages followed by one paginated list call
+MAX_PAGES = 100
+
+# Failures of a guarded call that CLI commands report instead of raising
+CALL_ERRORS = (UpstreamError, CircuitOpenError, ThrottledError)
+
+class IncompleteListingError(Exception):
+    """Raised when a paginated listing has more pages than may be followed."""
+
+def call_error(e: Exception) -> str:
+    """Describe a failed guarded call for the CLI, with when to retry if known."""
+    if isinstance(e, UpstreamError) and e.retry_after:
+        return f'{e} (retry in {e.retry_after:.0f}s)'
+    return str(e)
+
+class Param:
+    """A create parameter, exposed as a JSON body field and a CLI option."""
+    def __init__(self, name: str, default: Any = None, field: Optional[str] = None,
+                 cli: Optional[str] = None, type: Any = str, help: str = ''):
+        self.name = name
+        self.default = default
+        self.field = field or name
+        self.cli = cli or name.replace('_', '-')
+        self.type = type
+        self.help = help
+
+class Servers:
+    """
+    Declares a provider's server collection.
+
+    ``collection`` and ``item`` are the response keys holding a list of
+    servers and a single server. ``fields`` maps normalized field names to
+    dotted paths into the provider's server records. ``ready_status`` is the
+    status a new server reaches once it is up.
+    """
+    def __init__(self, path: str, collection: str, item: str, id_type: Any = int,
+                 noun: str = 'server', name_field: str = 'name', ready_status: str = 'running',
+                 create: Sequence[Param] = (), fields: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.collection = collection
+        self.item = item
+        self.id_type = id_type
+        self.noun = noun
+        self.name_field = name_field
+        self.ready_status = ready_status
+        self.create = list(create)
+        self.fields = {'id': 'id', 'name': name_field, 'status': 'status', **(fields or {})}
+
+class Catalog:
+    """
+    Declares a read-only catalog endpoint (images, regions, sizes...).
+
+    Served at ``/<name>``. With a ``cli_format`` it also gets a CLI command
+    printing each item through ``cli_format.format(**item)``.
+    """
+    def __init__(self, name: str, path: Optional[str] = None, collection: Optional[str] = None,
+                 ttl: float = CATALOG_TTL, cli_format: Optional[str] = None, help: Optional[str] = None):
+        self.name = name
+        self.path = path or f'/{name}'
+        self.collection = collection or name
+        self.ttl = ttl
+        self.cli_format = cli_format
+        self.help = help or f"List available {name.replace('_', ' ')}."
+
+class TTLCache:
+    """Small thread-safe cache of upstream responses with per-entry expiry."""
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Cache ``value`` for ``ttl`` seconds."""
+        with self._lock:
+            if len(self._entries) >= self.max_size and key not in self._entries:
+                # Evict the entry closest to expiry
+                del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches."""
+        with self._lock:
+            for key in [k for k in self._entries if match(k)]:
+                del self._entries[key]
+
+def dig(record: Any, path: str) -> Any:
+    """Follow a dotted path such as ``networks.v4.0.ip_address`` into a record."""
+    for part in path.split('.'):
+        if isinstance(record, dict):
+            record = record.get(part)
+        elif isinstance(record, list) and part.isdigit() and int(part) < len(record):
+            record = record[int(part)]
+        else:
+            return None
+    return record
+
+class CloudProvider:
+    """
+    Base class for declarative cloud provider plugins.
+
+    Subclasses set ``name``, ``display_name``, ``base_url`` and ``servers``,
+    and optionally ``catalogs``. To feed the bridge's instance type catalog,
+    set ``offerings`` to the name of a catalog and override
+    :meth:`normalize_offering`.
+    """
+    name = ''
+    display_name = ''
+    base_url = ''
+    servers: Servers
+    catalogs: Sequence[Catalog] = ()
+    offerings: Optional[str] = None
+
+    def __init__(self):
+        self.timeout = REQUEST_TIMEOUT
+        self.cache = TTLCache()
+        self.cache_ttl: Dict[str, float] = {f'list_{c.name}': c.ttl for c in self.catalogs}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.poller = pollers[self.name] = StatusPoller(self.name, self.poll_statuses)
+
+    # --- Upstream calls ---
+    def headers(self, api_key: str) -> Dict[str, str]:
+        """Authorization headers for the provider's API."""
+        return {'Authorization': f'Bearer {api_key}'}
+
+    def accounts(self) -> Dict[str, str]:
+        """The ``{account: api_key}`` map configured for this provider."""
+        from cloudbridge import get_accounts
+        return get_accounts(self.name)
+
+    def _send(self, method: str, path: str, api_key: str, endpoint: str,
+              json: Any = None, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Send one request over the provider's pooled session. Raises
+        :class:`UpstreamError` for 5xx and 429 answers, so they count as
+        failures in the provider's circuit breakers.
+        """
+        url = path if path.startswith(self.base_url) else f'{self.base_url}{path}'
+        timeout = guard.policy(self.name).timeout_for(endpoint, self.timeout)
+        response = self.session.request(method, url, headers=self.headers(api_key),
+                                        json=json, params=params, timeout=timeout)
+        if response.status_code >= 500 or response.status_code == 429:
+            raise self._upstream_error(response)
+        return response
+
+    def _upstream_error(self, response: requests.Response) -> UpstreamError:
+        """Describe an HTTP error answer."""
+        try:
+            message = error_message(response.json())
+        except ValueError:
+            message = response.reason or 'Unexpected response'
+        retry_after = response.headers.get('Retry-After')
+        return UpstreamError(self.name, response.status_code, message,
+                             float(retry_after) if str(retry_after).isdigit() else None)
+
+    def _get(self, api_key: str, path: str, endpoint: str, params: Tuple[Tuple[str, Any], ...] = ()) -> Any:
+        """GET a path and decode the JSON body. Raises :class:`UpstreamError` for any HTTP error."""
+        response = self._send('GET', path, api_key, endpoint, params=dict(params))
+        if response.status_code >= 400:
+            raise self._upstream_error(response)
+        return response.json()
+
+    def _pages(self, path: str, collection: str, get: Callable[[str, Dict[str, Any]], Any]) -> Iterator[Any]:
+        """
+        Yield each page body of a list endpoint, following the manifest's
+        pagination style. ``get(path, params)`` fetches one page. Stops after
+        a body without ``collection``, e.g. an error. Raises
+        IncompleteListingError past the manifest's ``max_pages`` (default
+        :data:`MAX_PAGES`), so a truncated listing is never taken as complete.
+        """
+        pagination = guard.policy(self.name).pagination
+        style = pagination.get('style', 'none')
+        if style == 'none':
+            yield get(path, {})
+            return
+
+        size = pagination.get('page_size')
+        params: Dict[str, Any] = {pagination.get('size_param', 'per_page'): size} if size else {}
+        page_param = pagination.get('page_param', 'page')
+        if style == 'page':
+            params[page_param] = 1
+
+        max_pages = pagination.get('max_pages', MAX_PAGES)
+        for _ in range(max_pages):
+            body = get(path, dict(params))
+            yield body
+            page = body.get(collection) if isinstance(body, dict) else None
+            if page is None:
+                return
+
+            following = dig(body, pagination['next']) if pagination.get('next') else None
+            if style == 'page':
+                if pagination.get('next'):
+                    if not following:
+                        return
+                    params[page_param] = following
+                elif not page or not size or len(page) < size:
+                    return
+                else:
+                    params[page_param] += 1
+            elif style == 'cursor':
+                if not following:
+                    return
+                params[pagination.get('cursor_param', 'cursor')] = following
+            else:
+                # Only follow links back to the provider's own API
+                if not following or not str(following).startswith(self.base_url):
+                    return
+                path, params = following, {}
+        raise IncompleteListingError(f'{self.name} listing has more than {max_pages} pages')
+
+    def _guarded_get(self, api_key: str, endpoint: str) -> Callable[[str, Dict[str, Any]], Any]:
+        """
+        A ``get(path, params)`` that runs each request as its own guarded,
+        idempotent call, within the limits of the key's account.
+        """
+        account = self._account_of(api_key)
+
+        def get(path: str, params: Dict[str, Any]) -> Any:
+            return guard.call(self.name, endpoint, self._get,
+                              (api_key, path, endpoint, tuple(sorted(params.items()))), {},
+                              idempotent=True, account=account)
+        return get
+
+    def _fetch(self, api_key: str, path: str, endpoint: str, collection: Optional[str] = None) -> Any:
+        """
+        GET a path through the provider guard. For list endpoints, follow the
+        manifest's pagination style and merge every page's ``collection``.
+        Each page is admitted, hedged and served stale on its own, so it
+        takes its own rate limit token. The result is stale if any page was.
+        """
+        get = self._guarded_get(api_key, endpoint)
+        if not collection:
+            return get(path, {})
+
+        first: Optional[Dict[str, Any]] = None
+        items: List[Any] = []
+        stale = False
+        for body in self._pages(path, collection, get):
+            page = body.get(collection) if isinstance(body, dict) else None
+            if page is None:
+                if first is None:
+                    return body
+                break
+            first = first or body
+            stale = stale or bool(body.get('stale'))
+            items.extend(page)
+        merged = {**first, collection: items}
+        if stale:
+            merged['stale'] = True
+        return merged
+
+    def _read(self, endpoint: str, api_key: str, path: str, collection: Optional[str] = None,
+              item: Optional[str] = None) -> Any:
+        """
+        A cached, guarded, idempotent read. Only bodies holding the expected
+        ``collection`` (or ``item``) are cached, never error bodies.
+        """
+        ttl = guard.policy(self.name).cache_ttl(endpoint, self.cache_ttl.get(endpoint, 0))
+        key = (endpoint, api_key, path)
+        if ttl:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        result = self._fetch(api_key, path, endpoint, collection)
+        if ttl and isinstance(result, dict) and not result.get('stale') and (collection or item) in result:
+            self.cache.set(key, result, ttl)
+        return result
+
+    def _changed(self, api_key: str) -> None:
+        """Drop cached server reads for an account after it was modified."""
+        self.cache.invalidate(lambda key: key[1] == api_key and key[0] in ('list_servers', 'get_server'))
+
+    def list_servers(self, api_key: str) -> Any:
+        """List all servers of one account."""
+        return self._read('list_servers', api_key, self.servers.path, self.servers.collection)
+
+    def get_server(self, api_key: str, server_id: Any) -> Any:
+        """Get one server of an account."""
+        return self._read('get_server', api_key, f'{self.servers.path}/{server_id}', item=self.servers.item)
+
+    def create_server(self, api_key: str, name: str, **params: Any) -> Any:
+        """Create a server, using declared defaults for missing parameters."""
+        data = {self.servers.name_field: name}
+        for param in self.servers.create:
+            value = params.get(param.name)
+            data[param.field] = param.default if value is None else value
+
+        def create() -> Any:
+            return self._send('POST', self.servers.path, api_key, 'create_server', json=data).json()
+
+        account = self._account_of(api_key)
+        result = guard.call(self.name, 'create_server', create, (), {}, idempotent=False, account=account)
+        self._changed(api_key)
+        if isinstance(result, dict) and isinstance(result.get(self.servers.item), dict):
+            fleet.upsert({**self.normalize(result[self.servers.item]), 'account': account})
+            scheduler.nudge(self.name)
+        return result
+
+    def delete_server(self, api_key: str, server_id: Any) -> bool:
+        """Delete a server, returning whether the provider accepted it."""
+        def delete() -> bool:
+            return self._send('DELETE', f'{self.servers.path}/{server_id}', api_key, 'delete_server').status_code == 204
+
+        ok = guard.call(self.name, 'delete_server', delete, (), {}, idempotent=False,
+                        account=self._account_of(api_key))
+        self._changed(api_key)
+        if ok:
+            fleet.remove(self.name, server_id)
+            scheduler.nudge(self.name)
+        return ok
+
+    def list_catalog(self, api_key: str, name: str) -> Any:
+        """List one declared catalog (images, regions...)."""
+        spec = next(c for c in self.catalogs if c.name == name)
+        return self._read(f'list_{name}', api_key, spec.path, spec.collection)
+
+    def fan_out_servers(self, accounts: Dict[str, str]) -> Dict[str, Any]:
+        """List servers across accounts, each tagged with its account, and update the fleet index."""
+        result = fan_out(accounts, self.list_servers, self.servers.collection)
+        answered = [name for name in accounts if name not in result.get('errors', {})]
+        fleet.sync(self.name, [self.normalize(s) for s in result[self.servers.collection]], answered)
+        return result
+
+    def server_pages(self, accounts: Dict[str, str]) -> Iterator[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+        """
+        List servers across accounts like :meth:`fan_out_servers`, yielding
+        ``(account, records, error)`` with the normalized records of each
+        page as it arrives. Every page is a separate guarded call. Leaves
+        the fleet index alone.
+        """
+        spec = self.servers
+
+        def pages(api_key: str) -> Iterator[Any]:
+            return self._pages(spec.path, spec.collection, self._guarded_get(api_key, 'list_servers'))
+
+        for account, items, error in stream_across(accounts, pages, spec.collection):
+            yield account, [self.normalize(server) for server in items], error
+
+    def stream_servers(self, accounts: Dict[str, str]) -> Iterator[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+        """Yield :meth:`server_pages`, updating the fleet index page by page as they arrive."""
+        seen = set()
+        failed = set()
+        for account, page, error in self.server_pages(accounts):
+            if error:
+                failed.add(account)
+            fleet.put_page(page)
+            seen.update(str(record['id']) for record in page)
+            yield account, page, error
+        fleet.prune(self.name, seen, [name for name in accounts if name not in failed])
+
+    def poll_statuses(self) -> PollResult:
+        """Current status of every server, for the shared status poller. Updates the fleet index."""
+        statuses: Dict[str, Any] = {}
+        complete = True
+        pages = 0
+        for _, records, error in self.stream_servers(self.accounts()):
+            pages += 1
+            complete = complete and not error
+            statuses.update((str(record['id']), record.get('status')) for record in records)
+        return statuses, complete, pages
+
+    def find_server(self, accounts: Dict[str, str], server_id: Any) -> Tuple[Optional[str], Any]:
+        """Find which account owns a server, returning ``(account, response)``."""
+        account, result = find_across(accounts, self.get_server, self.servers.item, server_id)
+        if account:
+            fleet.upsert(self.normalize(result[self.servers.item]))
+        return account, result
+
+    def _account_of(self, api_key: str) -> Optional[str]:
+        """Name of the account an API key belongs to."""
+        return next((name for name, key in self.accounts().items() if key == api_key), None)
+
+    def normalize(self, server: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a provider server record onto the normalized server fields."""
+        record = {field: dig(server, path) for field, path in self.servers.fields.items()}
+        record['provider'] = self.name
+        record['account'] = server.get('account')
+        return record
+
+    # --- Catalog ---
+    def normalize_offering(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a catalog item onto an offering, or None to skip it."""
+        return None
+
+    def fetch_catalog(self, api_key: str) -> List[Dict[str, Any]]:
+        """Normalized instance type offerings for the bridge's catalog index."""
+        if not self.offerings:
+            return []
+        spec = next(c for c in self.catalogs if c.name == self.offerings)
+        result = self.list_catalog(api_key, spec.name)
+        items = result.get(spec.collection) if isinstance(result, dict) else None
+        if items is None:
+            # Raise so the catalog index keeps the previous offerings and reports the error
+            raise ValueError(f'Unexpected {spec.name} response: {error_message(result)}')
+        return [o for o in map(self.normalize_offering, items) if o is not None]
+
+    # --- Account resolution ---
+    def _route_account(self, name: Optional[str], server_id: Any = None,
+                       required: bool = True) -> Tuple[str, str]:
+        """
+        Resolve the account a call goes to. With several accounts and none
+        named, a ``server_id`` is looked up across all of them.
+        Raises AccountError (or LookupError if the server is not found).
+        """
+        accounts = self.accounts()
+        if not accounts:
+            raise AccountError(f'No {self.display_name} API key configured')
+        if not name and server_id is not None and len(accounts) > 1:
+            name, _ = self.find_server(accounts, server_id)
+            if not name:
+                raise LookupError(f'{self.servers.noun.capitalize()} {server_id} not found')
+        return select_account(accounts, name, required=required)
+
+    # --- HTTP Endpoints ---
+    def register_http(self, bp: Any) -> None:
+        """Register the generated HTTP endpoints with a Flask blueprint."""
+        spec = self.servers
+        id_converter = 'int:' if spec.id_type is int else ''
+
+        def configured() -> Dict[str, str]:
+            return self.accounts()
+
+        def no_key():
+            return jsonify({'error': f'No {self.display_name} API key configured'}), 400
+
+        def get_servers():
+            """List all servers across all accounts."""
+            accounts = configured()
+            if not accounts:
+                return no_key()
+            return jsonify(self.fan_out_servers(accounts))
+
+        def create_new_server():
+            """Create a new server."""
+            data = request.json or {}
+            try:
+                account, api_key = self._route_account(data.get('account'))
+            except AccountError as e:
+                return jsonify({'error': str(e)}), 400
+
+            params = {p.name: data.get(p.name) for p in spec.create}
+            result = self.create_server(api_key, data.get('name', 'engiyn-server'), **params)
+            if isinstance(result, dict) and spec.item in result:
+                result[spec.item]['account'] = account
+            return jsonify(result)
+
+        def delete_existing_server():
+            """Delete a server."""
+            data = request.json or {}
+            server_id = data.get('server_id')
+            if not server_id:
+                return jsonify({'error': 'Missing server_id'}), 400
+            try:
+                account, api_key = self._route_account(data.get('account'), server_id)
+            except AccountError as e:
+                return jsonify({'error': str(e)}), 400
+            except LookupError as e:
+                return jsonify({'error': str(e)}), 404
+
+            ok = self.delete_server(api_key, server_id)
+            return jsonify({'status': 'ok' if ok else 'error', 'account': account})
+
+        def get_server_details(server_id):
+            """Get server details."""
+            accounts = configured()
+            if not accounts:
+                return no_key()
+            account = request.args.get('account')
+            if account:
+                try:
+                    accounts = dict([select_account(accounts, account)])
+                except AccountError as e:
+                    return jsonify({'error': str(e)}), 400
+
+            _, result = self.find_server(accounts, server_id)
+            return jsonify(result)
+
+        bp.add_url_rule('/servers', 'get_servers', get_servers, methods=['GET'])
+        bp.add_url_rule('/servers/create', 'create_new_server', create_new_server, methods=['POST'])
+        bp.add_url_rule('/servers/delete', 'delete_existing_server', delete_existing_server, methods=['POST'])
+        bp.add_url_rule(f'/servers/<{id_converter}server_id>', 'get_server_details',
+                        get_server_details, methods=['GET'])
+        self.register_wait_http(bp, self.poller)
+
+        for catalog_spec in self.catalogs:
+            bp.add_url_rule(f'/{catalog_spec.name}', f'list_{catalog_spec.name}',
+                            self._catalog_view(catalog_spec), methods=['GET'])
+
+    def register_wait_http(self, bp: Any, poller: StatusPoller) -> None:
+        """
+        Register the endpoints that wait for servers to reach a status,
+        served by ``poller``. The bridge serves a process-isolated plugin's
+        waits itself, from a poller that lists through the plugin's workers.
+        """
+        spec = self.servers
+        id_converter = 'int:' if spec.id_type is int else ''
+
+        def wait_for(ids: List[str]):
+            if not self.accounts():
+                return jsonify({'error': f'No {self.display_name} API key configured'}), 400
+            targets = [t for t in request.args.get('status', spec.ready_status).split(',') if t]
+            try:
+                timeout = float(request.args.get('timeout', DEFAULT_WAIT_TIMEOUT))
+            except ValueError:
+                return jsonify({'error': 'Invalid timeout'}), 400
+
+            start = time.monotonic()
+            ready, seen = poller.wait(ids, targets, timeout,
+                                      require_all=request.args.get('mode', 'all') != 'any')
+            return jsonify({
+                'ready': ready,
+                'servers': seen,
+                'pending': [i for i, status in seen.items() if status not in targets],
+                'waited': round(time.monotonic() - start, 3),
+            })
+
+        def wait_for_server(server_id):
+            """Wait until a server reaches a status (default: running)."""
+            return wait_for([str(server_id)])
+
+        def wait_for_servers():
+            """Wait until several servers (``ids=1,2,3``) reach a status."""
+            ids = [i for i in request.args.get('ids', '').split(',') if i]
+            if not ids:
+                return jsonify({'error': 'Missing ids'}), 400
+            return wait_for(ids)
+
+        bp.add_url_rule('/servers/wait', 'wait_for_servers', wait_for_servers, methods=['GET'])
+        bp.add_url_rule(f'/servers/<{id_converter}server_id>/wait', 'wait_for_server',
+                        wait_for_server, methods=['GET'])
+
+    def _catalog_view(self, spec: Catalog) -> Callable[[], Any]:
+        """Build the view function serving one catalog."""
+        def view():
+            try:
+                _, api_key = self._route_account(request.args.get('account'), required=False)
+            except AccountError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(self.list_catalog(api_key, spec.name))
+        view.__doc__ = spec.help
+        return view
+
+    # --- CLI Commands ---
+    def register_cli(self, cli_group: click.Group) -> None:
+        """Register the generated CLI commands with a Click group."""
+        spec = self.servers
+        noun = spec.noun
+        plural = f'{noun}s'
+
+        def line(server: Dict[str, Any], account: str) -> str:
+            return f"{server['id']} - {server[spec.name_field]} - {server['status']} - {account}"
+
+        @cli_group.command('list')
+        @click.option('--format', 'fmt', type=click.Choice(FORMATS), default='text', help='Output format')
+        @click.option('--watch', type=float, is_flag=False, flag_value=WATCH_INTERVAL, default=None,
+                      metavar='[SECONDS]', help=f'Keep refreshing (every {WATCH_INTERVAL:g}s by default), '
+                                                'showing only changes')
+        def list_cmd(fmt, watch):
+            """List all servers across all accounts."""
+            accounts = self.accounts()
+            if not accounts:
+                click.echo(f'Error: No {self.display_name} API key configured')
+                return
+
+            listing = ServerListing(Formatter(fmt, id_width=36 if spec.id_type is str else 12), plural)
+            pages = listing.show(self.stream_servers(accounts))
+            if watch is None:
+                return
+            bridge = BridgeFleet(self.name)
+            if bridge.follow():
+                # The bridge's scheduler keeps its fleet index current: follow it without calling the provider
+                listing.watch(bridge.pages, watch)
+            else:
+                listing.watch(lambda: self.stream_servers(self.accounts()), watch, pages,
+                              guard.policy(self.name).request_rate('list_servers'))
+
+        def create_cmd(name, account, **params):
+            """Create a new server."""
+            try:
+                account, api_key = self._route_account(account)
+            except AccountError as e:
+                click.echo(f'Error: {e}')
+                return
+
+            try:
+                result = self.create_server(api_key, name, **params)
+            except CALL_ERRORS as e:
+                click.echo(f'Error creating {noun}: {call_error(e)}')
+                return
+            if isinstance(result, dict) and spec.item in result:
+                click.echo(f"Created {noun}: {line(result[spec.item], account)}")
+            else:
+                error = result.get('error') if isinstance(result, dict) else None
+                message = error.get('message') if isinstance(error, dict) else result.get('message')
+                click.echo(f"Error creating {noun}: {message or 'Unknown error'}")
+
+        create_cmd = click.option('--account', default=None, help=f'Account to create the {noun} in')(create_cmd)
+        for param in reversed(spec.create):
+            create_cmd = click.option(f'--{param.cli}', param.name, default=param.default,
+                                      type=param.type, help=param.help)(create_cmd)
+        create_cmd = click.argument('name')(create_cmd)
+        cli_group.command('create')(create_cmd)
+
+        @cli_group.command('delete')
+        @click.argument('server_id', type=spec.id_type)
+        @click.option('--account', default=None, help=f'Account that owns the {noun}')
+        def delete_cmd(server_id, account):
+            """Delete a server."""
+            try:
+                account, api_key = self._route_account(account, server_id)
+            except (AccountError, LookupError) as e:
+                click.echo(f'Error: {e}')
+                return
+
+            try:
+                ok = self.delete_server(api_key, server_id)
+            except CALL_ERRORS as e:
+                click.echo(f'Error: {call_error(e)}')
+                return
+            click.echo(f"{noun.capitalize()} {server_id} {'deleted' if ok else 'could not be deleted'}")
+
+        for catalog_spec in self.catalogs:
+            if catalog_spec.cli_format:
+                cli_group.command(catalog_spec.name, help=catalog_spec.help)(self._catalog_command(catalog_spec))
+
+    def _catalog_command(self, spec: Catalog) -> Callable[..., None]:
+        """Build the CLI callback printing one catalog."""
+        @click.option('--account', default=None, help='Account to query')
+        def command(account):
+            try:
+                _, api_key = self._route_account(account, required=False)
+            except AccountError as e:
+                click.echo(f'Error: {e}')
+                return
+
+            try:
+                result = self.list_catalog(api_key, spec.name)
+            except CALL_ERRORS as e:
+                click.echo(f'Error: {call_error(e)}')
+                return
+            if isinstance(result, dict) and spec.collection in result:
+                for item in result[spec.collection]:
+                    click.echo(spec.cli_format.format(**item))
+            else:
+                click.echo(f'No {spec.name} found')
+        return command
@@ -4,10 +4,13 @@ setup(
     name="engiyn-sdk",
     version="0.1.0",
     description="Engiyn plugin SDK",
-    py_modules=["engiyn_sdk"],
+    packages=["engiyn"],
     install_requires=[
         "jsonschema",
         "flask",
+        "click",
+        "requests",
+        "engiyn-core",
     ],
     python_requires=">=3.7",
 )
@@ -14,6 +14,10 @@ setup(
         "flask",
         "click",
     ],
+    extras_require={
+        "fast": ["orjson", "msgpack"],
+        "export": ["pyarrow"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -0,0 +1,134 @@
+"""
+Test multi-account resolution and fan-out.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add parent directory to path to import engiyn_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.accounts import (
+    AccountError, DEFAULT_ACCOUNT, STREAM_BUFFER_PAGES, fan_out, find_across, provider_accounts,
+    select_account, stream_across
+)
+
+class TestProviderAccounts(unittest.TestCase):
+    """Test cases for reading and selecting accounts."""
+
+    def test_legacy_key_is_default_account(self):
+        """Test that <PROVIDER>_API_KEY becomes the default account."""
+        config = {
+            'HETZNER_API_KEY': 'legacy',
+            'HETZNER_ACCOUNTS': {'project-a': 'key-a', 'empty': ''}
+        }
+        accounts = provider_accounts(config, 'hetzner')
+
+        self.assertEqual(accounts, {'project-a': 'key-a', DEFAULT_ACCOUNT: 'legacy'})
+
+    def test_select_account(self):
+        """Test routing to explicit, default and only accounts."""
+        self.assertEqual(select_account({'a': '1', 'b': '2'}, 'b'), ('b', '2'))
+        self.assertEqual(select_account({'a': '1', DEFAULT_ACCOUNT: '0'}), (DEFAULT_ACCOUNT, '0'))
+        self.assertEqual(select_account({'a': '1'}), ('a', '1'))
+
+    def test_select_account_ambiguous(self):
+        """Test that an ambiguous selection fails unless not required."""
+        accounts = {'a': '1', 'b': '2'}
+        with self.assertRaises(AccountError):
+            select_account(accounts)
+        with self.assertRaises(AccountError):
+            select_account(accounts, 'missing')
+        self.assertIn(select_account(accounts, required=False), accounts.items())
+
+class TestFanOut(unittest.TestCase):
+    """Test cases for concurrent fan-out across accounts."""
+
+    def test_fan_out_merges_and_tags(self):
+        """Test that results are merged and tagged with their account."""
+        def list_servers(api_key):
+            return {'servers': [{'id': f'{api_key}-1'}, {'id': f'{api_key}-2'}], 'meta': {}}
+
+        result = fan_out({'a': 'ka', 'b': 'kb'}, list_servers, 'servers')
+
+        self.assertEqual(len(result['servers']), 4)
+        self.assertEqual({s['account'] for s in result['servers']}, {'a', 'b'})
+        self.assertEqual(result['accounts'], ['a', 'b'])
+        self.assertNotIn('errors', result)
+
+    def test_fan_out_reports_errors(self):
+        """Test that a failing account does not fail the whole call."""
+        def list_servers(api_key):
+            if api_key == 'bad':
+                return {'error': {'message': 'unauthorized'}}
+            if api_key == 'boom':
+                raise RuntimeError('connection reset')
+            return {'servers': [{'id': 1}]}
+
+        result = fan_out({'ok': 'good', 'a': 'bad', 'b': 'boom'}, list_servers, 'servers')
+
+        self.assertEqual(len(result['servers']), 1)
+        self.assertEqual(result['errors'], {'a': 'unauthorized', 'b': 'connection reset'})
+
+    def test_stream_across_yields_pages_as_they_arrive(self):
+        """Test that pages are yielded before slower pages of other accounts are read."""
+        release = threading.Event()
+
+        def pages(api_key):
+            yield {'servers': [{'id': f'{api_key}-1'}]}
+            if api_key == 'slow':
+                release.wait(5)
+                yield {'servers': [{'id': 'slow-2'}]}
+            elif api_key == 'bad':
+                yield {'error': {'message': 'unauthorized'}}
+
+        stream = stream_across({'a': 'fast', 'b': 'slow', 'c': 'bad'}, pages, 'servers')
+        seen = [next(stream) for _ in range(4)]
+        release.set()
+        seen.extend(stream)
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen[-1], ('b', [{'id': 'slow-2', 'account': 'b'}], None))
+        self.assertIn(('c', [], 'unauthorized'), seen)
+
+    def test_stream_across_buffers_few_pages(self):
+        """Test that reads wait for a slow reader and stop when the stream is closed."""
+        read = []
+        stopped = threading.Event()
+
+        def pages(api_key):
+            try:
+                for number in range(100):
+                    read.append(number)
+                    yield {'servers': [{'id': number}]}
+            finally:
+                stopped.set()
+
+        stream = stream_across({'a': 'key'}, pages, 'servers')
+        next(stream)
+        threading.Event().wait(0.3)
+        self.assertLessEqual(len(read), STREAM_BUFFER_PAGES + 2)
+
+        stream.close()
+        self.assertTrue(stopped.wait(2))
+        self.assertLess(len(read), 100)
+
+    def test_find_across(self):
+        """Test locating the account that owns a resource."""
+        def get_server(api_key, server_id):
+            if api_key == 'kb':
+                return {'server': {'id': server_id}}
+            return {'error': {'message': 'not found'}}
+
+        account, result = find_across({'a': 'ka', 'b': 'kb'}, get_server, 'server', 42)
+        self.assertEqual(account, 'b')
+        self.assertEqual(result['server'], {'id': 42, 'account': 'b'})
+
+        account, result = find_across({'a': 'ka'}, get_server, 'server', 42)
+        self.assertIsNone(account)
+        self.assertIn('error', result)
+
+if __name__ == '__main__':
+    unittest.main()
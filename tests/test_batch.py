@@ -0,0 +1,133 @@
+"""
+Test the /batch endpoint that runs several bridge requests in one round trip.
+"""
+
+import base64
+import os
+import sys
+import time
+import unittest
+
+from flask import Flask, jsonify, request
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.batch import MAX_BATCH_SIZE, BatchError, parse_batch, run_batch
+
+def make_app():
+    app = Flask(__name__)
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.2)
+        return jsonify({'slow': True})
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify(request.get_json()), 201
+
+    @app.route('/binary')
+    def binary():
+        return app.response_class(b'\xff\xff\xff\xff\x00', mimetype='application/vnd.apache.arrow.stream')
+
+    @app.route('/limited')
+    def limited():
+        response = jsonify({'error': 'throttled'})
+        response.status_code = 429
+        response.headers['Retry-After'] = '2'
+        return response
+
+    return app
+
+class TestParseBatch(unittest.TestCase):
+    """Test cases for validating batch payloads."""
+
+    def test_defaults(self):
+        """Test that method defaults to GET and id to the request's position."""
+        items = parse_batch({'requests': [{'path': '/plugins'}, {'id': 'x', 'method': 'post', 'path': '/a'}]})
+
+        self.assertEqual(items[0], {'id': 0, 'method': 'GET', 'path': '/plugins', 'body': None})
+        self.assertEqual(items[1]['id'], 'x')
+        self.assertEqual(items[1]['method'], 'POST')
+
+    def test_bare_array(self):
+        """Test that a bare array of requests is accepted."""
+        self.assertEqual(len(parse_batch([{'path': '/status'}])), 1)
+
+    def test_invalid_payloads(self):
+        """Test that malformed batches are rejected."""
+        for payload in (None, {}, {'requests': []}, [{'method': 'GET'}], [{'path': 'status'}],
+                        [{'path': '/status', 'method': 'TRACE'}], [{'path': '/batch'}], ['/status'],
+                        [{'path': '/status'}] * (MAX_BATCH_SIZE + 1)):
+            with self.assertRaises(BatchError):
+                parse_batch(payload)
+
+class TestRunBatch(unittest.TestCase):
+    """Test cases for dispatching sub-requests."""
+
+    def test_runs_concurrently(self):
+        """Test that the batch takes about as long as its slowest item."""
+        app = make_app()
+        started = time.monotonic()
+
+        result = run_batch(app, parse_batch([{'path': '/slow'}] * 5))
+
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(result['count'], 5)
+        self.assertTrue(all(r['status'] == 200 and r['body'] == {'slow': True} for r in result['responses']))
+        self.assertTrue(all(r['elapsed_ms'] >= 200 for r in result['responses']))
+
+    def test_per_item_status(self):
+        """Test that each item keeps its own status, headers and body, in request order."""
+        app = make_app()
+
+        responses = run_batch(app, parse_batch([
+            {'method': 'POST', 'path': '/echo', 'body': {'name': 'web-1'}},
+            {'path': '/limited'},
+            {'path': '/missing'},
+        ]))['responses']
+
+        self.assertEqual([r['status'] for r in responses], [201, 429, 404])
+        self.assertEqual(responses[0]['body'], {'name': 'web-1'})
+        self.assertEqual(responses[1]['headers']['Retry-After'], '2')
+
+    def test_binary_body(self):
+        """Test that a binary body is returned base64-encoded instead of failing the batch."""
+        responses = run_batch(make_app(), parse_batch([{'path': '/binary'}, {'path': '/slow'}]))['responses']
+
+        self.assertEqual(responses[0]['status'], 200)
+        self.assertEqual(responses[0]['encoding'], 'base64')
+        self.assertEqual(base64.b64decode(responses[0]['body']), b'\xff\xff\xff\xff\x00')
+        self.assertEqual(responses[0]['headers']['Content-Type'], 'application/vnd.apache.arrow.stream')
+        self.assertNotIn('encoding', responses[1])
+
+class TestBatchEndpoint(unittest.TestCase):
+    """Test the /batch endpoint on the bridge."""
+
+    def setUp(self):
+        from cloudbridge import app
+        self.client = app.test_client()
+
+    def test_batch(self):
+        """Test that bridge endpoints can be combined in one call."""
+        response = self.client.post('/batch', json={'requests': [
+            {'id': 'summary', 'path': '/summary'},
+            {'id': 'search', 'path': '/catalog/search?vcpu=abc'},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        summary, search = response.get_json()['responses']
+        self.assertEqual((summary['id'], summary['status']), ('summary', 200))
+        self.assertIn('version', summary['body'])
+        self.assertEqual(search['status'], 400)
+
+    def test_invalid_batch(self):
+        """Test that a malformed batch is rejected as a whole."""
+        response = self.client.post('/batch', json={'requests': [{'path': '/batch'}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nested', response.get_json()['error'])
+
+if __name__ == '__main__':
+    unittest.main()
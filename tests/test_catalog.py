@@ -0,0 +1,104 @@
+"""
+Test the cross-provider instance type catalog.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import engiyn_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.catalog import CatalogIndex, parse_query
+
+HETZNER = [
+    {'id': 'cx22', 'vcpu': 2, 'ram_gb': 4.0, 'disk_gb': 40.0, 'price_monthly': 4.5,
+     'currency': 'EUR', 'regions': ['fsn1', 'nbg1']},
+    {'id': 'cx32', 'vcpu': 4, 'ram_gb': 8.0, 'disk_gb': 80.0, 'price_monthly': 8.0,
+     'currency': 'EUR', 'regions': ['fsn1']},
+]
+
+DIGITALOCEAN = [
+    {'id': 's-1vcpu-1gb', 'vcpu': 1, 'ram_gb': 1.0, 'disk_gb': 25.0, 'price_monthly': 6.0,
+     'currency': 'USD', 'regions': ['nyc3', 'fra1']},
+    {'id': 's-2vcpu-4gb', 'vcpu': 2, 'ram_gb': 4.0, 'disk_gb': 80.0, 'price_monthly': 24.0,
+     'currency': 'USD', 'regions': ['nyc3']},
+]
+
+class TestCatalogIndex(unittest.TestCase):
+    """Test cases for catalog search."""
+
+    def setUp(self):
+        self.index = CatalogIndex()
+        self.index.refresh({
+            'hetzner': lambda: HETZNER,
+            'digitalocean': lambda: DIGITALOCEAN,
+        })
+
+    def ids(self, offerings):
+        return [o['id'] for o in offerings]
+
+    def test_cheapest_first(self):
+        """Test that results are ordered by price by default."""
+        self.assertEqual(self.ids(self.index.search()),
+                         ['cx22', 's-1vcpu-1gb', 'cx32', 's-2vcpu-4gb'])
+
+    def test_minimums(self):
+        """Test vCPU, RAM and disk minimums."""
+        self.assertEqual(self.ids(self.index.search(vcpu=2, ram_gb=4)),
+                         ['cx22', 'cx32', 's-2vcpu-4gb'])
+        self.assertEqual(self.ids(self.index.search(disk_gb=50)), ['cx32', 's-2vcpu-4gb'])
+        self.assertEqual(self.index.search(vcpu=64), [])
+
+    def test_region_provider_and_price(self):
+        """Test region, provider and price filters."""
+        self.assertEqual(self.ids(self.index.search(region='nyc3')), ['s-1vcpu-1gb', 's-2vcpu-4gb'])
+        self.assertEqual(self.ids(self.index.search(provider='hetzner', vcpu=4)), ['cx32'])
+        self.assertEqual(self.ids(self.index.search(max_price=6)), ['cx22', 's-1vcpu-1gb'])
+        self.assertEqual(self.index.search(region='nowhere'), [])
+
+    def test_currency(self):
+        """Test that offerings can be limited to one currency."""
+        self.assertEqual(self.ids(self.index.search(currency='usd', vcpu=2)), ['s-2vcpu-4gb'])
+        self.assertEqual(self.ids(self.index.search(currency='EUR')), ['cx22', 'cx32'])
+        self.assertEqual(self.index.status()['currencies'], ['EUR', 'USD'])
+        self.assertEqual(parse_query({'currency': 'EUR'})['currency'], 'EUR')
+
+    def test_sort_and_limit(self):
+        """Test alternate sort keys and result limits."""
+        self.assertEqual(self.ids(self.index.search(sort='-vcpu', limit=1)), ['cx32'])
+        self.assertEqual(self.ids(self.index.search(limit=2)), ['cx22', 's-1vcpu-1gb'])
+        with self.assertRaises(ValueError):
+            self.index.search(sort='colour')
+
+    def test_failed_refresh_keeps_previous_offerings(self):
+        """Test that a provider error does not drop its cached offerings."""
+        def broken():
+            raise ConnectionError('down')
+
+        self.index.refresh({'hetzner': broken, 'digitalocean': lambda: DIGITALOCEAN[:1]})
+
+        self.assertEqual(self.ids(self.index.search()), ['cx22', 's-1vcpu-1gb', 'cx32'])
+        self.assertEqual(self.index.status()['errors'], {'hetzner': 'down'})
+
+class TestParseQuery(unittest.TestCase):
+    """Test cases for search argument parsing."""
+
+    def test_operator_style_arguments(self):
+        """Test that vcpu>=2 style arguments are understood."""
+        # werkzeug splits "vcpu>=2" into the key "vcpu>" and the value "2"
+        query = parse_query({'vcpu>': '2', 'ram>': '4', 'price<': '10', 'region': 'fsn1'})
+
+        self.assertEqual(query['vcpu'], 2)
+        self.assertEqual(query['ram_gb'], 4)
+        self.assertEqual(query['max_price'], 10)
+        self.assertEqual(query['region'], 'fsn1')
+        self.assertEqual(query['sort'], 'price')
+
+    def test_invalid_number(self):
+        """Test that malformed numbers are rejected."""
+        with self.assertRaises(ValueError):
+            parse_query({'min_vcpu': 'lots'})
+
+if __name__ == '__main__':
+    unittest.main()
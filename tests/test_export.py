@@ -0,0 +1,149 @@
+"""
+Test the Arrow IPC stream export of servers and catalog offerings.
+"""
+
+import os
+import struct
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core import export
+from engiyn_core.export import (
+    OFFERING_COLUMNS, SERVER_COLUMNS, ArrowStreamEncoder, PyArrowStreamEncoder, export_stream, inventory_sources,
+    rebatch, stream_encoder
+)
+
+try:
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+def server(server_id, status='running', region='fsn1'):
+    return {'provider': 'hetzner', 'account': 'a', 'id': server_id, 'name': f'web-{server_id}',
+            'status': status, 'region': region, 'type': 'cx22'}
+
+def messages(stream):
+    """Walk an IPC stream, returning (header type, metadata length, body length) for each message."""
+    found = []
+    pos = 0
+    while True:
+        marker, length = struct.unpack_from('<Ii', stream, pos)
+        assert marker == 0xFFFFFFFF
+        pos += 8
+        if length == 0:
+            assert pos == len(stream)
+            return found
+        metadata = stream[pos:pos + length]
+        table = struct.unpack_from('<I', metadata, 0)[0]
+        vtable = table - struct.unpack_from('<i', metadata, table)[0]
+        header_type = metadata[table + struct.unpack_from('<H', metadata, vtable + 6)[0]]
+        body_length = struct.unpack_from('<q', metadata, table + struct.unpack_from('<H', metadata, vtable + 10)[0])[0]
+        found.append((header_type, length, body_length))
+        pos += length + body_length
+
+def record_batches(stream):
+    """Number of record batches in a stream written by either encoder."""
+    if pyarrow is not None:
+        return len(list(pyarrow.ipc.open_stream(stream)))
+    return [header_type for header_type, _, _ in messages(stream)].count(3)
+
+class TestArrowStreamEncoder(unittest.TestCase):
+    """Test cases for the stream encoding."""
+
+    def test_stream_layout(self):
+        """Test a schema, dictionaries before the first batch, and delta dictionaries only for new values."""
+        encoder = ArrowStreamEncoder(SERVER_COLUMNS)
+        stream = (encoder.schema() + encoder.batch([server(1), server(2)])
+                  + encoder.batch([server(3)]) + encoder.batch([server(4, status='off')]) + encoder.end())
+
+        kinds = [header_type for header_type, _, _ in messages(stream)]
+        dictionaries = sum(1 for _, kind in SERVER_COLUMNS if kind == 'dictionary')
+        self.assertEqual(kinds, [1] + [2] * dictionaries + [3, 3, 2, 3])
+        self.assertEqual(encoder.rows, 4)
+
+    def test_buffers_are_aligned(self):
+        """Test that metadata and bodies are padded so every message stays 8-byte aligned."""
+        encoder = ArrowStreamEncoder(OFFERING_COLUMNS)
+        stream = (encoder.schema() + encoder.batch([{'provider': 'hetzner', 'id': 'cx22', 'vcpu': 2, 'regions': ['fsn1']}])
+                  + encoder.end())
+
+        for _, metadata_length, body_length in messages(stream):
+            self.assertEqual(metadata_length % 8, 0)
+            self.assertEqual(body_length % 8, 0)
+
+    def test_rebatch(self):
+        """Test that pages are regrouped into fixed-size batches."""
+        batches = list(rebatch([[1, 2, 3], [], [4, 5]], size=2))
+
+        self.assertEqual(batches, [[1, 2], [3, 4], [5]])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow not installed')
+    def test_readable_by_pyarrow(self):
+        """Test that pyarrow reads the stream back, dictionaries and nulls included."""
+        rows = [server(1), server(2, status=None, region=None), server(3, status='off')]
+        encoder = ArrowStreamEncoder(SERVER_COLUMNS)
+        stream = encoder.schema() + encoder.batch(rows[:2]) + encoder.batch(rows[2:]) + encoder.end()
+
+        table = pyarrow.ipc.open_stream(stream).read_all()
+
+        self.assertEqual(table.column('status').to_pylist(), ['running', None, 'off'])
+        self.assertEqual(table.column('id').to_pylist(), ['1', '2', '3'])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow not installed')
+    def test_pyarrow_encoder(self):
+        """Test that the pyarrow encoder writes delta dictionaries for values first seen in later batches."""
+        encoder = stream_encoder(SERVER_COLUMNS)
+        self.assertIsInstance(encoder, PyArrowStreamEncoder)
+        stream = (encoder.schema() + encoder.batch([server(1), server(2, status=None)])
+                  + encoder.batch([server(3, status='off', region='nbg1')]) + encoder.end())
+
+        table = pyarrow.ipc.open_stream(stream).read_all()
+
+        self.assertEqual(table.column('status').to_pylist(), ['running', None, 'off'])
+        self.assertEqual(table.column('region').to_pylist(), ['fsn1', 'fsn1', 'nbg1'])
+        self.assertEqual(encoder.rows, 3)
+
+    def test_stdlib_encoder_without_pyarrow(self):
+        """Test that the bridge writes streams itself when pyarrow is not installed."""
+        with patch.object(export, 'pyarrow', None):
+            encoder = stream_encoder(SERVER_COLUMNS)
+
+        self.assertIsInstance(encoder, ArrowStreamEncoder)
+
+class TestExport(unittest.TestCase):
+    """Test the /export endpoint."""
+
+    def setUp(self):
+        from cloudbridge import app
+        self.client = app.test_client()
+        inventory_sources['export-test'] = lambda: iter([[server(1), server(2)], [server(3)]])
+
+    def tearDown(self):
+        inventory_sources.pop('export-test', None)
+
+    def test_export_lists_sources(self):
+        """Test that /export streams servers listed from every source."""
+        response = self.client.get('/export?dataset=servers')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/vnd.apache.arrow.stream')
+        self.assertEqual(record_batches(response.data), 1)
+
+    def test_export_batches(self):
+        """Test that large exports are written as several record batches."""
+        stream = b''.join(export_stream('servers', batch_rows=2))
+
+        self.assertEqual(record_batches(stream), 2)
+
+    def test_unknown_dataset(self):
+        """Test that an unknown dataset is rejected."""
+        response = self.client.get('/export?dataset=volumes')
+
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Test the incrementally maintained fleet index behind /summary.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.fleet import FleetIndex
+
+def server(server_id, status='running', region='fsn1', type='cx22', account='a', provider='hetzner'):
+    return {'provider': provider, 'account': account, 'id': server_id, 'name': f'web-{server_id}',
+            'status': status, 'region': region, 'type': type}
+
+class TestFleetIndex(unittest.TestCase):
+    """Test cases for fleet counts."""
+
+    def setUp(self):
+        self.fleet = FleetIndex()
+
+    def test_sync_counts(self):
+        """Test counts by provider, status, region and type after a listing."""
+        self.fleet.sync('hetzner', [server(1), server(2, status='off'), server(3, region='nbg1')])
+        self.fleet.sync('vultr', [server('x', provider='vultr', status='active', region=None, type='vc2')])
+
+        summary = self.fleet.summary()
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(summary['by_provider']['hetzner']['total'], 3)
+        self.assertEqual(summary['by_provider']['hetzner']['by_status'], {'running': 2, 'off': 1})
+        self.assertEqual(summary['by_status'], {'running': 2, 'off': 1, 'active': 1})
+        self.assertEqual(summary['by_region'], {'fsn1': 2, 'nbg1': 1, 'unknown': 1})
+        self.assertEqual(summary['by_type'], {'cx22': 3, 'vc2': 1})
+
+    def test_changes_adjust_counts(self):
+        """Test that status changes and removals move counts incrementally."""
+        self.fleet.sync('hetzner', [server(1, status='starting'), server(2)])
+        version = self.fleet.version
+
+        changed = self.fleet.sync('hetzner', [server(1)])
+
+        self.assertEqual(changed, 2)
+        self.assertEqual(self.fleet.summary()['by_status'], {'running': 1})
+        self.assertGreater(self.fleet.version, version)
+
+    def test_unchanged_listing_keeps_version(self):
+        """Test that an identical listing is not counted as a change."""
+        self.fleet.sync('hetzner', [server(1)])
+        version = self.fleet.version
+
+        self.assertEqual(self.fleet.sync('hetzner', [server(1)]), 0)
+        self.assertEqual(self.fleet.version, version)
+
+    def test_failed_account_keeps_records(self):
+        """Test that servers of accounts missing from a listing are kept."""
+        self.fleet.sync('hetzner', [server(1, account='a'), server(2, account='b')])
+
+        self.fleet.sync('hetzner', [server(1, account='a')], accounts=['a'])
+
+        self.assertEqual(self.fleet.summary()['total'], 2)
+
+    def test_pages_then_prune(self):
+        """Test that a listing fed page by page replaces the provider's servers when it ends."""
+        self.fleet.sync('hetzner', [server(1), server(2, account='b'), server(3)])
+
+        self.assertEqual(self.fleet.put_page([server(1, status='off')]), 1)
+        self.assertEqual(self.fleet.summary()['total'], 3)
+        self.assertEqual(self.fleet.prune('hetzner', {'1'}, accounts=['a']), 1)
+
+        self.assertEqual(sorted(r['id'] for r in self.fleet.records('hetzner')), [1, 2])
+        self.assertEqual(self.fleet.summary()['by_status'], {'off': 1, 'running': 1})
+
+    def test_upsert_and_remove(self):
+        """Test single-record updates from create and delete."""
+        self.fleet.upsert(server(5, status='initializing'))
+        self.fleet.upsert(server(5))
+        self.assertEqual(self.fleet.summary()['by_status'], {'running': 1})
+
+        self.assertTrue(self.fleet.remove('hetzner', '5'))
+        self.assertFalse(self.fleet.remove('hetzner', '5'))
+        summary = self.fleet.summary()
+        self.assertEqual(summary['total'], 0)
+        self.assertEqual(summary['by_status'], {})
+
+class TestSummaryEndpoint(unittest.TestCase):
+    """Test the /summary endpoint."""
+
+    def test_summary(self):
+        """Test that /summary serves the shared fleet index."""
+        from cloudbridge import app
+        from engiyn_core.fleet import fleet
+
+        fleet.sync('summary-test', [server(1, provider='summary-test')])
+        try:
+            data = app.test_client().get('/summary').get_json()
+        finally:
+            fleet.sync('summary-test', [])
+
+        self.assertEqual(data['by_provider']['summary-test']['total'], 1)
+
+    def test_fleet_records(self):
+        """Test that /fleet serves the last known servers of a provider."""
+        from cloudbridge import app
+        from engiyn_core.fleet import fleet
+
+        fleet.sync('summary-test', [server(1, provider='summary-test'), server(2, provider='summary-test')])
+        try:
+            data = app.test_client().get('/fleet?provider=summary-test').get_json()
+        finally:
+            fleet.sync('summary-test', [])
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(sorted(s['id'] for s in data['servers']), [1, 2])
+        self.assertIn('version', data)
+        self.assertIn('version', data)
+
+if __name__ == '__main__':
+    unittest.main()
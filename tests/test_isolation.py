@@ -0,0 +1,219 @@
+"""
+Test process-isolated plugin execution.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from cloudbridge import PluginLoader
+from engiyn_core.fleet import fleet
+from engiyn_core.isolation import pools
+from engiyn_core.scheduler import scheduler
+from engiyn_core.waiters import pollers
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    import os
+    import time
+    from flask import jsonify, request
+
+    def register_http(bp):
+        @bp.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify({'pid': os.getpid(), 'body': request.json, 'q': request.args.get('q')})
+
+        @bp.route('/sleep', methods=['GET'])
+        def sleep():
+            time.sleep(float(request.args.get('seconds', 5)))
+            return jsonify({'slept': True})
+
+        @bp.route('/create', methods=['POST'])
+        def create():
+            from engiyn_core.scheduler import scheduler
+            scheduler.nudge('isolated_echo')
+            return jsonify({'created': True})
+
+        @bp.route('/breaker', methods=['GET'])
+        def breaker():
+            from engiyn_core.resilience import guard
+            for _ in range(guard.breaker('isolated_echo').failure_threshold):
+                guard.breaker('isolated_echo').record_failure()
+            return jsonify(guard.call('isolated_echo', 'list_servers', lambda: {}, (), {}))
+
+        @bp.route('/throttled', methods=['GET'])
+        def throttled():
+            from engiyn_core.policy import ProviderPolicy
+            from engiyn_core.resilience import guard
+            guard.configure('isolated_limited', ProviderPolicy('isolated_limited',
+                                                               {'rate_limit': {'requests': 1, 'per': 3600}}))
+            for _ in range(2):
+                guard.call('isolated_limited', 'list_servers', lambda: {}, (), {})
+            return jsonify({})
+
+        @bp.route('/crash', methods=['GET'])
+        def crash():
+            os._exit(1)
+
+    def fetch_catalog(api_key):
+        return [{'id': f'pid-{os.getpid()}', 'api_key': api_key}]
+
+    class Provider:
+        def server_pages(self, accounts):
+            for account in accounts:
+                yield account, [{'provider': 'isolated_echo', 'account': account, 'id': os.getpid(),
+                                 'name': 'worker', 'status': 'running'}], None
+
+        def register_wait_http(self, bp, poller):
+            @bp.route('/servers/wait', methods=['GET'])
+            def wait():
+                ready, seen = poller.wait(request.args['ids'].split(','), ['running'], timeout=5)
+                return jsonify({'pid': os.getpid(), 'ready': ready, 'servers': seen})
+
+    provider = Provider()
+''')
+
+class TestProcessIsolation(unittest.TestCase):
+    """Test cases for plugins served from worker processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.plugins_dir = tempfile.mkdtemp()
+        plugin_dir = os.path.join(cls.plugins_dir, 'isolated_echo')
+        os.makedirs(plugin_dir)
+        with open(os.path.join(plugin_dir, '__init__.py'), 'w') as f:
+            f.write(PLUGIN_SOURCE)
+        with open(os.path.join(plugin_dir, 'plugin.json'), 'w') as f:
+            json.dump({
+                'name': 'isolated_echo',
+                'version': '0.1.0',
+                'type': 'cloud',
+                'entrypoint': 'isolated_echo',
+                'isolation': {'mode': 'process', 'workers': 1, 'max_concurrency': 1, 'timeout': 10}
+            }, f)
+
+        # Workers read their API keys from the config under their own home directory
+        cls.home = os.environ.get('HOME')
+        os.environ['HOME'] = cls.plugins_dir
+        os.makedirs(os.path.join(cls.plugins_dir, '.engiyn_cloud_bridge'))
+        with open(os.path.join(cls.plugins_dir, '.engiyn_cloud_bridge', 'config.json'), 'w') as f:
+            json.dump({'ISOLATED_ECHO_API_KEY': 'key'}, f)
+
+        cls.app = Flask(__name__)
+        loader = PluginLoader(cls.plugins_dir)
+        cls.plugin = loader.load_all_plugins()['isolated_echo']
+        loader.register_http_endpoints(cls.app)
+        cls.pool = pools['isolated_echo']
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        pools.pop('isolated_echo', None)
+        pollers.pop('isolated_echo', None)
+        if cls.home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = cls.home
+        shutil.rmtree(cls.plugins_dir)
+
+    def test_request_runs_in_worker(self):
+        """Test that requests are forwarded to another process and relayed."""
+        response = self.client.post('/plugins/isolated_echo/echo?q=1', json={'name': 'web-1'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertNotEqual(data['pid'], os.getpid())
+        self.assertEqual(data['body'], {'name': 'web-1'})
+        self.assertEqual(data['q'], '1')
+
+    def test_catalog_runs_in_worker(self):
+        """Test that background catalog refreshes of an isolated plugin run on its workers."""
+        offerings = self.plugin.fetch_catalog()
+
+        self.assertEqual(len(offerings), 1)
+        self.assertNotEqual(offerings[0]['id'], f'pid-{os.getpid()}')
+        self.assertEqual(offerings[0]['api_key'], 'key')
+
+    def test_servers_listed_in_worker(self):
+        """Test that server listings of an isolated plugin run on its workers and update the bridge's fleet index."""
+        self.addCleanup(fleet.sync, 'isolated_echo', [])
+        pages = list(self.plugin.stream_servers())
+
+        self.assertEqual(len(pages), 1)
+        self.assertNotEqual(pages[0][0]['id'], os.getpid())
+        self.assertEqual(fleet.summary()['by_provider']['isolated_echo']['total'], 1)
+        self.assertEqual(self.plugin.refresh_servers(), (0, 1))
+
+    def test_waits_parked_in_bridge(self):
+        """Test that waits are served by the bridge, from a poller that lists through the workers."""
+        self.addCleanup(fleet.sync, 'isolated_echo', [])
+        worker_pid = self.client.post('/plugins/isolated_echo/echo', json={}).get_json()['pid']
+
+        data = self.client.get(f'/plugins/isolated_echo/servers/wait?ids={worker_pid}').get_json()
+
+        self.assertEqual(data['pid'], os.getpid())
+        self.assertTrue(data['ready'])
+        self.assertEqual(data['servers'], {str(worker_pid): 'running'})
+
+    def test_worker_nudges_reach_bridge_scheduler(self):
+        """Test that a refresh nudged by a request on a worker is passed on to the bridge's scheduler."""
+        with patch.object(scheduler, 'nudge') as nudge:
+            response = self.client.post('/plugins/isolated_echo/create', json={})
+            self.client.post('/plugins/isolated_echo/echo', json={})
+
+        self.assertEqual(response.status_code, 200)
+        nudge.assert_called_once_with('isolated_echo')
+
+    def test_guard_errors_keep_their_status(self):
+        """Test that an open breaker and throttling on a worker answer 503 and 429 with Retry-After."""
+        response = self.client.get('/plugins/isolated_echo/breaker')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['breaker'], 'isolated_echo')
+        self.assertIn('Retry-After', response.headers)
+
+        response = self.client.get('/plugins/isolated_echo/throttled')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.get_json()['limit'], 'isolated_limited')
+        self.assertIn('Retry-After', response.headers)
+
+    def test_unknown_route_is_404(self):
+        """Test that the worker's routing result is relayed."""
+        response = self.client.get('/plugins/isolated_echo/missing')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_crashed_worker_is_restarted(self):
+        """Test that a worker that dies is replaced."""
+        restarts = self.pool.status()['restarts']
+        response = self.client.get('/plugins/isolated_echo/crash')
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(self.pool.status()['restarts'], restarts + 1)
+        response = self.client.post('/plugins/isolated_echo/echo', json={})
+        self.assertEqual(response.status_code, 200)
+
+    def test_timeout_restarts_worker(self):
+        """Test that a worker exceeding the timeout is killed and restarted."""
+        timeout = self.pool.timeout
+        self.pool.timeout = 1
+        try:
+            response = self.client.get('/plugins/isolated_echo/sleep?seconds=30')
+        finally:
+            self.pool.timeout = timeout
+
+        self.assertEqual(response.status_code, 504)
+        response = self.client.post('/plugins/isolated_echo/echo', json={})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Test manifest performance policies and their enforcement by the provider guard.
+"""
+
+import os
+import sys
+import json
+import threading
+import time
+import unittest
+
+# Add parent directory to path to import engiyn_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jsonschema import ValidationError, validate
+
+from engiyn_core.policy import ProviderPolicy, RateLimiter, ThrottledError
+from engiyn_core.resilience import CLOSED, ProviderGuard
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'plugin_schema.json')
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the token bucket."""
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst and then reports the wait."""
+        limiter = RateLimiter(2, 1)
+
+        self.assertEqual(limiter.acquire(0), 0)
+        self.assertEqual(limiter.acquire(0), 0)
+        self.assertGreater(limiter.acquire(0), 0)
+
+    def test_waits_for_refill(self):
+        """Test that acquire blocks until a token is refilled."""
+        limiter = RateLimiter(1, 0.05)
+        limiter.acquire(0)
+
+        start = time.monotonic()
+        self.assertEqual(limiter.acquire(1), 0)
+        self.assertGreater(time.monotonic() - start, 0.02)
+
+class TestProviderPolicy(unittest.TestCase):
+    """Test cases for policy lookups and admission."""
+
+    def test_endpoint_settings_override_provider(self):
+        """Test timeout, cache TTL and idempotency lookups."""
+        policy = ProviderPolicy('p', {
+            'timeout': 5,
+            'endpoints': {'create_server': {'timeout': 30, 'idempotent': True},
+                          'list_images': {'cache_ttl': 600}}
+        })
+
+        self.assertEqual(policy.timeout_for('create_server', 10), 30)
+        self.assertEqual(policy.timeout_for('list_servers', 10), 5)
+        self.assertEqual(ProviderPolicy('p').timeout_for('list_servers', 10), 10)
+        self.assertEqual(policy.cache_ttl('list_images'), 600)
+        self.assertEqual(policy.cache_ttl('list_servers', 30), 30)
+        self.assertTrue(policy.idempotent('create_server', False))
+
+    def test_request_rate(self):
+        """Test that the tightest of the provider and endpoint rate limits applies."""
+        policy = ProviderPolicy('p', {
+            'rate_limit': {'requests': 3600, 'per': 3600},
+            'endpoints': {'list_servers': {'rate_limit': {'requests': 1, 'per': 10}}}
+        })
+
+        self.assertEqual(policy.request_rate('list_servers'), 0.1)
+        self.assertEqual(policy.request_rate('get_server'), 1)
+        self.assertIsNone(ProviderPolicy('p').request_rate('list_servers'))
+
+    def test_limits_per_account(self):
+        """Test that each account gets its own rate limit, and headroom follows the busiest one."""
+        policy = ProviderPolicy('p', {'rate_limit': {'requests': 2, 'per': 3600}})
+
+        for _ in range(2):
+            with policy.admit('list_servers', account='a'):
+                pass
+        with self.assertRaises(ThrottledError):
+            with policy.admit('list_servers', timeout=0, account='a'):
+                pass
+        with policy.admit('list_servers', timeout=0, account='b'):
+            pass
+
+        self.assertAlmostEqual(policy.headroom('list_servers'), 0, places=3)
+        self.assertEqual(sorted(policy.snapshot()['accounts']), ['a', 'b'])
+        self.assertEqual(policy.snapshot()['accounts']['a']['throttled'], 1)
+
+    def test_headroom(self):
+        """Test that headroom is the share of the tightest rate limit burst left."""
+        policy = ProviderPolicy('p', {'endpoints': {'list_servers': {'rate_limit': {'requests': 4, 'per': 3600}}}})
+
+        self.assertEqual(policy.headroom('list_servers'), 1)
+        with policy.admit('list_servers'):
+            pass
+        self.assertAlmostEqual(policy.headroom('list_servers'), 0.75, places=3)
+        self.assertIsNone(policy.headroom('get_server'))
+
+    def test_concurrency_limit(self):
+        """Test that calls beyond max_concurrency are throttled."""
+        policy = ProviderPolicy('p', {'max_concurrency': 1})
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with policy.admit('list_servers'):
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait(5)
+        try:
+            with self.assertRaises(ThrottledError):
+                with policy.admit('list_servers', timeout=0.05):
+                    pass
+            self.assertEqual(policy.snapshot()['throttled'], 1)
+        finally:
+            release.set()
+            thread.join()
+
+        with policy.admit('list_servers', timeout=0.05):
+            self.assertEqual(policy.snapshot()['in_flight'], 1)
+
+    def test_unknown_pagination_style(self):
+        """Test that invalid settings are rejected."""
+        with self.assertRaises(ValueError):
+            ProviderPolicy('p', {'pagination': {'style': 'scroll'}})
+
+class TestGuardEnforcement(unittest.TestCase):
+    """Test cases for policies applied by the provider guard."""
+
+    def setUp(self):
+        self.guard = ProviderGuard()
+
+    def test_throttled_calls_do_not_trip_breakers(self):
+        """Test that exceeding a rate limit fails without counting as an upstream failure."""
+        self.guard.configure('p', ProviderPolicy('p', {'rate_limit': {'requests': 1, 'per': 3600}}))
+        self.guard.call('p', 'create_server', lambda: 'ok', (), {})
+
+        # The next token is an hour away, so the call is rejected without waiting
+        with self.assertRaises(ThrottledError):
+            self.guard.call('p', 'create_server', lambda: 'ok', (), {})
+        self.assertEqual(self.guard.breaker('p').state, CLOSED)
+        self.assertEqual(self.guard.breaker('p').failures, 0)
+        self.assertEqual(self.guard.snapshot()['providers']['p']['limits']['throttled'], 1)
+
+    def test_throttled_read_serves_last_known(self):
+        """Test that a throttled idempotent read falls back to the last response."""
+        self.guard.configure('p', ProviderPolicy('p', {
+            'endpoints': {'list_servers': {'rate_limit': {'requests': 1, 'per': 3600}}}
+        }))
+        self.guard.call('p', 'list_servers', lambda key: {'servers': []}, ('k',), {}, idempotent=True)
+        result = self.guard.call('p', 'list_servers', lambda key: {'servers': [1]}, ('k',), {},
+                                 idempotent=True)
+
+        self.assertEqual(result, {'servers': [], 'stale': True})
+
+    def test_idempotency_override(self):
+        """Test that the manifest can mark an endpoint idempotent."""
+        self.guard.configure('p', ProviderPolicy('p', {'endpoints': {'get_thing': {'idempotent': True}}}))
+        healthy = [True]
+
+        def get_thing(key):
+            if not healthy[0]:
+                raise ConnectionError('down')
+            return {'thing': 1}
+
+        self.guard.call('p', 'get_thing', get_thing, ('k',), {})
+        healthy[0] = False
+
+        self.assertEqual(self.guard.call('p', 'get_thing', get_thing, ('k',), {}), {'thing': 1, 'stale': True})
+
+class TestManifestSchema(unittest.TestCase):
+    """Test the performance block of the manifest schema."""
+
+    def setUp(self):
+        with open(SCHEMA_PATH) as f:
+            self.schema = json.load(f)
+        self.manifest = {'name': 'p', 'version': '0.1.0', 'type': 'cloud', 'entrypoint': 'p'}
+
+    def test_bundled_manifests_are_valid(self):
+        """Test that the bundled plugin manifests validate."""
+        plugins_dir = os.path.join(os.path.dirname(__file__), '..', 'plugins')
+        for name in ('hetzner', 'digitalocean', 'vultr'):
+            with open(os.path.join(plugins_dir, name, 'plugin.json')) as f:
+                manifest = json.load(f)
+            validate(instance=manifest, schema=self.schema)
+            ProviderPolicy(name, manifest['performance'])
+
+    def test_rejects_unknown_endpoint_setting(self):
+        """Test that misspelled settings are rejected."""
+        self.manifest['performance'] = {'endpoints': {'list_servers': {'cache_tll': 5}}}
+
+        with self.assertRaises(ValidationError):
+            validate(instance=self.manifest, schema=self.schema)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,434 @@
+"""
+Test the declarative CloudProvider base class in the Python SDK.
+"""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path to import cloudbridge and the bundled SDK
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import click
+from click.testing import CliRunner
+from flask import Blueprint, Flask
+
+import cloudbridge  # noqa: F401 - puts the bundled SDK on sys.path
+from engiyn import Catalog, CloudProvider, Param, Servers
+from engiyn_core.fleet import fleet
+from engiyn_core.policy import ProviderPolicy
+from engiyn_core.resilience import UpstreamError, guard
+from engiyn.listing import BridgeFleet, Formatter, LiveBlock, ServerListing
+from engiyn.provider import IncompleteListingError, TTLCache, dig
+
+class Example(CloudProvider):
+    name = 'example'
+    display_name = 'Example'
+    base_url = 'https://api.example.test/v1'
+    servers = Servers(
+        '/machines', collection='machines', item='machine', noun='machine',
+        create=[Param('size', 'small', help='Size'), Param('count', 1, type=int)],
+        fields={'region': 'zone.name'}
+    )
+    catalogs = [Catalog('sizes', cli_format='{slug}')]
+    offerings = 'sizes'
+
+    def normalize_offering(self, size):
+        return {'id': size['slug'], 'vcpu': 1, 'ram_gb': 1.0, 'disk_gb': 10.0,
+                'price_monthly': 5.0, 'currency': 'USD', 'regions': []}
+
+def response(body, status=200, headers=None):
+    r = MagicMock(status_code=status, headers=headers or {}, reason='')
+    r.json.return_value = body
+    return r
+
+class TestCloudProvider(unittest.TestCase):
+    """Test cases for generated routes, commands and caching."""
+
+    def setUp(self):
+        self.provider = Example()
+        self.provider.session = MagicMock()
+        self.accounts = {'a': 'key-a', 'b': 'key-b'}
+        self.provider.accounts = lambda: self.accounts
+        fleet.sync('example', [])
+
+        app = Flask(__name__)
+        bp = Blueprint('example', __name__, url_prefix='/plugins/example')
+        self.provider.register_http(bp)
+        app.register_blueprint(bp)
+        self.client = app.test_client()
+
+    def test_list_fans_out_over_pooled_session(self):
+        """Test that the list route merges accounts using the shared session."""
+        self.provider.session.request.side_effect = lambda method, url, headers, **kw: response(
+            {'machines': [{'id': 1 if headers['Authorization'] == 'Bearer key-a' else 2}]})
+
+        data = self.client.get('/plugins/example/servers').get_json()
+
+        self.assertEqual(sorted((m['id'], m['account']) for m in data['machines']), [(1, 'a'), (2, 'b')])
+        self.assertEqual(self.provider.session.request.call_count, 2)
+
+    def test_fleet_index_follows_changes(self):
+        """Test that listing, creating and deleting keep the fleet index current."""
+        self.accounts = {'a': 'key-a'}
+        self.provider.session.request.return_value = response(
+            {'machines': [{'id': 1, 'name': 'web', 'status': 'running', 'zone': {'name': 'eu-1'}}]})
+        self.client.get('/plugins/example/servers')
+        self.assertEqual(fleet.summary()['by_provider']['example']['by_status'], {'running': 1})
+
+        self.provider.session.request.return_value = response({'machine': {'id': 2, 'name': 'db', 'status': 'new'}})
+        self.client.post('/plugins/example/servers/create', json={'name': 'db'})
+        self.assertEqual(fleet.summary()['by_provider']['example']['by_status'], {'running': 1, 'new': 1})
+
+        self.provider.session.request.return_value = response({}, status=204)
+        self.client.post('/plugins/example/servers/delete', json={'server_id': 1})
+        self.assertEqual(fleet.summary()['by_provider']['example']['by_status'], {'new': 1})
+
+    def test_create_uses_declared_defaults(self):
+        """Test that create fills in declared parameter defaults."""
+        self.provider.session.request.return_value = response({'machine': {'id': 7}})
+
+        data = self.client.post('/plugins/example/servers/create', json={'name': 'web', 'account': 'b'}).get_json()
+
+        self.assertEqual(data['machine'], {'id': 7, 'account': 'b'})
+        _, kwargs = self.provider.session.request.call_args
+        self.assertEqual(kwargs['json'], {'name': 'web', 'size': 'small', 'count': 1})
+
+    def test_create_requires_account_choice(self):
+        """Test that create with several accounts and none named is rejected."""
+        response = self.client.post('/plugins/example/servers/create', json={'name': 'web'})
+
+        self.assertEqual(response.status_code, 400)
+        self.provider.session.request.assert_not_called()
+
+    def test_catalog_reads_are_cached(self):
+        """Test that catalog reads are served from the cache until it expires."""
+        self.provider.session.request.return_value = response({'sizes': [{'slug': 's1'}]})
+
+        first = self.client.get('/plugins/example/sizes').get_json()
+        second = self.client.get('/plugins/example/sizes').get_json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.provider.session.request.call_count, 1)
+        self.assertEqual([o['id'] for o in self.provider.fetch_catalog('key-a')], ['s1'])
+
+    def test_error_bodies_are_not_cached(self):
+        """Test that reads answered with an error are retried instead of served from the cache."""
+        self.provider.session.request.return_value = response({'error': {'message': 'slow down'}}, status=429)
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                self.provider.list_catalog('key-uncached', 'sizes')
+        self.provider.session.request.return_value = response({'message': 'unexpected'})
+        self.provider.list_catalog('key-uncached', 'sizes')
+        self.provider.session.request.return_value = response({'sizes': [{'slug': 's1'}]})
+
+        self.assertEqual(self.provider.list_catalog('key-uncached', 'sizes'), {'sizes': [{'slug': 's1'}]})
+        self.assertEqual(self.provider.session.request.call_count, 5)
+
+    def test_catalog_error_raises(self):
+        """Test that a catalog error body raises, so the catalog index keeps its previous offerings."""
+        from engiyn_core.catalog import CatalogIndex
+
+        index = CatalogIndex()
+        self.provider.session.request.return_value = response({'sizes': [{'slug': 's1'}]})
+        index.refresh({'example': lambda: self.provider.fetch_catalog('key-a')})
+        self.provider.session.request.return_value = response({'error': 'rate limited'})
+
+        with self.assertRaises(ValueError):
+            self.provider.fetch_catalog('key-b')
+        index.refresh({'example': lambda: self.provider.fetch_catalog('key-b')})
+        self.assertEqual(index.status()['offerings'], 1)
+        self.assertIn('rate limited', index.status()['errors']['example'])
+
+    def test_upstream_errors_trip_breakers(self):
+        """Test that 503 answers count as breaker failures and are reported per account."""
+        self.accounts = {'a': 'key-unavailable'}
+        self.provider.session.request.return_value = response({'error': {'message': 'maintenance'}}, status=503)
+        self.addCleanup(guard.breaker('example').record_success)
+        self.addCleanup(guard.breaker('example', 'list_servers').record_success)
+
+        data = self.client.get('/plugins/example/servers').get_json()
+        for _ in range(4):
+            self.client.get('/plugins/example/servers')
+
+        self.assertIn('HTTP 503: maintenance', data['errors']['a'])
+        self.assertEqual(guard.breaker('example', 'list_servers').state, 'open')
+
+    def test_delete_invalidates_server_reads(self):
+        """Test that deleting a server drops cached server reads for its account."""
+        self.provider.cache_ttl['list_servers'] = 60
+        self.provider.session.request.return_value = response({'machines': []})
+        self.provider.list_servers('key-a')
+        self.provider.session.request.return_value = response({}, status=204)
+
+        self.assertTrue(self.provider.delete_server('key-a', 3))
+        self.provider.session.request.return_value = response({'machines': [{'id': 4}]})
+        self.assertEqual(self.provider.list_servers('key-a'), {'machines': [{'id': 4}]})
+
+    def test_page_pagination(self):
+        """Test that page-numbered lists are fetched until the last page."""
+        guard.configure('example', ProviderPolicy('example', {
+            'pagination': {'style': 'page', 'page_size': 2, 'next': 'meta.next_page'}
+        }))
+        self.addCleanup(guard.configure, 'example', ProviderPolicy('example'))
+        pages = {1: response({'machines': [{'id': 1}, {'id': 2}], 'meta': {'next_page': 2}}),
+                 2: response({'machines': [{'id': 3}], 'meta': {'next_page': None}})}
+        self.provider.session.request.side_effect = lambda method, url, params, **kw: pages[params['page']]
+
+        result = self.provider.list_servers('key-a')
+
+        self.assertEqual([m['id'] for m in result['machines']], [1, 2, 3])
+        self.assertEqual(self.provider.session.request.call_args[1]['params'], {'per_page': 2, 'page': 2})
+
+    def test_too_many_pages_fail_the_listing(self):
+        """Test that a listing cut off at max_pages fails for its account instead of looking complete."""
+        guard.configure('example', ProviderPolicy('example', {
+            'pagination': {'style': 'page', 'page_size': 1, 'max_pages': 2}
+        }))
+        self.addCleanup(guard.configure, 'example', ProviderPolicy('example'))
+        self.provider.session.request.side_effect = lambda method, url, params, **kw: response(
+            {'machines': [{'id': params['page']}]})
+
+        with self.assertRaises(IncompleteListingError):
+            self.provider.list_servers('key-a')
+        result = self.provider.fan_out_servers({'a': 'key-a'})
+        self.assertIn('a', result['errors'])
+
+    def test_each_page_takes_a_rate_limit_token(self):
+        """Test that every page of a listing is admitted under its account's rate limit on its own."""
+        policy = ProviderPolicy('example', {
+            'rate_limit': {'requests': 100, 'per': 3600},
+            'pagination': {'style': 'page', 'page_size': 1}
+        })
+        guard.configure('example', policy)
+        self.addCleanup(guard.configure, 'example', ProviderPolicy('example'))
+        self.provider.session.request.side_effect = lambda method, url, params, **kw: response(
+            {'machines': [{'id': params['page']}] if params['page'] <= 3 else []})
+
+        result = self.provider.list_servers('key-a')
+
+        self.assertEqual(len(result['machines']), 3)
+        self.assertEqual(self.provider.session.request.call_count, 4)
+        self.assertAlmostEqual(policy.limits_for('a').limiter.available(), 96, places=1)
+        self.assertAlmostEqual(policy.limits_for('b').limiter.available(), 100, places=1)
+
+    def test_link_pagination_stays_on_provider(self):
+        """Test that next-page links are followed only on the provider's API."""
+        guard.configure('example', ProviderPolicy('example', {
+            'pagination': {'style': 'link', 'next': 'links.next'},
+            'endpoints': {'list_servers': {'timeout': 3}}
+        }))
+        self.addCleanup(guard.configure, 'example', ProviderPolicy('example'))
+        self.provider.session.request.side_effect = [
+            response({'machines': [{'id': 1}], 'links': {'next': f'{Example.base_url}/machines?page=2'}}),
+            response({'machines': [{'id': 2}], 'links': {'next': 'https://elsewhere.test/machines?page=3'}}),
+        ]
+
+        result = self.provider.list_servers('key-a')
+
+        self.assertEqual([m['id'] for m in result['machines']], [1, 2])
+        self.assertEqual(self.provider.session.request.call_count, 2)
+        self.assertEqual(self.provider.session.request.call_args[1]['timeout'], 3)
+
+    def test_wait_for_servers(self):
+        """Test the wait endpoints, served by the shared list poller."""
+        self.provider.poller.interval = 0.05
+        self.provider.session.request.side_effect = lambda method, url, headers, **kw: response(
+            {'machines': [{'id': 1, 'status': 'running'}, {'id': 2, 'status': 'starting'}]})
+
+        data = self.client.get('/plugins/example/servers/1/wait?timeout=5').get_json()
+        self.assertTrue(data['ready'])
+        self.assertEqual(data['servers'], {'1': 'running'})
+
+        data = self.client.get('/plugins/example/servers/wait?ids=1,2&status=running&timeout=0.2').get_json()
+        self.assertFalse(data['ready'])
+        self.assertEqual(data['pending'], ['2'])
+
+    def test_normalize(self):
+        """Test mapping provider records onto normalized fields."""
+        record = self.provider.normalize({'id': 3, 'name': 'db', 'status': 'running',
+                                          'zone': {'name': 'eu-1'}, 'account': 'a'})
+
+        self.assertEqual(record, {'id': 3, 'name': 'db', 'status': 'running', 'region': 'eu-1',
+                                  'provider': 'example', 'account': 'a'})
+
+    def test_generated_cli(self):
+        """Test the generated Click commands."""
+        group = click.Group('example')
+        self.provider.register_cli(group)
+        self.assertEqual(sorted(group.commands), ['create', 'delete', 'list', 'sizes'])
+
+        self.provider.session.request.return_value = response({'machine': {'id': 9, 'name': 'web', 'status': 'new'}})
+        result = CliRunner().invoke(group, ['create', 'web', '--size', 'large', '--count', '2', '--account', 'a'])
+
+        self.assertEqual(result.output.strip(), 'Created machine: 9 - web - new - a')
+        _, kwargs = self.provider.session.request.call_args
+        self.assertEqual(kwargs['json'], {'name': 'web', 'size': 'large', 'count': 2})
+
+    def test_cli_reports_guard_errors(self):
+        """Test that commands report open breakers and throttling with when to retry."""
+        from engiyn_core.policy import ThrottledError
+        from engiyn_core.resilience import CircuitOpenError
+        group = click.Group('example')
+        self.provider.register_cli(group)
+
+        with patch.object(guard, 'call', side_effect=CircuitOpenError('example', 30)):
+            result = CliRunner().invoke(group, ['create', 'web', '--account', 'a'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('Circuit open for example, retry in 30s', result.output)
+
+        with patch.object(guard, 'call', side_effect=ThrottledError('example', 5)):
+            result = CliRunner().invoke(group, ['sizes', '--account', 'a'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('retry in 5s', result.output)
+
+        with patch.object(guard, 'call', side_effect=UpstreamError('example', 429, 'slow down', retry_after=12)):
+            result = CliRunner().invoke(group, ['delete', '9', '--account', 'a'])
+        self.assertEqual(result.output.strip(), 'Error: example returned HTTP 429: slow down (retry in 12s)')
+
+class Listed(Example):
+    # Kept apart from other tests' status pollers, which sync 'example' in the background
+    name = 'listed'
+
+class TestListCommand(unittest.TestCase):
+    """Test cases for list output formats and --watch."""
+
+    def setUp(self):
+        self.provider = Listed()
+        self.provider.session = MagicMock()
+        self.provider.accounts = lambda: {'a': 'key-a'}
+        self.provider.session.request.return_value = response({'machines': [{'id': 1, 'name': 'web', 'status': 'running'}]})
+        fleet.sync('listed', [])
+        self.group = click.Group('listed')
+        self.provider.register_cli(self.group)
+
+    def tearDown(self):
+        fleet.sync('listed', [])
+
+    def test_formats(self):
+        """Test text, table and NDJSON output."""
+        text = CliRunner().invoke(self.group, ['list']).output
+        table = CliRunner().invoke(self.group, ['list', '--format', 'table']).output.splitlines()
+        ndjson = CliRunner().invoke(self.group, ['list', '--format', 'ndjson']).output
+
+        self.assertEqual(text.strip(), '1 - web - running - a')
+        self.assertEqual(table[0].split(), ['ID', 'NAME', 'STATUS', 'REGION', 'TYPE', 'ACCOUNT'])
+        self.assertEqual(table[1].split(), ['1', 'web', 'running', 'a'])
+        self.assertEqual(json.loads(ndjson)['status'], 'running')
+        self.assertEqual(len(fleet.records('listed')), 1)
+
+    def test_watch_prints_only_changes(self):
+        """Test that refreshes report added, changed and removed servers, and nothing when unchanged."""
+        listings = iter([
+            {'machines': [{'id': 1, 'name': 'web', 'status': 'running'}]},
+            {'machines': [{'id': 1, 'name': 'web', 'status': 'off'}, {'id': 2, 'name': 'db', 'status': 'new'}]},
+            {'machines': [{'id': 2, 'name': 'db', 'status': 'new'}]},
+        ])
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) > 3:
+                raise KeyboardInterrupt
+            self.provider.session.request.return_value = response(next(listings))
+
+        with patch('engiyn.listing.time.sleep', sleep), patch.object(BridgeFleet, 'follow', return_value=False):
+            result = CliRunner().invoke(self.group, ['list', '--format', 'ndjson', '--watch', '5'])
+
+        events = [json.loads(line) for line in result.output.splitlines()[1:]]
+        self.assertEqual([(e['event'], e['server']['id']) for e in events],
+                         [('changed', 1), ('added', 2), ('removed', 1)])
+        self.assertEqual(sleeps, [5, 5, 5, 5])
+
+    def test_watch_follows_bridge(self):
+        """Test that with a bridge running, watching reads its fleet only when the version changes."""
+        bridge = BridgeFleet('listed', session=MagicMock())
+        answers = iter([
+            {'version': 3},
+            {'version': 3},
+            {'version': 4},
+            {'servers': [{'id': 1, 'name': 'web', 'status': 'off', 'account': 'a', 'provider': 'listed'}]},
+        ])
+        bridge.session.get.side_effect = lambda url, params, timeout: response(next(answers))
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) > 2:
+                raise KeyboardInterrupt
+
+        with patch('engiyn.listing.time.sleep', sleep), patch('engiyn.provider.BridgeFleet', return_value=bridge):
+            result = CliRunner().invoke(self.group, ['list', '--format', 'ndjson', '--watch', '5'])
+
+        events = [json.loads(line) for line in result.output.splitlines()[1:]]
+        self.assertEqual([(e['event'], e['server']['status']) for e in events], [('changed', 'off')])
+        self.assertEqual(bridge.session.get.call_args[0][0], 'http://localhost:5005/fleet')
+        self.assertEqual(self.provider.session.request.call_count, 1)
+
+    def test_refresh_after_fleet_sync(self):
+        """Test that a refresh reports changes another writer already synced into the fleet index."""
+        listing = ServerListing(Formatter('text'), 'machines', echo=lambda *a, **k: None)
+        listing.show([('a', [{'id': 1, 'name': 'web', 'status': 'running', 'account': 'a'}], None)])
+        latest = [{'id': 1, 'name': 'web', 'status': 'off', 'account': 'a', 'provider': 'listed'}]
+        fleet.sync('listed', latest)
+
+        self.assertEqual(listing.refresh([('a', latest, None)]), (1, [('changed', latest[0])]))
+        self.assertEqual(listing.refresh([('a', latest, None)]), (1, None))
+
+    def test_watch_respects_rate_limit(self):
+        """Test that the refresh interval is stretched to stay within the manifest's rate limit."""
+        listing = ServerListing(Formatter('text'), 'machines', echo=lambda *a, **k: None)
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            raise KeyboardInterrupt
+
+        with patch('engiyn.listing.time.sleep', sleep):
+            listing.watch(lambda: [], 1, pages=40, request_rate=1.0, live=False)
+
+        self.assertEqual(sleeps, [160])
+
+    def test_live_block_rewrites_changed_lines(self):
+        """Test that only changed lines are rewritten on a terminal."""
+        out = []
+        block = LiveBlock(['a', 'b', 'c'], echo=lambda text, nl=True: out.append(text))
+
+        self.assertEqual(block.update(['a', 'B', 'c']), 1)
+        self.assertEqual(out[-1], '\x1b[2A\r\x1b[2KB\x1b[2B\r')
+        self.assertEqual(block.update(['a', 'B']), 0)
+        self.assertEqual(block.update(['a', 'B']), 0)
+        self.assertEqual(len(out), 2)
+
+class TestHelpers(unittest.TestCase):
+    """Test cases for SDK helpers."""
+
+    def test_dig(self):
+        """Test dotted path lookup through dicts and lists."""
+        record = {'networks': {'v4': [{'ip_address': '10.0.0.1'}]}}
+
+        self.assertEqual(dig(record, 'networks.v4.0.ip_address'), '10.0.0.1')
+        self.assertIsNone(dig(record, 'networks.v6.0.ip_address'))
+
+    def test_ttl_cache_expiry(self):
+        """Test that expired entries are not returned."""
+        cache = TTLCache()
+        cache.set('k', 'v', 60)
+        cache.set('old', 'v', -1)
+
+        self.assertEqual(cache.get('k'), 'v')
+        self.assertIsNone(cache.get('old'))
+
+    def test_bundled_plugins_load(self):
+        """Test that the bundled provider plugins load on the SDK."""
+        loader = cloudbridge.PluginLoader(os.path.join(os.path.dirname(__file__), '..', 'plugins'))
+        plugins = loader.load_all_plugins()
+
+        self.assertEqual(sorted(plugins), ['digitalocean', 'hetzner', 'vultr'])
+        for plugin in plugins.values():
+            self.assertIsInstance(plugin.module.provider, CloudProvider)
+
+if __name__ == '__main__':
+    unittest.main()
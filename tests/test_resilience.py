@@ -0,0 +1,168 @@
+"""
+Test circuit breakers and hedged provider calls.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core import resilience
+from engiyn_core.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ProviderGuard, UpstreamError
+)
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the breaker."""
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_trial(self):
+        """Test that a single trial is allowed after the reset timeout."""
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+class TestProviderGuard(unittest.TestCase):
+    """Test cases for guarded provider calls."""
+
+    def setUp(self):
+        self.guard = ProviderGuard()
+
+    def test_fails_fast_when_open(self):
+        """Test that an open breaker rejects calls without calling upstream."""
+        calls = []
+
+        def create_server(api_key):
+            calls.append(api_key)
+            raise ConnectionError('down')
+
+        for _ in range(resilience.FAILURE_THRESHOLD):
+            with self.assertRaises(ConnectionError):
+                self.guard.call('hetzner', 'create_server', create_server, ('k',), {})
+        with self.assertRaises(CircuitOpenError):
+            self.guard.call('hetzner', 'create_server', create_server, ('k',), {})
+
+        self.assertEqual(len(calls), resilience.FAILURE_THRESHOLD)
+        snapshot = self.guard.snapshot()['providers']['hetzner']
+        self.assertEqual(snapshot['state'], OPEN)
+        self.assertEqual(snapshot['endpoints']['create_server']['state'], OPEN)
+
+    def test_serves_last_known_for_idempotent_reads(self):
+        """Test that failed reads fall back to the last successful response."""
+        healthy = [True]
+
+        def list_servers(api_key):
+            if not healthy[0]:
+                raise TimeoutError('timed out')
+            return {'servers': [{'id': 1}]}
+
+        self.guard.call('hetzner', 'list_servers', list_servers, ('k',), {}, idempotent=True)
+        healthy[0] = False
+        result = self.guard.call('hetzner', 'list_servers', list_servers, ('k',), {}, idempotent=True)
+
+        self.assertEqual(result, {'servers': [{'id': 1}], 'stale': True})
+
+    def test_upstream_errors(self):
+        """Test that 5xx answers count as failures and are never served as last-known data."""
+        status = [200]
+
+        def list_servers(api_key):
+            if status[0] != 200:
+                raise UpstreamError('hetzner', status[0], 'error')
+            return {'servers': [{'id': 1}]}
+
+        status[0] = 404
+        with self.assertRaises(UpstreamError):
+            self.guard.call('hetzner', 'list_servers', list_servers, ('k',), {}, idempotent=True)
+        self.assertEqual(self.guard.breaker('hetzner').failures, 0)
+
+        status[0] = 503
+        for _ in range(resilience.FAILURE_THRESHOLD):
+            with self.assertRaises(UpstreamError):
+                self.guard.call('hetzner', 'list_servers', list_servers, ('k',), {}, idempotent=True)
+        self.assertEqual(self.guard.breaker('hetzner').state, OPEN)
+        self.assertEqual(self.guard.breaker('hetzner', 'list_servers').state, OPEN)
+
+    def test_rejected_call_releases_trial(self):
+        """Test that a call rejected by its endpoint breaker gives back the provider's half-open trial."""
+        provider = self.guard.breaker('hetzner')
+        endpoint = self.guard.breaker('hetzner', 'list_servers')
+        provider.reset_timeout = 0
+        provider.record_failure()
+        provider.state = OPEN
+        endpoint.state, endpoint.opened_at = OPEN, time.monotonic()
+
+        with self.assertRaises(CircuitOpenError):
+            self.guard.call('hetzner', 'list_servers', lambda k: {}, ('k',), {}, idempotent=True)
+
+        self.assertEqual(provider.state, HALF_OPEN)
+        self.assertTrue(provider.allow())
+
+    def test_hedged_call_wins_on_slow_first_attempt(self):
+        """Test that a second attempt is sent once p95 latency has passed."""
+        tracker = self.guard.tracker('hetzner', 'get_server')
+        for _ in range(resilience.MIN_HEDGE_SAMPLES):
+            tracker.record(0.01)
+        attempts = []
+
+        def get_server(api_key):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                time.sleep(0.5)
+                return {'server': 'slow'}
+            return {'server': 'fast'}
+
+        self.guard.hedging = True
+        result = self.guard.call('hetzner', 'get_server', get_server, ('k',), {}, idempotent=True)
+
+        self.assertEqual(result, {'server': 'fast'})
+        self.assertEqual(tracker.hedges, 1)
+
+class TestCircuitOpenHandler(unittest.TestCase):
+    """Test the bridge's response to an open breaker."""
+
+    def test_returns_503(self):
+        """Test that CircuitOpenError becomes a 503 with Retry-After."""
+        from cloudbridge import app, handle_circuit_open
+
+        with app.test_request_context('/plugins/hetzner/servers'):
+            response = handle_circuit_open(CircuitOpenError('hetzner', 12))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '13')
+        self.assertEqual(response.get_json()['breaker'], 'hetzner')
+
+class TestUpstreamErrorHandler(unittest.TestCase):
+    """Test the bridge's response to a provider HTTP error."""
+
+    def test_relays_status(self):
+        """Test that 5xx answers become a 502 and 429 keeps its Retry-After."""
+        from cloudbridge import app, handle_upstream_error
+
+        with app.test_request_context('/plugins/hetzner/servers'):
+            unavailable = handle_upstream_error(UpstreamError('hetzner', 503, 'maintenance'))
+            throttled = handle_upstream_error(UpstreamError('hetzner', 429, 'slow down', retry_after=7))
+
+        self.assertEqual(unavailable.status_code, 502)
+        self.assertEqual(unavailable.get_json()['upstream_status'], 503)
+        self.assertEqual(throttled.status_code, 429)
+        self.assertEqual(throttled.headers['Retry-After'], '7')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Test the adaptive per-provider refresh scheduler.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import cloudbridge
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.fleet import fleet
+from engiyn_core.scheduler import (
+    MAX_REFRESH_INTERVAL, MIN_REFRESH_INTERVAL, NUDGE_DELAY, REFRESH_INTERVAL, RefreshScheduler, next_interval
+)
+
+def server(server_id, status='running'):
+    return {'provider': 'scheduler-test', 'account': 'a', 'id': server_id, 'name': f'web-{server_id}',
+            'status': status, 'region': 'fsn1', 'type': 'cx22'}
+
+class TestNextInterval(unittest.TestCase):
+    """Test cases for interval adaptation."""
+
+    def test_changes_shorten_interval(self):
+        """Test that a refresh with changes halves the interval, down to the minimum."""
+        self.assertEqual(next_interval(60, changed=3, boosted=False, requests=1), 30)
+        self.assertEqual(next_interval(20, changed=3, boosted=False, requests=1), MIN_REFRESH_INTERVAL)
+
+    def test_idle_backs_off(self):
+        """Test that unchanged refreshes stretch the interval, up to the maximum."""
+        interval = REFRESH_INTERVAL
+        for _ in range(20):
+            interval = next_interval(interval, changed=0, boosted=False, requests=1)
+
+        self.assertEqual(interval, MAX_REFRESH_INTERVAL)
+
+    def test_boost(self):
+        """Test that a boosted provider is refreshed at the minimum interval."""
+        self.assertEqual(next_interval(MAX_REFRESH_INTERVAL, changed=0, boosted=True, requests=1),
+                         MIN_REFRESH_INTERVAL)
+
+    def test_rate_limit(self):
+        """Test that refreshes stay within their share of the rate limit, even when boosted."""
+        # 4 requests per refresh at 0.1 requests/s: a quarter of the limit allows one refresh per 160s
+        self.assertEqual(next_interval(60, changed=0, boosted=True, requests=4, request_rate=0.1), 160)
+
+    def test_low_headroom(self):
+        """Test that refreshes back off while the rate limit is nearly used up."""
+        self.assertEqual(next_interval(60, changed=3, boosted=False, requests=1, headroom=0.05),
+                         REFRESH_INTERVAL * 2)
+        self.assertEqual(next_interval(60, changed=3, boosted=False, requests=1, headroom=0.9), 30)
+
+class TestRefreshScheduler(unittest.TestCase):
+    """Test cases for scheduled refreshes."""
+
+    def setUp(self):
+        self.scheduler = RefreshScheduler()
+        self.listing = [server(1)]
+        self.scheduler.add('scheduler-test', self.refresh)
+
+    def tearDown(self):
+        fleet.sync('scheduler-test', [])
+
+    def refresh(self):
+        if self.listing is None:
+            raise RuntimeError('provider unavailable')
+        return fleet.sync('scheduler-test', self.listing), 1
+
+    def status(self):
+        return self.scheduler.status()['scheduler-test']
+
+    def test_adapts_to_changes(self):
+        """Test that the interval shrinks while servers change and grows once they stop."""
+        self.scheduler.refresh('scheduler-test')
+        self.assertEqual(self.status()['last_changed'], 1)
+        self.assertEqual(self.status()['interval'], REFRESH_INTERVAL / 2)
+
+        self.scheduler.refresh('scheduler-test')
+        self.assertEqual(self.status()['last_changed'], 0)
+        self.assertEqual(self.status()['interval'], REFRESH_INTERVAL / 2 * 1.5)
+        self.assertEqual(self.status()['refreshes'], 2)
+
+    def test_nudge(self):
+        """Test that a create or delete brings the next refresh forward and boosts the ones after it."""
+        self.scheduler.refresh('scheduler-test')
+        self.scheduler.nudge('scheduler-test')
+
+        self.assertTrue(self.status()['boosted'])
+        self.assertLessEqual(self.status()['next_refresh_in'], NUDGE_DELAY)
+
+        self.scheduler.refresh('scheduler-test')
+        self.assertEqual(self.status()['interval'], MIN_REFRESH_INTERVAL)
+
+    def test_changes_of_other_writers_ignored(self):
+        """Test that only the refresh's own changes count, not concurrent fleet index writes."""
+        self.scheduler.refresh('scheduler-test')
+        fleet.upsert(server(2))
+
+        self.listing = [server(1), server(2)]
+        self.scheduler.refresh('scheduler-test')
+
+        self.assertEqual(self.status()['last_changed'], 0)
+
+    def test_forward_nudges(self):
+        """Test that nudges are passed on, even for providers this scheduler does not refresh."""
+        forwarded = []
+        self.scheduler.forward = forwarded.append
+
+        self.scheduler.nudge('scheduler-test')
+        self.scheduler.nudge('missing')
+
+        self.assertEqual(forwarded, ['scheduler-test', 'missing'])
+
+    def test_nudge_unknown_provider(self):
+        """Test that nudging a provider without refreshes is ignored."""
+        self.scheduler.nudge('missing')
+
+        self.assertNotIn('missing', self.scheduler.status())
+
+    def test_failed_refresh(self):
+        """Test that a failing refresh is reported and backs off."""
+        self.listing = None
+        self.scheduler.refresh('scheduler-test')
+
+        status = self.status()
+        self.assertEqual(status['last_error'], 'provider unavailable')
+        self.assertIsNone(status['updated_at'])
+        self.assertGreater(status['interval'], REFRESH_INTERVAL)
+
+class TestRefreshEndpoint(unittest.TestCase):
+    """Test the /refresh endpoint."""
+
+    def setUp(self):
+        from engiyn_core.scheduler import scheduler
+        scheduler.add('scheduler-test', lambda: (fleet.sync('scheduler-test', [server(1)]), 1))
+        self.addCleanup(scheduler._schedules.pop, 'scheduler-test')
+        self.addCleanup(fleet.sync, 'scheduler-test', [])
+
+    def test_refresh_lists_provider_now(self):
+        """Test that a manual refresh lists the provider into the fleet index before responding."""
+        from cloudbridge import app
+        client = app.test_client()
+
+        response = client.post('/refresh?provider=scheduler-test')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['refresh']['scheduler-test']['refreshes'], 1)
+        self.assertEqual(len(fleet.records('scheduler-test')), 1)
+        self.assertEqual(client.post('/refresh?provider=missing').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
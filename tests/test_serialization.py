@@ -0,0 +1,118 @@
+"""
+Test the bridge response serializer.
+"""
+
+import os
+import sys
+import json
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path to import engiyn_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify
+
+from engiyn_core import serialization
+from engiyn_core.serialization import (
+    BridgeJSONProvider, MIMETYPE_JSON, MIMETYPE_MSGPACK, MIMETYPE_NDJSON, decode_body
+)
+
+def make_app(payload):
+    """Create a Flask app with one route returning ``payload`` via jsonify."""
+    app = Flask(__name__)
+    app.json = BridgeJSONProvider(app)
+
+    @app.route('/servers')
+    def servers():
+        return jsonify(payload)
+
+    return app
+
+class TestBridgeJSONProvider(unittest.TestCase):
+    """Test cases for content negotiation and streaming."""
+
+    def setUp(self):
+        self.payload = {
+            'servers': [{'id': i, 'name': f'srv-{i}', 'status': 'running'} for i in range(3)],
+            'meta': {'total': 3}
+        }
+
+    def test_json_default(self):
+        """Test that JSON is returned when no format is requested."""
+        client = make_app(self.payload).test_client()
+        response = client.get('/servers')
+
+        self.assertEqual(response.mimetype, MIMETYPE_JSON)
+        self.assertEqual(json.loads(response.data), self.payload)
+        self.assertIn('Accept', response.headers.get('Vary', ''))
+
+    def test_json_without_orjson(self):
+        """Test that the stdlib encoder is used when orjson is missing."""
+        with patch.object(serialization, 'orjson', None):
+            client = make_app(self.payload).test_client()
+            response = client.get('/servers')
+
+        self.assertEqual(json.loads(response.data), self.payload)
+
+    def test_ndjson(self):
+        """Test that NDJSON emits one line per record."""
+        client = make_app(self.payload).test_client()
+        response = client.get('/servers', headers={'Accept': MIMETYPE_NDJSON})
+
+        self.assertEqual(response.mimetype, MIMETYPE_NDJSON)
+        lines = response.data.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['name'], 'srv-0')
+
+    def test_ndjson_streams_primary_collection(self):
+        """Test that only the records are streamed, not other lists such as the accounts answered."""
+        payload = {'accounts': ['a', 'b'], 'servers': self.payload['servers'], 'currencies': ['EUR']}
+        client = make_app(payload).test_client()
+        response = client.get('/servers', headers={'Accept': MIMETYPE_NDJSON})
+
+        self.assertEqual(decode_body(response.data, response.mimetype), self.payload['servers'])
+
+    def test_ndjson_error_payload(self):
+        """Test that a payload without collections is a single NDJSON line."""
+        client = make_app({'error': 'No API key configured'}).test_client()
+        response = client.get('/servers', headers={'Accept': MIMETYPE_NDJSON})
+
+        self.assertEqual(decode_body(response.data, response.mimetype),
+                         [{'error': 'No API key configured'}])
+
+    def test_msgpack_unavailable_falls_back_to_json(self):
+        """Test that msgpack requests get JSON when msgpack is not installed."""
+        with patch.object(serialization, 'msgpack', None):
+            client = make_app(self.payload).test_client()
+            response = client.get('/servers', headers={'Accept': MIMETYPE_MSGPACK})
+
+        self.assertEqual(response.mimetype, MIMETYPE_JSON)
+
+    @unittest.skipIf(serialization.msgpack is None, 'msgpack not installed')
+    def test_msgpack(self):
+        """Test that msgpack is returned when requested."""
+        client = make_app(self.payload).test_client()
+        response = client.get('/servers', headers={'Accept': MIMETYPE_MSGPACK})
+
+        self.assertEqual(response.mimetype, MIMETYPE_MSGPACK)
+        self.assertEqual(decode_body(response.data, response.mimetype), self.payload)
+
+    def test_large_payload_is_streamed(self):
+        """Test that large collections are streamed and decode identically."""
+        payload = {
+            'servers': [{'id': i, 'name': f'srv-{i}'} for i in range(2000)],
+            'meta': {'total': 2000}
+        }
+        with patch.object(serialization, 'CHUNK_SIZE', 1024):
+            client = make_app(payload).test_client()
+            response = client.get('/servers')
+
+            chunks = list(response.response)
+
+            self.assertTrue(response.is_streamed)
+            self.assertGreater(len(chunks), 1)
+            self.assertEqual(json.loads(b''.join(chunks)), payload)
+
+if __name__ == '__main__':
+    unittest.main()
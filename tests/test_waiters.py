@@ -0,0 +1,108 @@
+"""
+Test the shared server status poller behind the wait endpoints.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add parent directory to path to import engiyn_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engiyn_core.waiters import DELETED, POLL_QUOTA_SHARE, StatusPoller, poll_interval
+
+class FakeProvider:
+    """Serves a scripted sequence of list results, one per poll."""
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def fetch(self):
+        with self.lock:
+            self.calls += 1
+            return (*self.results[min(self.calls, len(self.results)) - 1], 1)
+
+class TestStatusPoller(unittest.TestCase):
+    """Test cases for waiting on server status."""
+
+    def test_many_waiters_share_polls(self):
+        """Test that concurrent waiters are served by the same list calls."""
+        provider = FakeProvider(({str(i): 'starting' for i in range(20)}, True),
+                                ({str(i): 'running' for i in range(20)}, True))
+        poller = StatusPoller('test', provider.fetch, interval=0.05)
+        results = []
+
+        def wait(server_id):
+            results.append(poller.wait([server_id], ['running'], timeout=5))
+
+        threads = [threading.Thread(target=wait, args=(str(i),)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(ready for ready, _ in results))
+        self.assertLessEqual(provider.calls, 4)
+
+    def test_multi_id_all_and_any(self):
+        """Test waiting for all of several servers, or any one of them."""
+        provider = FakeProvider(({'1': 'running', '2': 'starting'}, True))
+        poller = StatusPoller('test', provider.fetch, interval=0.05)
+
+        ready, seen = poller.wait(['1', '2'], ['running'], timeout=0.2)
+        self.assertFalse(ready)
+        self.assertEqual(seen, {'1': 'running', '2': 'starting'})
+
+        ready, _ = poller.wait(['1', '2'], ['running'], timeout=0.2, require_all=False)
+        self.assertTrue(ready)
+
+    def test_deleted_only_on_complete_list(self):
+        """Test that a server missing from a partial list is not treated as deleted."""
+        provider = FakeProvider(({}, False), ({}, True))
+        poller = StatusPoller('test', provider.fetch, interval=0.05)
+
+        ready, seen = poller.wait(['7'], [DELETED], timeout=5)
+
+        self.assertTrue(ready)
+        self.assertEqual(seen, {'7': DELETED})
+        self.assertEqual(provider.calls, 2)
+
+    def test_poller_stops_when_idle(self):
+        """Test that polling stops once nobody is waiting."""
+        provider = FakeProvider(({'1': 'running'}, True))
+        poller = StatusPoller('test', provider.fetch, interval=0.05)
+
+        poller.wait(['1'], ['running'], timeout=1)
+        calls = provider.calls
+        threading.Event().wait(0.2)
+
+        self.assertEqual(provider.calls, calls)
+        self.assertEqual(poller.status()['waiting'], 0)
+
+    def test_fetch_errors_keep_waiting(self):
+        """Test that a failed poll is retried rather than failing waiters."""
+        attempts = []
+
+        def fetch():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError('down')
+            return {'1': 'running'}, True, 1
+
+        poller = StatusPoller('test', fetch, interval=0.05)
+        ready, _ = poller.wait(['1'], ['running'], timeout=5)
+
+        self.assertTrue(ready)
+        self.assertEqual(len(attempts), 2)
+
+    def test_polls_fit_rate_limit(self):
+        """Test that polls are spaced to use at most their share of the rate limit."""
+        self.assertEqual(poll_interval(5, requests=1), 5)
+        self.assertEqual(poll_interval(5, requests=1, request_rate=10), 5)
+        # 4 requests per poll at 1 request/s
+        self.assertEqual(poll_interval(5, requests=4, request_rate=1), 4 / POLL_QUOTA_SHARE)
+
+if __name__ == '__main__':
+    unittest.main()